@@ -0,0 +1,134 @@
+# Suite de benchmarks de los caminos críticos (repositorios locales, gráficos,
+# historial, búsqueda de alimentos y endpoints de la API).
+#
+#   python -m benchmarks                         ejecuta y compara con baseline.json
+#   python -m benchmarks -k api.                 solo los casos que contienen "api."
+#   python -m benchmarks --alimentos 1000000 --anios 3 --datos /tmp/bench_1m
+#   python -m benchmarks --guardar-baseline      fija los tiempos actuales como referencia
+#   python -m benchmarks --salida r.json         guarda también los resultados de esta ejecución
+#   python -m benchmarks --baseline-local        compara con la línea base de esta máquina
+#
+# Sale con código 1 si el mejor tiempo de algún caso (o la memoria que
+# retiene, en los casos que la miden) empeora más que --tolerancia respecto a
+# la línea base. Entre ejecuciones en una misma máquina
+# el mínimo varía hasta un 80% en los casos cortos, por eso la tolerancia por
+# defecto es del 100%: detecta índices perdidos o filtros cuadráticos, no
+# ajustes finos (para eso, --tolerancia menor en una máquina sin carga).
+# La línea base solo es comparable si se tomó en la misma máquina y con los
+# mismos parámetros de datos; si no, sale con código 2. En otra máquina (o en
+# CI) se usa --baseline-local: benchmarks/baseline.local.json, fuera de git,
+# creado con --guardar-baseline --baseline-local en la versión de referencia.
+#
+# Con una sola ronda el mínimo es ruido (un caso de 0,3 ms puede salir en
+# 1,5 ms), así que se miden al menos BENCH_REPETICIONES_MINIMAS rondas, tras
+# nucleo.CALENTAMIENTO llamadas sin medir.
+
+import argparse
+import importlib
+import os
+import pkgutil
+import sys
+import tempfile
+import benchmarks
+from benchmarks import nucleo
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+BASELINE_LOCAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.local.json")
+REPETICIONES_MINIMAS = int(os.environ.get('BENCH_REPETICIONES_MINIMAS') or 5)
+
+def cargar_modulos():
+    for modulo in pkgutil.iter_modules(benchmarks.__path__):
+        if modulo.name.startswith("bench_"):
+            importlib.import_module(f"benchmarks.{modulo.name}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Suite de benchmarks")
+    parser.add_argument("-k", dest="filtro", default="", help="Ejecutar solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--anios", type=int, default=1, help="Años de historial del usuario sintético")
+    parser.add_argument("--alimentos", type=int, default=10_000, help="Tamaño del catálogo (10.000 a 1.000.000)")
+    parser.add_argument("--consumos-por-dia", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--datos", help="Directorio donde generar (o reutilizar) los datos; por defecto uno temporal")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--baseline-local", action="store_true",
+                        help=f"Usar (o con --guardar-baseline, crear) la línea base de esta máquina: {BASELINE_LOCAL}")
+    parser.add_argument("--guardar-baseline", action="store_true")
+    parser.add_argument("--tolerancia", type=float, default=1.0, help="Empeoramiento admitido (1.0 = 100%%)")
+    parser.add_argument("--salida", help="Guarda los resultados de esta ejecución en un JSON")
+    parser.add_argument("--listar", action="store_true", help="Muestra los casos disponibles y sale")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    if args.baseline_local:
+        args.baseline = BASELINE_LOCAL
+    if args.repeticiones < REPETICIONES_MINIMAS:
+        print(f"NOTA: se miden {REPETICIONES_MINIMAS} repeticiones (mínimo para comparar), no {args.repeticiones}")
+        args.repeticiones = REPETICIONES_MINIMAS
+
+    cargar_modulos()
+    nombres = sorted(nombre for nombre in nucleo.CASOS if args.filtro in nombre)
+    if args.listar:
+        print("\n".join(nombres))
+        return 0
+    if not nombres:
+        parser.error(f"Ningún caso coincide con '{args.filtro}'")
+
+    parametros = {"usuario": "bench", "anios": args.anios, "alimentos": args.alimentos,
+                  "consumos_por_dia": args.consumos_por_dia, "semilla": args.semilla}
+    temporal = None
+    directorio = args.datos
+    if directorio is None:
+        temporal = tempfile.TemporaryDirectory(prefix="calorias_bench_")
+        directorio = temporal.name
+    directorio = os.path.abspath(directorio)
+
+    print(f"Preparando datos en {directorio} ...")
+    if not nucleo.preparar_datos(directorio, parametros):
+        print("  (datos reutilizados)")
+
+    ctx = nucleo.Contexto(directorio, parametros).abrir()
+    try:
+        print(f"Ejecutando {len(nombres)} casos ({args.repeticiones} repeticiones):")
+        resultados = nucleo.ejecutar_casos(ctx, nombres, args.repeticiones)
+    finally:
+        ctx.cerrar()
+        if temporal is not None:
+            temporal.cleanup()
+
+    if args.salida:
+        nucleo.guardar_baseline(args.salida, parametros, resultados)
+
+    if args.guardar_baseline:
+        baseline = nucleo.cargar_baseline(args.baseline)
+        casos = dict(baseline["casos"]) if baseline and baseline.get("parametros") == parametros \
+            and baseline.get("entorno") == nucleo.entorno() else {}
+        casos.update(resultados)
+        nucleo.guardar_baseline(args.baseline, parametros, casos)
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+
+    baseline = nucleo.cargar_baseline(args.baseline)
+    if baseline is None:
+        print(f"ERROR: sin línea base en {args.baseline}: use --guardar-baseline"
+              f"{' --baseline-local' if args.baseline_local else ''} para crearla")
+        return 2
+    if baseline.get("entorno") != nucleo.entorno() or baseline.get("parametros") != parametros:
+        print(f"ERROR: la línea base {args.baseline} se tomó en otra máquina o con otros parámetros de datos "
+              "y no es comparable.")
+        print(f"  Esta máquina: {nucleo.entorno()}; la de la línea base: {baseline.get('entorno')}")
+        if not args.baseline_local:
+            print("  Cree una línea base local en la versión de referencia (--guardar-baseline --baseline-local)"
+                  " y compare con --baseline-local")
+        return 2
+
+    regresiones = nucleo.comparar(resultados, baseline, args.tolerancia)
+    if not regresiones:
+        print(f"Sin regresiones (tolerancia {args.tolerancia:.0%})")
+        return 0
+    print(f"REGRESIONES (tolerancia {args.tolerancia:.0%}):")
+    for nombre, antes, ahora, unidad in regresiones:
+        medida = "mín" if unidad == "ms" else "retiene"
+        print(f"  {nombre:<40} {medida} {antes:10.3f} {unidad} -> {ahora:10.3f} {unidad}  (+{ahora / antes - 1:.0%})")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# bench_api.py
+# Endpoints de la API llamados en proceso (httpx + ASGI), con middleware,
+# autenticación y base SQLite reales.
+
+from datetime import date, timedelta
+from benchmarks.nucleo import caso
+from controller.API.alimentos.api_alimentos import _etag
+from benchmarks.datos_sinteticos import nombres_alimentos
+
+def _ok(respuesta, estado=200):
+    assert respuesta.status_code == estado, f"{respuesta.status_code}: {respuesta.text[:200]}"
+    return respuesta
+
+def _anio():
+    hasta = date.today()
+    return {"fecha_desde": str(hasta - timedelta(days=365)), "fecha_hasta": str(hasta)}
+
+@caso("api.alimentos_completo")
+async def alimentos_completo(ctx):
+    _ok(await ctx.cliente.get("/alimentos"))
+
+@caso("api.alimentos_columnar")
+async def alimentos_columnar(ctx):
+    _ok(await ctx.cliente.get("/alimentos", params={"formato": "columnar"}))
+
+@caso("api.alimentos_delta")
+async def alimentos_delta(ctx):
+    _ok(await ctx.cliente.get("/alimentos", params={"since": max(0, ctx.parametros["alimentos"] - 10)}))
+
+@caso("api.alimentos_no_modificado")
+async def alimentos_no_modificado(ctx):
+    # La versión del catálogo sintético es el número de alimentos
+    etag = _etag(ctx.parametros["alimentos"])
+    _ok(await ctx.cliente.get("/alimentos", headers={"If-None-Match": etag}), 304)
+
+@caso("api.consultar_alimento")
+async def consultar_alimento(ctx):
+    nombre = nombres_alimentos(ctx.parametros["alimentos"])[-1]
+    _ok(await ctx.cliente.post("/consultar-alimento", json={"nombre": nombre}))
+
+@caso("api.historial_anual")
+async def historial_anual(ctx):
+    _ok(await ctx.cliente.get("/historial", params=_anio()))
+
+@caso("api.historial_anual_columnar")
+async def historial_anual_columnar(ctx):
+    _ok(await ctx.cliente.get("/historial", params={**_anio(), "formato": "columnar"}))
+
+@caso("api.resumen_diario")
+async def resumen_diario(ctx):
+    _ok(await ctx.cliente.get(f"/resumen-diario/{date.today()}"))
+
+@caso("api.registrar_consumo")
+async def registrar_consumo(ctx):
+    _ok(await ctx.cliente.post("/registrar-consumo", json={"consumo": {
+        "nombre": "Pollo a la plancha", "fecha": str(date.today()), "hora": "13:30",
+        "cantidad": 1.0, "total_cal": 240.0,
+    }}), 201)
+
+@caso("api.peso_lista")
+async def peso_lista(ctx):
+    _ok(await ctx.cliente.get("/peso/"))
+
+@caso("api.peso_estadisticas")
+async def peso_estadisticas(ctx):
+    _ok(await ctx.cliente.get("/peso/estadisticas/"))
+
+@caso("api.registrar_peso")
+async def registrar_peso(ctx):
+    _ok(await ctx.cliente.post("/peso/", json={"fecha": date.today().strftime("%d-%m-%y"), "peso": 77.5}), 201)
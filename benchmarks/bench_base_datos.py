@@ -0,0 +1,95 @@
+# bench_base_datos.py
+# Rendimiento de escritura contra el app.db de los datos sintéticos (SQLite
+# en fichero, WAL): ESCRITURAS_CONCURRENTES transacciones a la vez, como las
+# de varios clientes registrando consumos, cada una con un INSERT y su
+# commit. La misma carga se mide con:
+#
+#   base_datos.escrituras_sincronas        motor síncrono y sesiones en hilos,
+#                                          como la API antes del motor asíncrono
+#   base_datos.escrituras_async_pool_NN    motor asíncrono (crear_motor) con
+#                                          pool_size N, serializado por SesionSQLite
+#
+# Se informa en escrituras por segundo (op/s). Las filas se escriben para un
+# usuario aparte y se borran al final de cada ronda: app.db no crece entre
+# ejecuciones y los datos del usuario sintético no cambian.
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from benchmarks.nucleo import caso
+from controller.API.database import SesionSQLite, crear_motor, settings
+from controller.API.alimentos.api_alimentos import ConsumoDiario
+
+ESCRITURAS_CONCURRENTES = 200
+USUARIO_ESCRITURAS = "bench_escrituras"
+# Hilos con que anyio atiende los endpoints síncronos
+HILOS_SINCRONOS = 40
+TAMANOS_POOL = (1, 5, 20)
+
+def _consumo(i):
+    return ConsumoDiario(usuario=USUARIO_ESCRITURAS, nombre="Pollo a la plancha", fecha=date.today(),
+                         hora="13:30", cantidad=1.0, total_cal=200.0 + i % 50)
+
+def _ruta_db(ctx):
+    return os.path.join(ctx.directorio, "app.db")
+
+# --- Motor síncrono ---
+def _sesiones_sincronas(ctx):
+    def crear():
+        motor = create_engine(f"sqlite:///{_ruta_db(ctx)}", connect_args={"check_same_thread": False})
+
+        @event.listens_for(motor, "connect")
+        def _configurar(conexion_dbapi, _registro):
+            conexion_dbapi.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+
+        return sessionmaker(bind=motor, autoflush=False), ThreadPoolExecutor(HILOS_SINCRONOS)
+
+    def cerrar(valor):
+        sesiones, hilos = valor
+        hilos.shutdown()
+        sesiones.kw["bind"].dispose()
+    return ctx.memo("base_datos.sincrono", crear, cerrar)
+
+@caso("base_datos.escrituras_sincronas", operaciones=ESCRITURAS_CONCURRENTES)
+def escrituras_sincronas(ctx):
+    sesiones, hilos = _sesiones_sincronas(ctx)
+
+    def escribir(i):
+        with sesiones() as db:
+            db.add(_consumo(i))
+            db.commit()
+    list(hilos.map(escribir, range(ESCRITURAS_CONCURRENTES)))
+    with sesiones() as db:
+        db.execute(delete(ConsumoDiario).where(ConsumoDiario.usuario == USUARIO_ESCRITURAS))
+        db.commit()
+
+# --- Motor asíncrono ---
+def _sesiones_asincronas(ctx, tamano_pool):
+    def crear():
+        motor = crear_motor(f"sqlite:///{_ruta_db(ctx)}", pool_size=tamano_pool)
+        return async_sessionmaker(motor, class_=SesionSQLite, expire_on_commit=False, autoflush=False)
+    return ctx.memo(("base_datos.async", tamano_pool), crear, lambda sesiones: sesiones.kw["bind"].dispose())
+
+async def _escrituras_async(ctx, tamano_pool):
+    sesiones = _sesiones_asincronas(ctx, tamano_pool)
+
+    async def escribir(i):
+        async with sesiones() as db:
+            db.add(_consumo(i))
+            await db.commit()
+    await asyncio.gather(*(escribir(i) for i in range(ESCRITURAS_CONCURRENTES)))
+    async with sesiones() as db:
+        await db.execute(delete(ConsumoDiario).where(ConsumoDiario.usuario == USUARIO_ESCRITURAS))
+        await db.commit()
+
+def _registrar_casos_async(tamano_pool):
+    @caso(f"base_datos.escrituras_async_pool_{tamano_pool:02d}", operaciones=ESCRITURAS_CONCURRENTES)
+    async def escrituras_async(ctx):
+        await _escrituras_async(ctx, tamano_pool)
+
+for _tamano in TAMANOS_POOL:
+    _registrar_casos_async(_tamano)
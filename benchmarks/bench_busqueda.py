@@ -0,0 +1,49 @@
+# bench_busqueda.py
+# Buscador de alimentos sobre el catálogo completo y copia local del catálogo.
+
+import json
+import os
+from benchmarks.nucleo import caso
+from model.registrar_alimento.catalogo_cache import CatalogoAlimentosCache
+from model.registrar_alimento.searchmanager import buscar_coincidencias
+
+def _catalogo(ctx):
+    """Lista de alimentos de GET /alimentos, pedida una vez."""
+    def pedir():
+        respuesta = ctx.ejecutar(ctx.cliente.get("/alimentos"))
+        respuesta.raise_for_status()
+        return respuesta.json(), int(respuesta.headers["X-Catalogo-Version"])
+    return ctx.memo("busqueda.catalogo", pedir)
+
+def _ruta_copia(ctx):
+    """Copia en disco del catálogo con el formato de CatalogoAlimentosCache."""
+    def escribir():
+        alimentos, version = _catalogo(ctx)
+        ruta = os.path.join(ctx.directorio, "cache", "catalogo_bench.json")
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            json.dump({"version": version, "etag": None, "alimentos": alimentos}, archivo, ensure_ascii=False)
+        return ruta
+    return ctx.memo("busqueda.ruta_copia", escribir)
+
+def _nombres(ctx):
+    return ctx.memo("busqueda.nombres", lambda: [a["nombre"] for a in _catalogo(ctx)[0]])
+
+@caso("busqueda.coincidencias_texto")
+def coincidencias_texto(ctx):
+    buscar_coincidencias(_nombres(ctx), "pollo a la")
+
+@caso("busqueda.coincidencias_una_letra")
+def coincidencias_una_letra(ctx):
+    # Primera tecla: casi todo el catálogo coincide
+    buscar_coincidencias(_nombres(ctx), "a")
+
+@caso("busqueda.catalogo_cargar_copia")
+def catalogo_cargar_copia(ctx):
+    CatalogoAlimentosCache("http://bench", ruta=_ruta_copia(ctx))
+
+@caso("busqueda.catalogo_nombres")
+def catalogo_nombres(ctx):
+    catalogo = ctx.memo("busqueda.copia", lambda: CatalogoAlimentosCache("http://bench", ruta=_ruta_copia(ctx)))
+    catalogo._nombres = None
+    catalogo.nombres()
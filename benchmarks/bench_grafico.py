@@ -0,0 +1,32 @@
+# bench_grafico.py
+# Agregación de los datos de la sección de gráficos para el último año.
+
+from benchmarks.nucleo import caso
+from model.grafico.database_manager import ChartDataManager
+from model.grafico.api_grafico import APICaloriesDataManager
+from model.util.registros import consumos_de_columnas
+from benchmarks.bench_historial import historial_columnar
+
+@caso("grafico.agua_anual")
+def agua_anual(ctx):
+    ChartDataManager(ctx.usuario).get_water_data("Último año")
+
+@caso("grafico.peso_anual")
+def peso_anual(ctx):
+    ChartDataManager(ctx.usuario).get_weight_data("Último año")
+
+def _proveedor_con_cache(ctx):
+    # Como con /events conectado: los consumos del año ya están en memoria y
+    # se mide solo la suma por día que hace get_calories_data
+    proveedor = APICaloriesDataManager()
+    proveedor.usar_cache = True
+    desde, hasta, cuerpo = historial_columnar(ctx)
+    proveedor._desde, proveedor._hasta = desde, hasta
+    proveedor._consumos = {consumo.id: consumo for consumo in consumos_de_columnas(cuerpo)}
+    return proveedor
+
+@caso("grafico.calorias_anual_desde_cache")
+def calorias_anual(ctx):
+    proveedor = ctx.memo("grafico.proveedor", lambda: _proveedor_con_cache(ctx))
+    labels, data = proveedor.get_calories_data("Último año")
+    assert data, "El proveedor debía responder desde la caché"
@@ -0,0 +1,33 @@
+# bench_historial.py
+# Trabajo del cliente en Historial.aplicar_filtros con un año de consumos:
+# decodificar la respuesta columnar y darle formato para la tabla, y la
+# memoria que ocupa lo que la sección mantiene mientras está abierta.
+
+import json
+from datetime import date, timedelta
+from benchmarks.nucleo import caso
+from controller.historial.historial import formatear_consumos_para_tabla
+from model.util.registros import consumos_de_columnas
+
+def historial_columnar(ctx):
+    """(desde, hasta, cuerpo) de /historial?formato=columnar para el último año, pedido una vez."""
+    def pedir():
+        hasta = date.today()
+        desde = hasta - timedelta(days=365)
+        respuesta = ctx.ejecutar(ctx.cliente.get("/historial", params={
+            "fecha_desde": str(desde), "fecha_hasta": str(hasta), "formato": "columnar"}))
+        respuesta.raise_for_status()
+        return str(desde), str(hasta), respuesta.json()
+    return ctx.memo("historial.columnar", pedir)
+
+@caso("historial.decodificar_y_formatear_anual")
+def decodificar_y_formatear(ctx):
+    cuerpo = ctx.memo("historial.cuerpo", lambda: json.dumps(historial_columnar(ctx)[2]).encode())
+    formatear_consumos_para_tabla(consumos_de_columnas(json.loads(cuerpo)))
+
+@caso("historial.memoria_anual", memoria=True)
+def memoria_anual(ctx):
+    # Consumos y filas de la tabla de un año, como los guarda Historial
+    cuerpo = ctx.memo("historial.cuerpo", lambda: json.dumps(historial_columnar(ctx)[2]).encode())
+    consumos = consumos_de_columnas(json.loads(cuerpo))
+    return consumos, formatear_consumos_para_tabla(consumos)
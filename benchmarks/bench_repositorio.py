@@ -0,0 +1,21 @@
+# bench_repositorio.py
+# Consultas de los repositorios locales sobre la base SQLite del usuario.
+
+from benchmarks.nucleo import caso
+from model.configuracion.consultas import obtener_datos_usuario
+from controller.recordatorio.recordatorio_core import PlanificadorRecordatorios, Recordatorio
+
+@caso("repositorio.obtener_datos_usuario")
+def datos_usuario(ctx):
+    # Último peso ordenando por la fecha DD-MM-YYYY de todo el historial
+    obtener_datos_usuario(ctx.usuario)
+
+@caso("repositorio.cargar_recordatorios")
+def cargar_recordatorios(ctx):
+    # Lectura del planificador al iniciar sesión: solo la ventana de las
+    # próximas horas, por el índice (Usuario, due_at)
+    PlanificadorRecordatorios(ctx.usuario).cargar()
+
+@caso("repositorio.recordar_actualizar_peso")
+def recordar_actualizar_peso(ctx):
+    Recordatorio(ctx.usuario).recordar_actualizar_peso()
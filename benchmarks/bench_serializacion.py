@@ -0,0 +1,96 @@
+# bench_serializacion.py
+# Tiempo de consulta + serialización de /historial por cada 10.000 filas:
+# camino ORM + Pydantic + json (response_model) frente a tuplas + orjson
+# (FilasJSONResponse).
+#
+#   python -m benchmarks.bench_serializacion [filas]
+
+import asyncio
+import json
+import sys
+import time
+from datetime import date, timedelta
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from controller.API.database import Base, crear_motor
+from controller.API.alimentos.api_alimentos import ConsumoDiario, ConsumoPublic
+from controller.API.respuestas import FilasJSONResponse, columnas_de
+
+REPETICIONES = 5
+
+async def _poblar(motor, filas):
+    async with motor.begin() as conexion:
+        await conexion.run_sync(Base.metadata.create_all)
+        inicio = date(2024, 1, 1)
+        await conexion.execute(insert(ConsumoDiario), [
+            {
+                "usuario": "bench",
+                "nombre": f"Alimento {i % 300}",
+                "fecha": inicio + timedelta(days=i % 365),
+                "hora": f"{i % 24:02d}:{i % 60:02d}",
+                "cantidad": 1.0 + i % 5,
+                "total_cal": 50.0 + i % 700,
+            }
+            for i in range(filas)
+        ])
+
+def _mejor(medidas):
+    return min(medidas) * 1000
+
+async def medir(filas=10_000):
+    motor = crear_motor("sqlite+aiosqlite://")
+    await _poblar(motor, filas)
+    adaptador = TypeAdapter(List[ConsumoPublic])
+    orden = (ConsumoDiario.fecha, ConsumoDiario.hora, ConsumoDiario.id)
+
+    orm_consulta, orm_serializa, filas_consulta, filas_serializa = [], [], [], []
+    for _ in range(REPETICIONES):
+        # Camino de response_model: objetos ORM -> modelos Pydantic -> json
+        async with AsyncSession(motor) as sesion:
+            t0 = time.perf_counter()
+            objetos = (await sesion.scalars(select(ConsumoDiario).order_by(*orden))).all()
+            t1 = time.perf_counter()
+            validados = adaptador.validate_python(objetos, from_attributes=True)
+            cuerpo_orm = json.dumps(adaptador.dump_python(validados, mode="json")).encode()
+            t2 = time.perf_counter()
+            orm_consulta.append(t1 - t0)
+            orm_serializa.append(t2 - t1)
+
+        # Camino rápido: tuplas de columnas -> orjson
+        async with AsyncSession(motor) as sesion:
+            t0 = time.perf_counter()
+            resultado = await sesion.execute(columnas_de(ConsumoDiario, ConsumoPublic).order_by(*orden))
+            t1 = time.perf_counter()
+            cuerpo_filas = FilasJSONResponse(resultado).body
+            t2 = time.perf_counter()
+            filas_consulta.append(t1 - t0)
+            filas_serializa.append(t2 - t1)
+    await motor.dispose()
+
+    assert json.loads(cuerpo_orm) == json.loads(cuerpo_filas), "Las dos rutas deben producir el mismo JSON"
+    escala = 10_000 / filas
+    return {
+        "orm_pydantic_json": {
+            "consulta_ms": _mejor(orm_consulta) * escala,
+            "serializacion_ms": _mejor(orm_serializa) * escala,
+        },
+        "filas_orjson": {
+            "consulta_ms": _mejor(filas_consulta) * escala,
+            "serializacion_ms": _mejor(filas_serializa) * escala,
+        },
+    }
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    filas = int(argv[0]) if argv else 10_000
+    resultados = asyncio.run(medir(filas))
+    print(f"Tiempos por 10.000 filas (mejor de {REPETICIONES}, {filas} filas medidas):")
+    for camino, tiempos in resultados.items():
+        total = tiempos["consulta_ms"] + tiempos["serializacion_ms"]
+        print(f"  {camino:<18} consulta {tiempos['consulta_ms']:7.1f} ms   "
+              f"serialización {tiempos['serializacion_ms']:7.1f} ms   total {total:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# bench_transferencia.py
+# Bytes transferidos y tiempo de decodificación en el cliente para un año de
+# historial (/historial), según formato (filas / columnar) y compresión
+# (sin comprimir / gzip / brotli). Las peticiones pasan por la aplicación real,
+# middleware de compresión incluido, con una base SQLite temporal.
+#
+#   python -m benchmarks.bench_transferencia [consumos_por_dia]
+
+import asyncio
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from controller.API.database import Base, SesionSQLite, crear_motor, get_db
+from controller.API.gateway import app
+from controller.API.alimentos.api_alimentos import ConsumoDiario
+from model.util.registros import consumos_de_columnas
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REPETICIONES = 20
+
+def _descomprimir(codificacion, cuerpo):
+    if codificacion == "gzip":
+        return gzip.decompress(cuerpo)
+    if codificacion == "br":
+        return brotli.decompress(cuerpo)
+    return cuerpo
+
+def _decodificar(codificacion, formato, cuerpo):
+    datos = json.loads(_descomprimir(codificacion, cuerpo))
+    return consumos_de_columnas(datos) if formato == "columnar" else datos
+
+async def medir(consumos_por_dia=6):
+    with tempfile.TemporaryDirectory() as directorio:
+        motor = crear_motor(f"sqlite:///{os.path.join(directorio, 'bench.db')}")
+        sesiones = async_sessionmaker(motor, class_=SesionSQLite, expire_on_commit=False)
+
+        async def get_db_bench():
+            async with sesiones() as db:
+                yield db
+
+        hoy = date.today()
+        async with motor.begin() as conexion:
+            await conexion.run_sync(Base.metadata.create_all)
+            await conexion.execute(insert(ConsumoDiario), [
+                {
+                    "usuario": None,
+                    "nombre": f"Alimento {(dia * 7 + i) % 120}",
+                    "fecha": hoy - timedelta(days=dia),
+                    "hora": f"{8 + i * 2:02d}:{(dia * 13) % 60:02d}",
+                    "cantidad": float(1 + (dia + i) % 3),
+                    "total_cal": round(80 + ((dia * 31 + i * 17) % 600) * 1.1, 1),
+                }
+                for dia in range(365) for i in range(consumos_por_dia)
+            ])
+
+        app.dependency_overrides[get_db] = get_db_bench
+        codificaciones = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+        params = {"fecha_desde": str(hoy - timedelta(days=365)), "fecha_hasta": str(hoy)}
+        resultados = []
+        try:
+            transporte = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+                for formato in ("filas", "columnar"):
+                    for codificacion in codificaciones:
+                        cabeceras = {"Accept-Encoding": codificacion}
+                        async with cliente.stream("GET", "/historial", headers=cabeceras,
+                                                  params={**params, "formato": formato}) as respuesta:
+                            cuerpo = b"".join([parte async for parte in respuesta.aiter_raw()])
+                            recibida = respuesta.headers.get("content-encoding", "identity")
+                        assert recibida == codificacion, (codificacion, recibida)
+
+                        tiempos = []
+                        for _ in range(REPETICIONES):
+                            t0 = time.perf_counter()
+                            filas = _decodificar(recibida, formato, cuerpo)
+                            tiempos.append(time.perf_counter() - t0)
+                        resultados.append({
+                            "formato": formato,
+                            "codificacion": codificacion,
+                            "bytes": len(cuerpo),
+                            "decodificacion_ms": min(tiempos) * 1000,
+                            "filas": len(filas),
+                        })
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            await motor.dispose()
+    return resultados
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    consumos_por_dia = int(argv[0]) if argv else 6
+    resultados = asyncio.run(medir(consumos_por_dia))
+    base = resultados[0]["bytes"]
+    print(f"Historial de un año ({resultados[0]['filas']} consumos), decodificación = mejor de {REPETICIONES}:")
+    for r in resultados:
+        print(f"  {r['formato']:<9} {r['codificacion']:<9} {r['bytes']:>9,} bytes "
+              f"({r['bytes'] / base:6.1%})   decodificación {r['decodificacion_ms']:6.2f} ms")
+
+if __name__ == "__main__":
+    main()
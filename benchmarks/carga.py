@@ -0,0 +1,354 @@
+# carga.py
+# Generador de carga: muchos clientes de escritorio concurrentes repitiendo el
+# recorrido habitual contra la API (inicio de sesión -> sincronizar catálogo ->
+# registrar alimentos -> abrir historial -> gráfico), con tiempos de espera
+# entre acciones como los de un usuario real.
+#
+#   python -m benchmarks.carga                              servidor uvicorn en proceso, base temporal
+#   python -m benchmarks.carga --clientes 200 --duracion 60 --pensar 2
+#   python -m benchmarks.carga --url http://127.0.0.1:8000  contra un gateway ya lanzado
+#
+# El servidor en proceso corre en un hilo propio y comparte el GIL con los
+# clientes: sirve para comparar versiones sin red ni servicios externos. Para
+# medir la capacidad real conviene lanzar el gateway aparte (con sus workers)
+# y usar --url.
+#
+# Informa rendimiento (peticiones/s y sesiones/min), percentiles de latencia y
+# tasa de errores por operación. Sale con código 1 si la tasa de errores
+# supera --max-errores.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+import httpx
+
+CONTRASENA = "carga-1234"
+# Días que abarca el gráfico según el periodo elegido en la GUI
+PERIODOS_GRAFICO = [7, 30, 90, 365]
+
+class Estadisticas:
+    """Latencias y errores por operación durante la ventana de medición."""
+
+    def __init__(self):
+        self.latencias = {}
+        self.errores = {}
+        self.sesiones = 0
+        self.inicio = None
+        self.fin = None
+
+    def registrar(self, operacion, duracion_ms, error=None):
+        if error is None:
+            self.latencias.setdefault(operacion, []).append(duracion_ms)
+        else:
+            self.errores.setdefault(operacion, Counter())[error] += 1
+
+    def resumen(self):
+        duracion = max((self.fin or time.perf_counter()) - self.inicio, 1e-9)
+        operaciones = {}
+        for nombre in sorted(set(self.latencias) | set(self.errores)):
+            tiempos = sorted(self.latencias.get(nombre, []))
+            errores = sum(self.errores.get(nombre, Counter()).values())
+            total = len(tiempos) + errores
+            operaciones[nombre] = {
+                "peticiones": total,
+                "errores": errores,
+                "tasa_errores": round(errores / total, 4),
+                "por_segundo": round(total / duracion, 2),
+                **{f"p{p}_ms": round(_percentil(tiempos, p), 2) if tiempos else None for p in (50, 90, 95, 99)},
+                "max_ms": round(tiempos[-1], 2) if tiempos else None,
+                "detalle_errores": dict(self.errores.get(nombre, {})),
+            }
+        peticiones = sum(o["peticiones"] for o in operaciones.values())
+        errores = sum(o["errores"] for o in operaciones.values())
+        todas = sorted(t for tiempos in self.latencias.values() for t in tiempos)
+        return {
+            "duracion_s": round(duracion, 2),
+            "sesiones": self.sesiones,
+            "sesiones_por_minuto": round(self.sesiones * 60 / duracion, 1),
+            "peticiones": peticiones,
+            "por_segundo": round(peticiones / duracion, 2),
+            "errores": errores,
+            "tasa_errores": round(errores / peticiones, 4) if peticiones else 0.0,
+            **{f"p{p}_ms": round(_percentil(todas, p), 2) if todas else None for p in (50, 90, 95, 99)},
+            "operaciones": operaciones,
+        }
+
+def _percentil(ordenados, p):
+    # Rango más cercano
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+class ClienteEscritorio:
+    """
+    Un cliente de la GUI: una conexión reutilizada (como sesion_api()), su
+    copia del catálogo con versión y ETag, y el usuario con el que inicia sesión.
+    """
+
+    def __init__(self, base_url, usuario, estadisticas, pensar, azar, timeout):
+        self.usuario = usuario
+        self.estadisticas = estadisticas
+        self.pensar = pensar
+        self.azar = azar
+        self.http = httpx.AsyncClient(base_url=base_url, timeout=timeout)
+        self.nombres = []
+        self.version = None
+        self.etag = None
+        self.midiendo = False
+
+    async def pedir(self, operacion, metodo, ruta, esperados=(200,), **kwargs):
+        """Hace la petición y registra su latencia; devuelve la respuesta o None si falló."""
+        inicio = time.perf_counter()
+        try:
+            respuesta = await self.http.request(metodo, ruta, **kwargs)
+        except httpx.HTTPError as e:
+            error, respuesta = type(e).__name__, None
+        else:
+            error = None if respuesta.status_code in esperados else f"HTTP {respuesta.status_code}"
+        if self.midiendo:
+            self.estadisticas.registrar(operacion, (time.perf_counter() - inicio) * 1000, error)
+        return respuesta if error is None else None
+
+    async def esperar(self):
+        if self.pensar > 0:
+            await asyncio.sleep(self.azar.expovariate(1 / self.pensar))
+
+    async def sesion(self):
+        """Un uso completo de la aplicación. Devuelve False si no pudo iniciar sesión."""
+        respuesta = await self.pedir("login", "POST", "/login/",
+                                     data={"username": self.usuario, "password": CONTRASENA})
+        if respuesta is None:
+            return False
+        self.http.headers["Authorization"] = f"Bearer {respuesta.json()['access_token']}"
+        hoy = date.today()
+
+        # Ventana principal: estado del servidor, catálogo y calorías del día
+        await self.pedir("inicio.estado", "GET", "/")
+        await self.sincronizar_catalogo()
+        await self.pedir("inicio.resumen_diario", "GET", f"/resumen-diario/{hoy}", esperados=(200, 404))
+        await self.esperar()
+
+        # Registrar alimentos
+        for _ in range(self.azar.randint(1, 3)):
+            if not self.nombres:
+                break
+            nombre = self.azar.choice(self.nombres)
+            consulta = await self.pedir("registrar.consultar_alimento", "POST", "/consultar-alimento",
+                                        json={"nombre": nombre})
+            if consulta is not None:
+                cantidad = self.azar.randint(1, 3)
+                calorias = (consulta.json().get("calorias_porcion") or 100.0) * cantidad
+                await self.pedir("registrar.registrar_consumo", "POST", "/registrar-consumo", esperados=(201,),
+                                 json={"consumo": {"nombre": nombre, "fecha": str(hoy),
+                                                   "hora": time.strftime("%H:%M"),
+                                                   "cantidad": float(cantidad), "total_cal": calorias}})
+                await self.pedir("registrar.resumen_diario", "GET", f"/resumen-diario/{hoy}")
+            await self.esperar()
+
+        # Historial del último mes y gráfico de un periodo al azar
+        await self.pedir("historial", "GET", "/historial", params={
+            "fecha_desde": str(hoy - timedelta(days=30)), "fecha_hasta": str(hoy), "formato": "columnar"})
+        await self.esperar()
+        dias = self.azar.choice(PERIODOS_GRAFICO)
+        await self.pedir("grafico", "GET", "/historial", params={
+            "fecha_desde": str(hoy - timedelta(days=dias)), "fecha_hasta": str(hoy), "formato": "columnar"})
+        await self.esperar()
+
+        self.http.headers.pop("Authorization", None)
+        return True
+
+    async def sincronizar_catalogo(self):
+        # Como CatalogoAlimentosCache: completo la primera vez, después solo los cambios
+        if self.version is None:
+            respuesta = await self.pedir("inicio.catalogo", "GET", "/alimentos", params={"formato": "columnar"})
+        else:
+            respuesta = await self.pedir("inicio.catalogo", "GET", "/alimentos", esperados=(200, 304),
+                                         params={"since": self.version, "formato": "columnar"},
+                                         headers={"If-None-Match": self.etag or ""})
+        if respuesta is None or respuesta.status_code == 304:
+            return
+        self.nombres.extend(respuesta.json().get("nombre", []))
+        self.version = int(respuesta.headers.get("X-Catalogo-Version", 0))
+        self.etag = respuesta.headers.get("ETag")
+
+    async def cerrar(self):
+        await self.http.aclose()
+
+async def preparar(base_url, usuarios, alimentos, dias_previos, semilla):
+    """
+    Registra los usuarios, completa el catálogo y siembra `dias_previos` días
+    de consumos por usuario, todo a través de la API (sirve también con --url).
+    """
+    from benchmarks.datos_sinteticos import nombres_alimentos
+
+    azar = random.Random(semilla)
+    limite = asyncio.Semaphore(16)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+        async def enviar(metodo, ruta, **kwargs):
+            async with limite:
+                respuesta = await http.request(metodo, ruta, **kwargs)
+            # 400: el usuario o el alimento ya existían de una ejecución anterior
+            if respuesta.status_code not in (200, 201, 400):
+                respuesta.raise_for_status()
+            return respuesta
+
+        await asyncio.gather(*(enviar("POST", "/register/", json={
+            "nombre_usuario": usuario, "password": CONTRASENA, "sexo": "Masculino", "peso": 75.0,
+            "altura": 175, "meta_calorias": 2200, "nivel_actividad": "Moderado",
+            "fecha_nacimiento": "1995-01-01", "edad": 30,
+        }) for usuario in usuarios))
+
+        existentes = set((await enviar("GET", "/alimentos", params={"formato": "columnar"})).json().get("nombre", []))
+        nuevos = [n for n in nombres_alimentos(alimentos) if n not in existentes]
+        await asyncio.gather(*(enviar("POST", "/alimentos", json={
+            "nombre": nombre, "calorias_100gr": round(azar.uniform(15, 600), 1),
+            "calorias_porcion": round(azar.uniform(20, 900), 1),
+        }) for nombre in nuevos))
+
+        if dias_previos:
+            nombres = nombres_alimentos(alimentos)
+            hoy = date.today()
+
+            async def sembrar(usuario):
+                token = (await enviar("POST", "/login/",
+                                      data={"username": usuario, "password": CONTRASENA})).json()["access_token"]
+                cabeceras = {"Authorization": f"Bearer {token}"}
+                for dia in range(dias_previos, 0, -1):
+                    for hora in ("08:30", "13:30", "20:30"):
+                        await enviar("POST", "/registrar-consumo", headers=cabeceras, json={"consumo": {
+                            "nombre": azar.choice(nombres), "fecha": str(hoy - timedelta(days=dia)),
+                            "hora": hora, "cantidad": 1.0, "total_cal": round(azar.uniform(60, 750), 1)}})
+            await asyncio.gather(*(sembrar(usuario) for usuario in usuarios))
+
+async def ejecutar(base_url, clientes, duracion, pensar, rampa, usuarios, semilla, timeout):
+    estadisticas = Estadisticas()
+    fin = None
+
+    async def cliente(i):
+        # Cada cliente arranca en un momento distinto de la rampa, como usuarios que abren la app
+        await asyncio.sleep(rampa * i / max(clientes, 1))
+        escritorio = ClienteEscritorio(base_url, usuarios[i % len(usuarios)], estadisticas,
+                                       pensar, random.Random(semilla + i), timeout)
+        try:
+            while time.perf_counter() < fin:
+                escritorio.midiendo = time.perf_counter() >= estadisticas.inicio
+                if await escritorio.sesion():
+                    if escritorio.midiendo:
+                        estadisticas.sesiones += 1
+                else:
+                    await asyncio.sleep(1)
+        finally:
+            await escritorio.cerrar()
+
+    # Solo se mide después de la rampa, con todos los clientes activos
+    estadisticas.inicio = time.perf_counter() + rampa
+    fin = estadisticas.inicio + duracion
+    await asyncio.gather(*(cliente(i) for i in range(clientes)))
+    estadisticas.fin = min(time.perf_counter(), fin)
+    return estadisticas.resumen()
+
+class ServidorEnProceso:
+    """Gateway servido por uvicorn en un hilo, con una base SQLite temporal."""
+
+    def __init__(self):
+        self.directorio = tempfile.TemporaryDirectory(prefix="calorias_carga_")
+        # Settings se lee al importar controller.API: la base se elige antes
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(self.directorio.name, 'app.db')}"
+        self.servidor = None
+        self.hilo = None
+        self.url = None
+
+    def __enter__(self):
+        import uvicorn
+        from controller.API.gateway import app
+
+        with socket.socket() as libre:
+            libre.bind(("127.0.0.1", 0))
+            puerto = libre.getsockname()[1]
+        self.servidor = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=puerto, log_level="warning"))
+        self.hilo = threading.Thread(target=self.servidor.run, name="uvicorn-carga", daemon=True)
+        self.hilo.start()
+        while not self.servidor.started:
+            if not self.hilo.is_alive():
+                raise RuntimeError("El servidor en proceso no pudo arrancar")
+            time.sleep(0.05)
+        self.url = f"http://127.0.0.1:{puerto}"
+        return self
+
+    def __exit__(self, *_exc):
+        self.servidor.should_exit = True
+        self.hilo.join(timeout=10)
+        self.directorio.cleanup()
+
+def imprimir(resumen):
+    print(f"\n{resumen['sesiones']} sesiones en {resumen['duracion_s']} s "
+          f"({resumen['sesiones_por_minuto']}/min), {resumen['peticiones']} peticiones "
+          f"({resumen['por_segundo']}/s), errores {resumen['errores']} ({resumen['tasa_errores']:.2%})")
+    print(f"{'Operación':<30} {'n':>7} {'/s':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'máx':>8} {'errores':>8}")
+    for nombre, o in resumen["operaciones"].items():
+        ms = [f"{o[c]:8.1f}" if o[c] is not None else f"{'-':>8}"
+              for c in ("p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms")]
+        print(f"{nombre:<30} {o['peticiones']:>7} {o['por_segundo']:>8.1f} {' '.join(ms)} {o['errores']:>8}")
+        for error, cantidad in o["detalle_errores"].items():
+            print(f"{'':<32}{error}: {cantidad}")
+    total = [f"{resumen[c]:8.1f}" if resumen[c] is not None else f"{'-':>8}"
+             for c in ("p50_ms", "p90_ms", "p95_ms", "p99_ms")]
+    print(f"{'TOTAL':<30} {resumen['peticiones']:>7} {resumen['por_segundo']:>8.1f} {' '.join(total)} "
+          f"{'':>8} {resumen['errores']:>8}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.carga", description="Prueba de carga de la API")
+    parser.add_argument("--url", help="Gateway ya lanzado; por defecto se levanta uno en proceso")
+    parser.add_argument("--clientes", type=int, default=20, help="Clientes de escritorio simultáneos")
+    parser.add_argument("--duracion", type=float, default=30, help="Segundos de medición")
+    parser.add_argument("--pensar", type=float, default=1.0,
+                        help="Espera media entre acciones de un usuario, en segundos (0 = sin esperas)")
+    parser.add_argument("--rampa", type=float, default=5, help="Segundos para ir arrancando los clientes")
+    parser.add_argument("--usuarios", type=int, help="Usuarios distintos (por defecto uno por cliente)")
+    parser.add_argument("--alimentos", type=int, default=500, help="Tamaño mínimo del catálogo")
+    parser.add_argument("--dias-previos", type=int, default=30, help="Días de consumos sembrados por usuario")
+    parser.add_argument("--timeout", type=float, default=30, help="Segundos antes de dar una petición por fallida")
+    parser.add_argument("--max-errores", type=float, default=0.01, help="Tasa de errores admitida (0.01 = 1%%)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Guarda el resumen en un JSON")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    usuarios = [f"carga_{i}" for i in range(args.usuarios or args.clientes)]
+
+    async def correr(base_url):
+        print(f"Preparando {len(usuarios)} usuarios y {args.alimentos} alimentos en {base_url} ...")
+        await preparar(base_url, usuarios, args.alimentos, args.dias_previos, args.semilla)
+        print(f"{args.clientes} clientes, {args.duracion:g} s de medición tras {args.rampa:g} s de rampa, "
+              f"espera media {args.pensar:g} s")
+        return await ejecutar(base_url, args.clientes, args.duracion, args.pensar, args.rampa,
+                              usuarios, args.semilla, args.timeout)
+
+    try:
+        if args.url:
+            resumen = asyncio.run(correr(args.url.rstrip("/")))
+        else:
+            with ServidorEnProceso() as servidor:
+                resumen = asyncio.run(correr(servidor.url))
+    except httpx.HTTPError as e:
+        print(f"No se pudo preparar la prueba: {e}")
+        return 1
+
+    imprimir(resumen)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"argumentos": vars(args), "resumen": resumen}, f, ensure_ascii=False, indent=2)
+    if resumen["tasa_errores"] > args.max_errores:
+        print(f"Tasa de errores por encima de {args.max_errores:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
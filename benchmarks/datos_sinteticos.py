@@ -0,0 +1,211 @@
+# datos_sinteticos.py
+# Generador de datos para los benchmarks: un usuario con varios años de
+# historial local (peso, agua, recordatorios) y en la API (consumo_diario,
+# peso), y un catálogo de alimentos de 10.000 a 1.000.000 de entradas.
+#
+#   python -m benchmarks.datos_sinteticos DESTINO [--anios 3] [--alimentos 100000]
+#
+# DESTINO hace de directorio de trabajo de la aplicación: la base local queda
+# en DESTINO/users/<usuario>/alimentos.db y la de la API en DESTINO/app.db.
+# Con la misma semilla se generan siempre los mismos datos.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert, select, update
+from controller.API.database import Base, SesionSQLite, crear_motor
+from controller.API.alimentos.api_alimentos import AlimentoPersonalizado, CatalogoVersion, ConsumoDiario
+from controller.API.peso.ApiPeso import Peso, PesoEstadisticas, recalcular_estadisticas
+from model.login.user_database import UserDatabase
+from controller.recordatorio.recordatorio_conexion import _asegurar_tabla_recordatorios
+
+ARCHIVO_PARAMETROS = "datos_sinteticos.json"
+
+BASES = [
+    "Pollo", "Arroz", "Manzana", "Pan", "Leche", "Huevo", "Avena", "Plátano", "Yogur", "Queso",
+    "Atún", "Salmón", "Lentejas", "Garbanzos", "Pasta", "Papa", "Tomate", "Lechuga", "Zanahoria", "Brócoli",
+    "Naranja", "Pera", "Uva", "Frutilla", "Palta", "Nueces", "Almendras", "Carne", "Cerdo", "Pavo",
+    "Quínoa", "Tofu", "Maíz", "Porotos", "Espinaca", "Zapallo", "Pepino", "Cebolla", "Kiwi", "Mango",
+]
+VARIANTES = [
+    "cocido", "crudo", "al horno", "frito", "a la plancha", "integral", "light", "descremado",
+    "en conserva", "deshidratado", "con sal", "sin sal", "orgánico", "congelado", "asado", "al vapor",
+]
+
+def nombres_alimentos(cantidad: int) -> list:
+    """Nombres únicos y realistas: 'Pollo a la plancha', 'Pollo a la plancha 2', ..."""
+    por_vuelta = len(BASES) * len(VARIANTES)
+    nombres = []
+    for i in range(cantidad):
+        vuelta, resto = divmod(i, por_vuelta)
+        nombre = f"{BASES[resto % len(BASES)]} {VARIANTES[resto // len(BASES)]}"
+        nombres.append(f"{nombre} {vuelta + 1}" if vuelta else nombre)
+    return nombres
+
+@contextmanager
+def en_directorio(directorio):
+    """La aplicación usa rutas relativas (./users/...): se trabaja desde `directorio`."""
+    anterior = os.getcwd()
+    os.chdir(directorio)
+    try:
+        yield
+    finally:
+        os.chdir(anterior)
+
+def _dias(anios: int):
+    hoy = date.today()
+    return [hoy - timedelta(days=n) for n in range(anios * 365, -1, -1)]
+
+def crear_usuario_local(directorio, usuario="bench", anios=1, semilla=0) -> dict:
+    """Base local del usuario con peso, agua y recordatorios de `anios` años."""
+    azar = random.Random(semilla)
+    with en_directorio(directorio):
+        UserDatabase().crear_db_usuario(usuario)
+    ruta = os.path.join(directorio, "users", usuario, "alimentos.db")
+
+    dias = _dias(anios)
+    pesos, peso = [], 78.0
+    for dia in dias:
+        if azar.random() < 0.4:
+            peso = round(min(120.0, max(50.0, peso + azar.uniform(-0.6, 0.5))), 1)
+            pesos.append((dia.strftime('%d-%m-%Y'), peso))
+    agua = [(dia.strftime('%d-%m-%Y'), azar.randint(2, 12)) for dia in dias]
+
+    # Recordatorios de los próximos `anios` años (los vencidos se purgan al
+    # cargarlos), uno de cada diez periódico; nunca en el minuto actual
+    # (el planificador de recordatorios abriría un diálogo)
+    ahora = datetime.now().replace(second=0, microsecond=0)
+    recordatorios = []
+    for n in range(1, anios * 365 + 1):
+        dia = date.today() + timedelta(days=n)
+        for _ in range(azar.choice((0, 0, 0, 1, 1, 2))):
+            vence = datetime(dia.year, dia.month, dia.day, azar.randint(6, 22), azar.choice((0, 15, 30, 45)))
+            if vence != ahora:
+                regla = azar.choice(("diaria", "semanal")) if azar.random() < 0.1 else None
+                recordatorios.append((f"Recordatorio {len(recordatorios) + 1}", usuario,
+                                      int(vence.timestamp()), regla))
+
+    conexion = sqlite3.connect(ruta)
+    try:
+        conexion.execute("""
+            INSERT OR REPLACE INTO datos (nombre, estatura, nivel_actividad, genero, meta_cal, edad,
+                                          recordatorio, cantidad_dias, ultimo_msj)
+            VALUES (?, 175, 'Moderado', 'Masculino', 2200, 30, 'ON', '7 días', NULL)
+        """, (usuario,))
+        conexion.executemany("INSERT INTO peso (fecha, peso) VALUES (?, ?)", pesos)
+        conexion.executemany("INSERT INTO agua (fecha, cant) VALUES (?, ?)", agua)
+        _asegurar_tabla_recordatorios(conexion)
+        conexion.executemany(
+            "INSERT INTO recordatorios (Titulo, Usuario, due_at, repeticion) VALUES (?, ?, ?, ?)", recordatorios)
+        conexion.commit()
+    finally:
+        conexion.close()
+    return {"peso": len(pesos), "agua": len(agua), "recordatorios": len(recordatorios)}
+
+async def poblar_api(motor, usuario="bench", anios=1, alimentos=10_000, consumos_por_dia=5, semilla=0) -> dict:
+    """Catálogo de `alimentos` entradas y el historial de consumo y peso del usuario en la API."""
+    azar = random.Random(semilla + 1)
+    nombres = nombres_alimentos(alimentos)
+    async with motor.begin() as conexion:
+        await conexion.run_sync(Base.metadata.create_all)
+
+        # Por tandas para acotar la memoria con catálogos de un millón de entradas
+        for inicio in range(0, alimentos, 50_000):
+            await conexion.execute(insert(AlimentoPersonalizado), [
+                {
+                    "nombre": nombre,
+                    "calorias_100gr": round(azar.uniform(15, 600), 1),
+                    "calorias_porcion": round(azar.uniform(20, 900), 1),
+                    "version": inicio + i + 1,
+                }
+                for i, nombre in enumerate(nombres[inicio:inicio + 50_000])
+            ])
+        # La fila del contador se crea junto con la tabla
+        await conexion.execute(update(CatalogoVersion).where(CatalogoVersion.id == 1).values(version=alimentos))
+
+        dias = _dias(anios)
+        consumos = [
+            {
+                "usuario": usuario,
+                "nombre": azar.choice(nombres),
+                "fecha": dia,
+                "hora": f"{7 + i * 3:02d}:{azar.randint(0, 59):02d}",
+                "cantidad": float(azar.randint(1, 3)),
+                "total_cal": round(azar.uniform(60, 750), 1),
+            }
+            for dia in dias for i in range(consumos_por_dia)
+        ]
+        for inicio in range(0, len(consumos), 50_000):
+            await conexion.execute(insert(ConsumoDiario), consumos[inicio:inicio + 50_000])
+
+        pesos, peso = [], 78.0
+        for dia in dias[::3]:
+            peso = round(min(120.0, max(50.0, peso + azar.uniform(-0.8, 0.7))), 1)
+            pesos.append({"usuario": usuario, "fecha": dia.strftime('%d-%m-%y'), "dia": dia, "peso": peso})
+        await conexion.execute(insert(Peso), pesos)
+
+    # Los agregados de peso se calculan como lo haría la API al reparar la tabla
+    async with SesionSQLite(motor) as db:
+        valores = await recalcular_estadisticas(db, usuario)
+        orden = (Peso.dia, Peso.id)
+        primero = await db.scalar(select(Peso).where(Peso.usuario == usuario).order_by(*orden).limit(1))
+        ultimo = await db.scalar(
+            select(Peso).where(Peso.usuario == usuario).order_by(*(c.desc() for c in orden)).limit(1))
+        db.add(PesoEstadisticas(
+            usuario=usuario, inicial_id=primero.id, inicial_dia=primero.dia,
+            actual_id=ultimo.id, actual_dia=ultimo.dia, **valores,
+        ))
+        await db.commit()
+    return {"alimentos": alimentos, "consumos": len(consumos), "peso_api": len(pesos)}
+
+def generar(directorio, usuario="bench", anios=1, alimentos=10_000, consumos_por_dia=5, semilla=0) -> dict:
+    """Genera todos los datos en `directorio` (que debe existir) y devuelve el resumen."""
+    parametros = {"usuario": usuario, "anios": anios, "alimentos": alimentos,
+                  "consumos_por_dia": consumos_por_dia, "semilla": semilla}
+    resumen = crear_usuario_local(directorio, usuario, anios, semilla)
+
+    async def _api():
+        motor = crear_motor(f"sqlite:///{os.path.join(directorio, 'app.db')}")
+        try:
+            return await poblar_api(motor, usuario, anios, alimentos, consumos_por_dia, semilla)
+        finally:
+            await motor.dispose()
+    resumen.update(asyncio.run(_api()))
+
+    with open(os.path.join(directorio, ARCHIVO_PARAMETROS), "w", encoding="utf-8") as f:
+        json.dump({"parametros": parametros, "resumen": resumen}, f, indent=2)
+    return resumen
+
+def parametros_generados(directorio):
+    """Parámetros con los que se generó `directorio`, o None si no tiene datos."""
+    try:
+        with open(os.path.join(directorio, ARCHIVO_PARAMETROS), encoding="utf-8") as f:
+            return json.load(f)["parametros"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos para los benchmarks")
+    parser.add_argument("destino")
+    parser.add_argument("--usuario", default="bench")
+    parser.add_argument("--anios", type=int, default=1)
+    parser.add_argument("--alimentos", type=int, default=10_000)
+    parser.add_argument("--consumos-por-dia", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if parametros_generados(args.destino) is not None:
+        parser.error(f"{args.destino} ya contiene datos generados")
+    os.makedirs(args.destino, exist_ok=True)
+    resumen = generar(args.destino, args.usuario, args.anios, args.alimentos,
+                      args.consumos_por_dia, args.semilla)
+    print(f"Datos generados en {args.destino}: " + ", ".join(f"{k}={v:,}" for k, v in resumen.items()))
+
+if __name__ == "__main__":
+    main()
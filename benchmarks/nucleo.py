@@ -0,0 +1,231 @@
+# nucleo.py
+# Registro, contexto y ejecución de los casos de la suite de benchmarks
+# (python -m benchmarks). Cada módulo benchmarks/bench_*.py registra sus casos:
+#
+#   @caso("grafico.agua_anual")
+#   def agua_anual(ctx):
+#       ChartDataManager(ctx.usuario).get_water_data("Último año")
+#
+# Los casos reciben un Contexto con los datos sintéticos ya generados, el
+# directorio de trabajo apuntando a ellos y un cliente httpx que llama a la
+# API en proceso (ASGI). Las funciones `async` se ejecutan en el bucle del
+# contexto. El tiempo de un caso es el de la llamada completa; lo que solo
+# deba prepararse una vez se guarda con ctx.memo().
+#
+# Con @caso(..., memoria=True) se mide además, con tracemalloc, la memoria
+# que sigue ocupando lo que devuelve el caso (kb_retenidos): p. ej. las
+# estructuras que una sección mantiene mientras está abierta.
+#
+# Con @caso(..., operaciones=N), cuando cada llamada realiza N operaciones
+# (p. ej. N escrituras concurrentes), se informa también el rendimiento en
+# operaciones por segundo (operaciones_s) a partir de la mediana.
+
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from controller.API.database import SesionSQLite, crear_motor, get_db
+from controller.API.seguridad import create_access_token
+from benchmarks.datos_sinteticos import generar, parametros_generados
+
+CASOS = {}
+# Llamadas sin medir antes de las rondas: cachés, conexiones del pool, sentencias preparadas
+CALENTAMIENTO = int(os.environ.get('BENCH_CALENTAMIENTO') or 3)
+
+class Caso:
+    def __init__(self, nombre, funcion, repeticiones=None, memoria=False, operaciones=None):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.repeticiones = repeticiones
+        self.memoria = memoria
+        self.operaciones = operaciones
+        self.es_async = asyncio.iscoroutinefunction(funcion)
+
+def caso(nombre, repeticiones=None, memoria=False, operaciones=None):
+    """
+    Registra un caso; `repeticiones` fija las rondas si el caso es muy lento o
+    muy rápido, con `memoria` se mide también lo que retiene su resultado y
+    `operaciones` es cuántas realiza cada llamada, para informar operaciones/s.
+    """
+    def decorador(funcion):
+        if nombre in CASOS:
+            raise ValueError(f"Caso de benchmark duplicado: {nombre}")
+        CASOS[nombre] = Caso(nombre, funcion, repeticiones, memoria, operaciones)
+        return funcion
+    return decorador
+
+class Contexto:
+    def __init__(self, directorio, parametros):
+        self.directorio = directorio
+        self.parametros = parametros
+        self.usuario = parametros["usuario"]
+        self.loop = asyncio.new_event_loop()
+        self.motor = None
+        self.sesiones = None
+        self.cliente = None
+        self._memo = {}
+        self._cierres = []
+        self._directorio_anterior = None
+
+    def abrir(self):
+        from controller.API.gateway import app
+
+        self._directorio_anterior = os.getcwd()
+        os.chdir(self.directorio)
+        self.motor = crear_motor(f"sqlite:///{os.path.join(self.directorio, 'app.db')}")
+        self.sesiones = async_sessionmaker(self.motor, class_=SesionSQLite, expire_on_commit=False, autoflush=False)
+
+        async def get_db_bench():
+            async with self.sesiones() as db:
+                yield db
+
+        self.app = app
+        app.dependency_overrides[get_db] = get_db_bench
+        token = create_access_token({"sub": self.usuario})
+        self.cliente = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        return self
+
+    def cerrar(self):
+        for cierre in reversed(self._cierres):
+            resultado = cierre()
+            if asyncio.iscoroutine(resultado):
+                self.ejecutar(resultado)
+        if self.cliente is not None:
+            self.ejecutar(self.cliente.aclose())
+            self.app.dependency_overrides.pop(get_db, None)
+        if self.motor is not None:
+            self.ejecutar(self.motor.dispose())
+        self.loop.close()
+        if self._directorio_anterior:
+            os.chdir(self._directorio_anterior)
+
+    def ejecutar(self, corrutina):
+        return self.loop.run_until_complete(corrutina)
+
+    def memo(self, clave, fabrica, cerrar=None):
+        """
+        Valor calculado una sola vez por ejecución de la suite (datos de
+        preparación); `cerrar(valor)` lo libera al terminar (motores, pools).
+        """
+        if clave not in self._memo:
+            valor = self._memo[clave] = fabrica()
+            if cerrar is not None:
+                self._cierres.append(lambda: cerrar(valor))
+        return self._memo[clave]
+
+def preparar_datos(directorio, parametros):
+    """Genera los datos en `directorio`, o los reutiliza si ya se generaron con los mismos parámetros."""
+    existentes = parametros_generados(directorio)
+    if existentes == parametros:
+        return False
+    if existentes is not None:
+        raise ValueError(f"{directorio} contiene datos generados con otros parámetros: {existentes}")
+    os.makedirs(directorio, exist_ok=True)
+    generar(directorio, **parametros)
+    return True
+
+def _medir_una(ctx, caso):
+    inicio = time.perf_counter()
+    if caso.es_async:
+        ctx.ejecutar(caso.funcion(ctx))
+    else:
+        caso.funcion(ctx)
+    return (time.perf_counter() - inicio) * 1000
+
+def _medir_memoria(ctx, caso):
+    """KB que siguen asignados mientras se conserva el resultado del caso."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        resultado = ctx.ejecutar(caso.funcion(ctx)) if caso.es_async else caso.funcion(ctx)
+        gc.collect()
+        retenidos, _pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return round(retenidos / 1024, 1)
+
+def ejecutar_casos(ctx, nombres, repeticiones=5, informar=print, calentamiento=CALENTAMIENTO):
+    """Ejecuta cada caso `calentamiento` veces sin medir y `repeticiones` veces medidas."""
+    resultados = {}
+    for nombre in nombres:
+        caso = CASOS[nombre]
+        rondas = caso.repeticiones or repeticiones
+        for _ in range(max(calentamiento, 1)):
+            _medir_una(ctx, caso)
+        # Como timeit: sin recolecciones del GC a mitad de una ronda
+        gc.collect()
+        gc.disable()
+        try:
+            tiempos = [_medir_una(ctx, caso) for _ in range(rondas)]
+        finally:
+            gc.enable()
+        resultados[nombre] = {
+            "mediana_ms": round(statistics.median(tiempos), 4),
+            "min_ms": round(min(tiempos), 4),
+            "rondas": rondas,
+        }
+        linea = (f"  {nombre:<40} mediana {resultados[nombre]['mediana_ms']:10.3f} ms   "
+                 f"mín {resultados[nombre]['min_ms']:10.3f} ms")
+        if caso.operaciones:
+            resultados[nombre]["operaciones_s"] = round(caso.operaciones * 1000 / resultados[nombre]["mediana_ms"], 1)
+            linea += f"   {resultados[nombre]['operaciones_s']:10.1f} op/s"
+        if caso.memoria:
+            resultados[nombre]["kb_retenidos"] = _medir_memoria(ctx, caso)
+            linea += f"   retiene {resultados[nombre]['kb_retenidos']:10.1f} KB"
+        informar(linea)
+    return resultados
+
+def entorno():
+    """Huella de la máquina: las líneas base solo son comparables en la misma."""
+    return {
+        "python": platform.python_version(),
+        "sistema": platform.system(),
+        "maquina": platform.machine(),
+        "procesador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+def cargar_baseline(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def guardar_baseline(ruta, parametros, resultados):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"entorno": entorno(), "parametros": parametros, "casos": resultados},
+                  f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+def comparar(resultados, baseline, tolerancia=1.0, minimo_ms=0.5):
+    """
+    Casos cuyo mejor tiempo empeoró más que `tolerancia` respecto a la línea
+    base. Se compara el mínimo, menos sensible que la mediana a la carga de la
+    máquina, y se ignoran diferencias menores que `minimo_ms` (ruido de medición).
+    En los casos con memoria se comparan también los KB retenidos.
+    """
+    regresiones = []
+    for nombre, actual in resultados.items():
+        base = baseline["casos"].get(nombre)
+        if base is None:
+            continue
+        antes, ahora = base["min_ms"], actual["min_ms"]
+        if ahora > antes * (1 + tolerancia) and ahora - antes > minimo_ms:
+            regresiones.append((nombre, antes, ahora, "ms"))
+        # La memoria no tiene ruido de medición: basta con la tolerancia
+        if "kb_retenidos" in base and "kb_retenidos" in actual \
+                and actual["kb_retenidos"] > base["kb_retenidos"] * (1 + tolerancia):
+            regresiones.append((nombre, base["kb_retenidos"], actual["kb_retenidos"], "KB"))
+    return regresiones
@@ -0,0 +1,265 @@
+# api_alimentos.py
+# Catálogo de alimentos y registro de consumo diario que usan
+# ApiAlimentoRepository, HistorialFacade y los gráficos de calorías.
+
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel, Field
+from sqlalchemy import DDL, Column, Integer, String, Float, Date, Index, event, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from controller.API.database import Base, SessionLocal, get_db
+from controller.API.seguridad import obtener_usuario_opcional
+from controller.API.respuestas import FilasJSONResponse, columnas_de, parametro_formato
+from controller.API.eventos import publicar
+
+# --- Modelos de Base de Datos ---
+class AlimentoPersonalizado(Base):
+    __tablename__ = 'alimentos_personalizados'
+
+    id = Column(Integer, primary_key=True, index=True)
+    nombre = Column(String, unique=True, index=True, nullable=False)
+    calorias_100gr = Column(Float)
+    calorias_porcion = Column(Float)
+    # Versión del catálogo en la que se creó o modificó por última vez
+    version = Column(Integer, nullable=False, default=0, index=True)
+
+class CatalogoVersion(Base):
+    """
+    Contador monotónico de cambios del catálogo (una sola fila). Cada alta o
+    modificación de un alimento lo incrementa y sella la fila con el nuevo
+    valor, lo que permite responder con ETag y enviar solo los cambios.
+    """
+    __tablename__ = 'catalogo_version'
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+# La fila se crea junto con la tabla (antes de lanzar los workers): si la
+# creara la primera alta, dos workers podrían insertarla a la vez.
+event.listen(CatalogoVersion.__table__, "after_create",
+             DDL("INSERT INTO catalogo_version (id, version) VALUES (1, 0)"))
+
+class ConsumoDiario(Base):
+    __tablename__ = 'consumo_diario'
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Las peticiones sin token se registran como anónimas (usuario NULL)
+    usuario = Column(String(80))
+    nombre = Column(String, nullable=False)
+    fecha = Column(Date, nullable=False)
+    hora = Column(String(5), nullable=False)  # HH:MM
+    cantidad = Column(Float, nullable=False)
+    total_cal = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index('ix_consumo_usuario_fecha', 'usuario', 'fecha'),
+    )
+
+# --- Esquemas Pydantic ---
+class AlimentoBase(BaseModel):
+    nombre: str = Field(..., min_length=2, max_length=80)
+    calorias_100gr: Optional[float] = Field(None, gt=0)
+    calorias_porcion: Optional[float] = Field(None, gt=0)
+
+class AlimentoCreate(AlimentoBase):
+    pass
+
+class AlimentoPublic(AlimentoBase):
+    id: int
+
+    class Config:
+        orm_mode = True
+
+class ConsultaAlimento(BaseModel):
+    nombre: str
+
+class ConsumoBase(BaseModel):
+    nombre: str
+    fecha: date
+    hora: str = Field(..., pattern=r'^\d{2}:\d{2}$')
+    cantidad: float = Field(..., gt=0)
+    total_cal: float = Field(..., ge=0)
+
+class ConsumoCreate(BaseModel):
+    consumo: ConsumoBase
+
+class ConsumoPublic(ConsumoBase):
+    id: int
+
+    class Config:
+        orm_mode = True
+
+class ResumenTotal(BaseModel):
+    calorias: float
+    registros: int
+
+class ResumenDiario(BaseModel):
+    fecha: date
+    consumos: List[ConsumoPublic]
+    resumen_total: ResumenTotal
+
+# --- Versión del catálogo ---
+CABECERA_VERSION = "X-Catalogo-Version"
+
+async def _version_catalogo(db: AsyncSession) -> int:
+    return await db.scalar(select(CatalogoVersion.version).where(CatalogoVersion.id == 1)) or 0
+
+async def _siguiente_version(db: AsyncSession) -> int:
+    """Incrementa el contador dentro de la transacción en curso y devuelve el nuevo valor."""
+    # Un UPDATE atómico, no leer y luego escribir: SQLite ignora FOR UPDATE y
+    # pysqlite no abre la transacción hasta la primera escritura, así que con
+    # varios workers dos altas podían leer la misma versión.
+    actualizado = await db.execute(
+        update(CatalogoVersion).where(CatalogoVersion.id == 1).values(version=CatalogoVersion.version + 1)
+    )
+    if actualizado.rowcount == 0:
+        # Base creada antes de que la fila se insertara junto con la tabla
+        db.add(CatalogoVersion(id=1, version=1))
+        return 1
+    return await db.scalar(select(CatalogoVersion.version).where(CatalogoVersion.id == 1))
+
+async def asignar_consumos_anonimos(sesiones=None) -> int:
+    """
+    Hasta que la aplicación de escritorio envió su token, sus consumos se
+    guardaban como anónimos. Si hay un único usuario registrado son suyos:
+    se le asignan para que los siga viendo. Devuelve cuántos se asignaron.
+    """
+    async with (sesiones or SessionLocal)() as db:
+        anonimos = await db.scalar(select(func.count()).select_from(ConsumoDiario).where(ConsumoDiario.usuario.is_(None)))
+        if not anonimos:
+            return 0
+        nombres = (await db.execute(text("SELECT nombre_usuario FROM usuarios LIMIT 2"))).scalars().all()
+        if len(nombres) != 1:
+            print(f"ADVERTENCIA: {anonimos} consumos anónimos sin asignar: hay varios usuarios registrados")
+            return 0
+        await db.execute(update(ConsumoDiario).where(ConsumoDiario.usuario.is_(None)).values(usuario=nombres[0]))
+        await db.commit()
+    print(f"NOTA: {anonimos} consumos anónimos asignados a '{nombres[0]}'")
+    return anonimos
+
+def _etag(version: int) -> str:
+    return f'"catalogo-{version}"'
+
+def _coincide_etag(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidatos = [e.strip().removeprefix("W/") for e in if_none_match.split(",")]
+    return "*" in candidatos or etag in candidatos
+
+# --- Router ---
+router = APIRouter(tags=["Alimentos"])
+
+def _consumos_de(usuario: Optional[str]):
+    return select(ConsumoDiario).where(ConsumoDiario.usuario == usuario)
+
+def _alimento_por_nombre(nombre: str):
+    return select(AlimentoPersonalizado).where(
+        func.lower(AlimentoPersonalizado.nombre) == nombre.strip().lower()
+    )
+
+@router.get("/alimentos", response_model=List[AlimentoPublic], response_class=FilasJSONResponse)
+async def listar_alimentos(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Devuelve solo los alimentos cambiados después de esta versión"),
+    columnar: bool = Depends(parametro_formato),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Catálogo completo, o solo los cambios posteriores a `since`. La versión
+    actual viaja en ETag y en X-Catalogo-Version; con If-None-Match igual a
+    la versión vigente se responde 304 sin cuerpo.
+    """
+    # La versión se lee antes que las filas: si entra un alta entre ambas
+    # consultas, el cliente la volverá a recibir en el siguiente delta.
+    version = await _version_catalogo(db)
+    cabeceras = {"ETag": _etag(version), CABECERA_VERSION: str(version)}
+    if _coincide_etag(request.headers.get("if-none-match"), cabeceras["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
+
+    consulta = columnas_de(AlimentoPersonalizado, AlimentoPublic).order_by(AlimentoPersonalizado.nombre)
+    if since is not None:
+        consulta = consulta.where(AlimentoPersonalizado.version > since)
+    return FilasJSONResponse(await db.execute(consulta), columnar=columnar, headers=cabeceras)
+
+@router.post("/alimentos", response_model=AlimentoPublic, status_code=status.HTTP_201_CREATED)
+async def crear_alimento(alimento: AlimentoCreate, db: AsyncSession = Depends(get_db)):
+    if alimento.calorias_100gr is None and alimento.calorias_porcion is None:
+        raise HTTPException(status_code=422, detail="Debe indicar calorías por 100gr o por porción.")
+    # Tomar el contador primero serializa las altas concurrentes; si el alimento
+    # ya existe, el rollback al cerrar la sesión descarta el incremento.
+    version = await _siguiente_version(db)
+    if await db.scalar(_alimento_por_nombre(alimento.nombre)):
+        raise HTTPException(status_code=400, detail="El alimento ya está registrado.")
+
+    nuevo = AlimentoPersonalizado(
+        nombre=alimento.nombre.strip(),
+        calorias_100gr=alimento.calorias_100gr,
+        calorias_porcion=alimento.calorias_porcion,
+        version=version,
+    )
+    db.add(nuevo)
+    await db.flush()
+    publicar(db, "catalogo", {
+        "version": version,
+        "alimento": AlimentoPublic.model_validate(nuevo, from_attributes=True).model_dump(),
+    }, difusion=True)
+    await db.commit()
+    return nuevo
+
+@router.post("/consultar-alimento", response_model=AlimentoPublic)
+async def consultar_alimento(consulta: ConsultaAlimento, db: AsyncSession = Depends(get_db)):
+    alimento = await db.scalar(_alimento_por_nombre(consulta.nombre))
+    if not alimento:
+        raise HTTPException(status_code=404, detail="Alimento no encontrado")
+    return alimento
+
+@router.post("/registrar-consumo", response_model=ConsumoPublic, status_code=status.HTTP_201_CREATED)
+async def registrar_consumo(
+    datos: ConsumoCreate,
+    db: AsyncSession = Depends(get_db),
+    usuario: Optional[str] = Depends(obtener_usuario_opcional)
+):
+    consumo = ConsumoDiario(usuario=usuario, **datos.consumo.model_dump())
+    db.add(consumo)
+    await db.flush()
+    publicar(db, "consumo", ConsumoPublic.model_validate(consumo, from_attributes=True).model_dump(), usuario)
+    await db.commit()
+    return consumo
+
+@router.get("/resumen-diario/{fecha}", response_model=ResumenDiario)
+async def resumen_diario(
+    fecha: date,
+    db: AsyncSession = Depends(get_db),
+    usuario: Optional[str] = Depends(obtener_usuario_opcional)
+):
+    consumos = (await db.scalars(
+        _consumos_de(usuario)
+        .where(ConsumoDiario.fecha == fecha)
+        .order_by(ConsumoDiario.hora, ConsumoDiario.id)
+    )).all()
+    if not consumos:
+        raise HTTPException(status_code=404, detail="No hay consumos registrados para esa fecha")
+    return {
+        "fecha": fecha,
+        "consumos": consumos,
+        "resumen_total": {
+            "calorias": sum(c.total_cal for c in consumos),
+            "registros": len(consumos),
+        },
+    }
+
+@router.get("/historial", response_model=List[ConsumoPublic], response_class=FilasJSONResponse)
+async def historial(
+    fecha_desde: date = Query(...),
+    fecha_hasta: date = Query(...),
+    columnar: bool = Depends(parametro_formato),
+    db: AsyncSession = Depends(get_db),
+    usuario: Optional[str] = Depends(obtener_usuario_opcional)
+):
+    return FilasJSONResponse(await db.execute(
+        columnas_de(ConsumoDiario, ConsumoPublic)
+        .where(ConsumoDiario.usuario == usuario)
+        .where(ConsumoDiario.fecha.between(fecha_desde, fecha_hasta))
+        .order_by(ConsumoDiario.fecha, ConsumoDiario.hora, ConsumoDiario.id)
+    ), columnar=columnar)
@@ -0,0 +1,80 @@
+# compresion.py
+# Compresión de respuestas negociada con Accept-Encoding (brotli o gzip).
+#
+# Reutiliza los responders de Starlette (GZipMiddleware), que ya resuelven
+# respuestas en streaming, Content-Length, Vary y tipos excluidos; aquí se
+# añade brotli y la elección según los pesos q del cliente. Las respuestas
+# por debajo de COMPRESION_MINIMO_BYTES se envían sin comprimir.
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se ofrece gzip
+    brotli = None
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, calidad: int = 4) -> None:
+        super().__init__(app, minimum_size)
+        # Calidades bajas (4-5) comprimen casi como gzip -9 a una fracción del coste
+        self.compresor = brotli.Compressor(quality=calidad)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        salida = self.compresor.process(body)
+        if more_body:
+            return salida + self.compresor.flush()
+        return salida + self.compresor.finish()
+
+def codificaciones_aceptadas(accept_encoding: str) -> dict:
+    """'gzip, br;q=0.8, *;q=0' -> {'gzip': 1.0, 'br': 0.8, '*': 0.0}"""
+    aceptadas = {}
+    for parte in accept_encoding.split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        if not nombre:
+            continue
+        q = 1.0
+        parametro = parametros.strip()
+        if parametro.startswith("q="):
+            try:
+                q = float(parametro[2:])
+            except ValueError:
+                q = 0.0
+        aceptadas[nombre.strip().lower()] = q
+    return aceptadas
+
+class CompresionMiddleware:
+    def __init__(self, app: ASGIApp, minimo_bytes: int = 1024, nivel_gzip: int = 6, calidad_brotli: int = 4) -> None:
+        self.app = app
+        self.minimo_bytes = minimo_bytes
+        self.nivel_gzip = nivel_gzip
+        self.calidad_brotli = calidad_brotli
+        # Orden de preferencia a igualdad de q
+        self.disponibles = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def elegir(self, accept_encoding: str):
+        aceptadas = codificaciones_aceptadas(accept_encoding)
+        comodin = aceptadas.get("*", 0.0)
+        mejor, mejor_q = None, 0.0
+        for codificacion in self.disponibles:
+            q = aceptadas.get(codificacion, comodin)
+            if q > mejor_q:
+                mejor, mejor_q = codificacion, q
+        return mejor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = self.elegir(Headers(scope=scope).get("Accept-Encoding", ""))
+        if codificacion == "br":
+            responder = BrotliResponder(self.app, self.minimo_bytes, calidad=self.calidad_brotli)
+        elif codificacion == "gzip":
+            responder = GZipResponder(self.app, self.minimo_bytes, compresslevel=self.nivel_gzip)
+        else:
+            responder = IdentityResponder(self.app, self.minimo_bytes)
+        await responder(scope, receive, send)
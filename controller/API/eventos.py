@@ -0,0 +1,174 @@
+# eventos.py
+# Notificaciones de cambios para los clientes por WebSocket (/events).
+#
+# Los routers registran cada cambio con publicar() dentro de la misma
+# transacción que lo produce (tabla 'eventos', patrón outbox): si la
+# transacción se deshace, el evento tampoco existe. Cada worker del gateway
+# lee los eventos nuevos de la tabla y los reparte a sus suscriptores, así
+# las notificaciones llegan aunque la escritura la haya atendido otro worker.
+#
+# El id lo asigna la base al insertar, pero la transacción puede confirmarse
+# después que otra con id mayor (en SQLite no: los escritores se serializan;
+# en PostgreSQL/MySQL sí). Por eso cada vuelta vuelve a leer los últimos
+# EVENTOS_VENTANA ids ya repartidos y descarta los entregados: un evento que
+# se confirme con más retraso que esa ventana se pierde para los conectados
+# (los que se reconecten con ?desde= sí lo reciben).
+#
+# Mensaje: {"id": 12, "tipo": "consumo", "datos": {...}}
+# Conexión: ws://host/events?token=<jwt>&desde=<último id recibido>
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+import orjson
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from controller.API.database import Base, SessionLocal, settings
+from controller.API.seguridad import decodificar_usuario
+
+# --- Modelo de Base de Datos ---
+class Evento(Base):
+    __tablename__ = 'eventos'
+
+    id = Column(Integer, primary_key=True)
+    tipo = Column(String(30), nullable=False)
+    # Destinatario: el usuario dueño del dato (NULL = anónimo), o todos si difusion
+    usuario = Column(String(80))
+    difusion = Column(Boolean, nullable=False, default=False)
+    datos = Column(Text, nullable=False)  # JSON
+    creado = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+def publicar(db: AsyncSession, tipo: str, datos: dict, usuario: Optional[str] = None, difusion: bool = False):
+    """Añade el evento a la transacción en curso; se emite solo si esta se confirma."""
+    db.add(Evento(tipo=tipo, usuario=usuario, difusion=difusion, datos=orjson.dumps(datos).decode()))
+
+# --- Reparto ---
+class CentroEventos:
+    """Suscriptores WebSocket de este worker y bucle que les reparte los eventos nuevos."""
+    LOTE = 500
+    PURGAR_CADA = 120  # vueltas del bucle entre purgas de eventos antiguos
+
+    def __init__(self):
+        self.suscriptores = {}  # WebSocket -> usuario (None = anónimo)
+        self.ultimo_id = 0
+        self._entregados = set()  # ids repartidos dentro de la ventana
+        self._tarea = None
+
+    async def _id_maximo(self, db: AsyncSession) -> int:
+        return await db.scalar(select(func.max(Evento.id))) or 0
+
+    async def _empezar_desde(self, db: AsyncSession, ultimo_id: int):
+        """Da por repartido lo anterior a ultimo_id, también lo que cae en la ventana."""
+        self.ultimo_id = ultimo_id
+        self._entregados = set(await db.scalars(
+            select(Evento.id).where(Evento.id > ultimo_id - settings.EVENTOS_VENTANA, Evento.id <= ultimo_id)
+        ))
+
+    async def suscribir(self, websocket: WebSocket, usuario: Optional[str], desde: Optional[int]):
+        reparto_activo = self._tarea is not None and not self._tarea.done()
+        async with SessionLocal() as db:
+            if not reparto_activo:
+                # Sin suscriptores no se repartía nada: se empieza desde el presente
+                await self._empezar_desde(db, await self._id_maximo(db))
+            if desde is not None:
+                # Reconexión: se reenvía lo que el cliente se perdió (si sigue retenido)
+                pendientes = await db.scalars(
+                    select(Evento)
+                    .where(Evento.id > desde, Evento.id <= self.ultimo_id)
+                    .order_by(Evento.id)
+                )
+                ventana = self.ultimo_id - settings.EVENTOS_VENTANA
+                for evento in pendientes:
+                    # Los que aún no se han repartido llegarán con el bucle
+                    if evento.id > ventana and evento.id not in self._entregados:
+                        continue
+                    if evento.difusion or evento.usuario == usuario:
+                        await websocket.send_text(self._mensaje(evento))
+
+        self.suscriptores[websocket] = usuario
+        if self._tarea is None or self._tarea.done():
+            self._tarea = asyncio.create_task(self._bucle())
+
+    def desuscribir(self, websocket: WebSocket):
+        self.suscriptores.pop(websocket, None)
+
+    @staticmethod
+    def _mensaje(evento: Evento) -> str:
+        # 'datos' ya es JSON: se incrusta sin volver a decodificarlo
+        return f'{{"id":{evento.id},"tipo":{orjson.dumps(evento.tipo).decode()},"datos":{evento.datos}}}'
+
+    async def _bucle(self):
+        vueltas = 0
+        while self.suscriptores:
+            await asyncio.sleep(settings.EVENTOS_INTERVALO_S)
+            try:
+                await self._repartir()
+                vueltas += 1
+                if vueltas % self.PURGAR_CADA == 0:
+                    await self._purgar()
+            except Exception as e:
+                print(f"Error repartiendo eventos: {e}")
+
+    async def _repartir(self):
+        ventana = settings.EVENTOS_VENTANA
+        async with SessionLocal() as db:
+            eventos = (await db.scalars(
+                select(Evento).where(Evento.id > self.ultimo_id - ventana)
+                .order_by(Evento.id).limit(self.LOTE + len(self._entregados))
+            )).all()
+        for evento in eventos:
+            if evento.id in self._entregados:
+                continue
+            self._entregados.add(evento.id)
+            self.ultimo_id = max(self.ultimo_id, evento.id)
+            mensaje = self._mensaje(evento)
+            destinos = [
+                ws for ws, usuario in self.suscriptores.items()
+                if evento.difusion or evento.usuario == usuario
+            ]
+            resultados = await asyncio.gather(
+                *(asyncio.wait_for(ws.send_text(mensaje), timeout=2) for ws in destinos),
+                return_exceptions=True,
+            )
+            # Un cliente que no acepta el mensaje a tiempo se da por desconectado
+            for ws, resultado in zip(destinos, resultados):
+                if isinstance(resultado, Exception):
+                    self.desuscribir(ws)
+        self._entregados = {id_ for id_ in self._entregados if id_ > self.ultimo_id - ventana}
+
+    async def _purgar(self):
+        limite = datetime.utcnow() - timedelta(minutes=settings.EVENTOS_RETENCION_MIN)
+        async with SessionLocal() as db:
+            await db.execute(delete(Evento).where(Evento.creado < limite))
+            await db.commit()
+
+    async def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+        self.suscriptores.clear()
+
+centro_eventos = CentroEventos()
+
+# --- Router ---
+router = APIRouter(tags=["Eventos"])
+
+@router.websocket("/events")
+async def eventos(websocket: WebSocket, token: Optional[str] = None, desde: Optional[int] = None):
+    usuario = None
+    if token:
+        usuario = decodificar_usuario(token)
+        if usuario is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
+    await websocket.accept()
+    await centro_eventos.suscribir(websocket, usuario, desde)
+    try:
+        # El cliente no envía nada; recibir solo sirve para detectar el cierre
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        centro_eventos.desuscribir(websocket)
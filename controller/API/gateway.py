@@ -0,0 +1,106 @@
+# gateway.py
+# Aplicación ASGI única que monta los routers de usuarios, peso y alimentos
+# (el WebSocket /events y las métricas /metrics) sobre el mismo motor SQLAlchemy y la misma
+# autenticación JWT.
+#
+# Se ejecuta como un proceso independiente de la GUI:
+#   python -m controller.API.gateway --workers 4
+#   python -m controller.API.gateway --uds /tmp/calorias.sock
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+import uvicorn
+from fastapi import FastAPI
+from controller.API.database import crear_tablas, engine, settings
+from controller.API.compresion import CompresionMiddleware
+from controller.API.metricas import (
+    MetricasMiddleware, instrumentar_motor, marcar_fin_de_proceso, muestrear, router as metricas_router,
+)
+from controller.API.seguridad import hash_pool
+from controller.API.user.api import router as usuarios_router
+from controller.API.peso.ApiPeso import importar_peso_anterior, migrar_peso, router as peso_router
+from controller.API.alimentos.api_alimentos import asignar_consumos_anonimos, router as alimentos_router
+from controller.API.eventos import router as eventos_router, centro_eventos
+
+async def preparar_base():
+    """Crea las tablas que falten y migra los datos de versiones anteriores."""
+    await crear_tablas()
+    await importar_peso_anterior()
+    await migrar_peso()
+    await asignar_consumos_anonimos()
+
+@asynccontextmanager
+async def ciclo_de_vida(_app: FastAPI):
+    # Sin efecto si main() ya la preparó; cubre el arranque directo con uvicorn o TestClient
+    await preparar_base()
+    muestreo = asyncio.create_task(muestrear(hash_pool))
+    yield
+    muestreo.cancel()
+    marcar_fin_de_proceso()
+    await centro_eventos.detener()
+    await engine.dispose()
+    hash_pool.shutdown(wait=False)
+
+app = FastAPI(title="API de Registro y Nutrición", version="2.0.0", lifespan=ciclo_de_vida)
+app.add_middleware(
+    CompresionMiddleware,
+    minimo_bytes=settings.COMPRESION_MINIMO_BYTES,
+    nivel_gzip=settings.GZIP_NIVEL,
+    calidad_brotli=settings.BROTLI_CALIDAD,
+)
+# Se añade el último para quedar por fuera y medir también la compresión
+app.add_middleware(MetricasMiddleware)
+instrumentar_motor(engine)
+app.include_router(usuarios_router)
+app.include_router(peso_router)
+app.include_router(alimentos_router)
+app.include_router(eventos_router)
+app.include_router(metricas_router)
+
+@app.get("/", tags=["Estado"])
+def estado():
+    """Usado por los clientes para comprobar que el servidor está en línea."""
+    return {"estado": "ok"}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de la API de Calorías Pro 60Hz")
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--port", type=int, default=settings.API_PORT)
+    parser.add_argument("--workers", type=int, default=settings.API_WORKERS)
+    parser.add_argument("--uds", default=settings.API_UDS or None,
+                        help="Escuchar en un socket de dominio Unix en lugar de TCP")
+    parser.add_argument("--keep-alive", type=int, default=settings.API_KEEP_ALIVE_S,
+                        help="Segundos que se mantiene abierta una conexión ociosa")
+    args = parser.parse_args(argv)
+
+    # Las tablas se crean (y migran) aquí, antes de lanzar los workers: si cada
+    # worker lo hiciera en su arranque, competirían por crearlas en una base nueva.
+    asyncio.run(preparar_base())
+
+    # Cada worker es un proceso con sus propias métricas: prometheus_client las
+    # comparte a través de ficheros en este directorio, heredado por los workers
+    directorio_metricas = None
+    if args.workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        directorio_metricas = tempfile.mkdtemp(prefix="calorias_metricas_")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = directorio_metricas
+
+    # Con varios workers uvicorn necesita la ruta de importación, no el objeto
+    try:
+        uvicorn.run(
+            "controller.API.gateway:app",
+            host=args.host,
+            port=args.port,
+            uds=args.uds,
+            workers=args.workers,
+            timeout_keep_alive=args.keep_alive,
+        )
+    finally:
+        if directorio_metricas:
+            shutil.rmtree(directorio_metricas, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# informe_cohorte.py
+# Informe periódico de salud de todos los usuarios de la API:
+#
+#   python -m controller.API.informe_cohorte                  últimos COHORTE_DIAS días
+#   python -m controller.API.informe_cohorte --dias 7 --procesos 8
+#
+# Pensado para lanzarlo desde cron. Por usuario calcula IMC y TMB (con el
+# último peso de peso_estadisticas, o el del registro), los días con
+# consumos en la ventana, la ingesta media diaria frente a su meta y la
+# adherencia: la fracción de esos días dentro de ±COHORTE_TOLERANCIA de la
+# meta. De todo el grupo guarda los percentiles de cada métrica.
+#
+# Los usuarios se reparten en lotes de ids consecutivos que procesa un pool
+# de procesos. Cada lote lee sus usuarios y el total por día de sus consumos
+# (dos consultas por rango de id, sobre índices) y calcula con arrays de
+# NumPy, sin bucles por usuario: el coste crece linealmente con el número
+# de usuarios. El proceso principal es el único que escribe.
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Integer, String, create_engine, func, insert, select
+from sqlalchemy.engine import make_url
+from controller.API.database import Base, settings
+from controller.API.user.api import Usuario
+from controller.API.peso.ApiPeso import PesoEstadisticas
+from controller.API.alimentos.api_alimentos import ConsumoDiario
+
+COHORTE_DIAS = int(os.environ.get('COHORTE_DIAS') or 30)
+COHORTE_PROCESOS = int(os.environ.get('COHORTE_PROCESOS') or os.cpu_count() or 1)
+COHORTE_LOTE_USUARIOS = int(os.environ.get('COHORTE_LOTE_USUARIOS') or 5000)
+COHORTE_TOLERANCIA = float(os.environ.get('COHORTE_TOLERANCIA') or 0.10)
+
+PERCENTILES = (10, 25, 50, 75, 90)
+METRICAS = ("imc", "tmb", "ingesta_media", "ratio_meta", "adherencia")
+COLUMNAS_USUARIO = ("usuario", "imc", "tmb", "meta_calorias", "dias_registrados",
+                    "ingesta_media", "ratio_meta", "adherencia")
+
+# --- Modelos del informe ---
+class InformeCohorte(Base):
+    __tablename__ = 'informes_cohorte'
+
+    id = Column(Integer, primary_key=True)
+    generado = Column(DateTime, nullable=False, default=datetime.utcnow)
+    desde = Column(Date, nullable=False)
+    hasta = Column(Date, nullable=False)
+    usuarios = Column(Integer, nullable=False)
+    duracion_ms = Column(Float, nullable=False)
+
+class InformeCohorteUsuario(Base):
+    __tablename__ = 'informes_cohorte_usuarios'
+
+    informe_id = Column(Integer, ForeignKey('informes_cohorte.id', ondelete='CASCADE'), primary_key=True)
+    usuario = Column(String(80), primary_key=True)
+    imc = Column(Float)
+    tmb = Column(Float)
+    meta_calorias = Column(Integer, nullable=False)
+    dias_registrados = Column(Integer, nullable=False)
+    ingesta_media = Column(Float)   # NULL sin consumos en la ventana
+    ratio_meta = Column(Float)
+    adherencia = Column(Float)
+
+class InformeCohorteDistribucion(Base):
+    __tablename__ = 'informes_cohorte_distribucion'
+
+    informe_id = Column(Integer, ForeignKey('informes_cohorte.id', ondelete='CASCADE'), primary_key=True)
+    metrica = Column(String(20), primary_key=True)
+    percentil = Column(Integer, primary_key=True)
+    valor = Column(Float)
+
+TABLAS_INFORME = [InformeCohorte.__table__, InformeCohorteUsuario.__table__, InformeCohorteDistribucion.__table__]
+
+# --- Cálculo vectorizado ---
+def imc_vectorizado(peso, altura_cm):
+    return peso / (altura_cm / 100) ** 2
+
+def edad_vectorizada(fecha_nacimiento, hasta: date):
+    """Años cumplidos en `hasta` (la columna `edad` solo vale el día del registro)."""
+    nacimiento = np.asarray(fecha_nacimiento, dtype='datetime64[D]')
+    anio = nacimiento.astype('datetime64[Y]').astype(int) + 1970
+    mes = nacimiento.astype('datetime64[M]').astype(int) % 12 + 1
+    dia = (nacimiento - nacimiento.astype('datetime64[M]')).astype(int) + 1
+    sin_cumplir = (mes > hasta.month) | ((mes == hasta.month) & (dia > hasta.day))
+    return hasta.year - anio - sin_cumplir
+
+def tmb_vectorizado(peso, altura_cm, fecha_nacimiento, hasta: date, es_mujer):
+    """Harris-Benedict, con los mismos coeficientes que la pantalla de salud, y la edad en `hasta`."""
+    edad = edad_vectorizada(fecha_nacimiento, hasta)
+    hombre = 66.47 + 13.75 * peso + 5 * altura_cm - 6.76 * edad
+    mujer = 655.1 + 9.56 * peso + 1.85 * altura_cm - 4.68 * edad
+    return np.where(es_mujer, mujer, hombre)
+
+def metricas_de_consumo(indice_usuario, total_dia, meta, tolerancia=COHORTE_TOLERANCIA):
+    """
+    A partir de los totales diarios (una fila por usuario y día, con el
+    índice del usuario) devuelve por usuario (dias, ingesta_media, ratio_meta,
+    adherencia); las tres últimas son NaN para quien no registró nada, y
+    ratio_meta también para quien no tiene meta.
+    """
+    n = len(meta)
+    dias = np.bincount(indice_usuario, minlength=n)
+    suma = np.bincount(indice_usuario, weights=total_dia, minlength=n)
+    meta_fila = meta[indice_usuario]
+    en_meta = np.abs(total_dia - meta_fila) <= tolerancia * meta_fila
+    dias_en_meta = np.bincount(indice_usuario, weights=en_meta, minlength=n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ingesta_media = np.where(dias > 0, suma / dias, np.nan)
+        adherencia = np.where(dias > 0, dias_en_meta / dias, np.nan)
+        ratio_meta = np.where(meta > 0, ingesta_media / meta, np.nan)
+    return dias, ingesta_media, ratio_meta, adherencia
+
+# --- Trabajo de cada proceso ---
+_motor = None
+
+def _url_sincrona(url: str):
+    """El informe usa el driver síncrono aunque DATABASE_URL indique uno asíncrono."""
+    url = make_url(url)
+    if "+" in url.drivername and url.drivername.split("+")[1] in ("aiosqlite", "asyncpg", "aiomysql"):
+        url = url.set(drivername=url.get_backend_name())
+    return url
+
+def _iniciar_proceso(url):
+    global _motor
+    url = _url_sincrona(url)
+    opciones = {}
+    if url.get_backend_name() == 'sqlite':
+        opciones["connect_args"] = {"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    _motor = create_engine(url, **opciones)
+
+def procesar_lote(id_desde, id_hasta, desde, hasta):
+    """Métricas de los usuarios con id en [id_desde, id_hasta], como arrays."""
+    rango = Usuario.id.between(id_desde, id_hasta)
+    with _motor.connect() as conexion:
+        usuarios = conexion.execute(
+            select(Usuario.nombre_usuario, Usuario.sexo,
+                   func.coalesce(PesoEstadisticas.peso_actual, Usuario.peso),
+                   Usuario.altura, Usuario.fecha_nacimiento, Usuario.meta_calorias)
+            .outerjoin(PesoEstadisticas, PesoEstadisticas.usuario == Usuario.nombre_usuario)
+            .where(rango)
+        ).all()
+        if not usuarios:
+            return None
+        totales = conexion.execute(
+            select(ConsumoDiario.usuario, func.sum(ConsumoDiario.total_cal))
+            .where(ConsumoDiario.usuario.in_(select(Usuario.nombre_usuario).where(rango)))
+            .where(ConsumoDiario.fecha.between(desde, hasta))
+            .group_by(ConsumoDiario.usuario, ConsumoDiario.fecha)
+        ).all()
+
+    nombres, sexo, peso, altura, nacimiento, meta = (np.array(columna) for columna in zip(*usuarios))
+    peso, altura, meta = (c.astype(float) for c in (peso, altura, meta))
+
+    # Índice de cada total diario en el array de usuarios, por búsqueda binaria
+    orden = np.argsort(nombres)
+    if totales:
+        usuario_dia, total_dia = zip(*totales)
+        indice = orden[np.searchsorted(nombres, np.array(usuario_dia), sorter=orden)]
+        total_dia = np.array(total_dia, dtype=float)
+    else:
+        indice, total_dia = np.zeros(0, dtype=np.intp), np.zeros(0)
+    dias, ingesta_media, ratio_meta, adherencia = metricas_de_consumo(indice, total_dia, meta)
+
+    return {
+        "usuario": nombres,
+        "imc": imc_vectorizado(peso, altura),
+        "tmb": tmb_vectorizado(peso, altura, nacimiento, hasta, sexo == "Femenino"),
+        "meta_calorias": meta,
+        "dias_registrados": dias,
+        "ingesta_media": ingesta_media,
+        "ratio_meta": ratio_meta,
+        "adherencia": adherencia,
+    }
+
+# --- Orquestación ---
+def _lotes(id_minimo, id_maximo, tamano):
+    return [(inicio, min(inicio + tamano - 1, id_maximo))
+            for inicio in range(id_minimo, id_maximo + 1, tamano)]
+
+def _filas(valores):
+    """NaN de NumPy a NULL y escalares de NumPy a tipos de Python."""
+    return [None if isinstance(v, float) and np.isnan(v) else v for v in valores.tolist()]
+
+def generar_informe(hasta=None, dias=COHORTE_DIAS, procesos=COHORTE_PROCESOS,
+                    lote=COHORTE_LOTE_USUARIOS, url=None) -> int:
+    """Calcula el informe de todos los usuarios, lo guarda y devuelve su id."""
+    inicio = time.perf_counter()
+    url = url or settings.SQLALCHEMY_DATABASE_URI
+    hasta = hasta or date.today()
+    desde = hasta - timedelta(days=dias - 1)
+
+    _iniciar_proceso(url)
+    motor = _motor
+    Base.metadata.create_all(motor, tables=TABLAS_INFORME)
+    with motor.connect() as conexion:
+        id_minimo, id_maximo = conexion.execute(select(func.min(Usuario.id), func.max(Usuario.id))).one()
+
+    resultados = []
+    if id_minimo is not None:
+        lotes = _lotes(id_minimo, id_maximo, lote)
+        if procesos > 1 and len(lotes) > 1:
+            with ProcessPoolExecutor(max_workers=min(procesos, len(lotes)),
+                                     initializer=_iniciar_proceso, initargs=(url,)) as pool:
+                futuros = [pool.submit(procesar_lote, a, b, desde, hasta) for a, b in lotes]
+                resultados = [f.result() for f in futuros]
+        else:
+            resultados = [procesar_lote(a, b, desde, hasta) for a, b in lotes]
+    resultados = [r for r in resultados if r is not None]
+    columnas = {nombre: np.concatenate([r[nombre] for r in resultados]) if resultados else np.zeros(0)
+                for nombre in COLUMNAS_USUARIO}
+
+    distribucion = []
+    for metrica in METRICAS:
+        valores = columnas[metrica].astype(float)
+        valores = valores[~np.isnan(valores)]
+        percentiles = np.percentile(valores, PERCENTILES) if len(valores) else [None] * len(PERCENTILES)
+        distribucion += [{"metrica": metrica, "percentil": p, "valor": None if v is None else float(v)}
+                         for p, v in zip(PERCENTILES, percentiles)]
+
+    total = len(columnas["usuario"])
+    with motor.begin() as conexion:
+        informe_id = conexion.execute(insert(InformeCohorte).values(
+            desde=desde, hasta=hasta, usuarios=total,
+            duracion_ms=(time.perf_counter() - inicio) * 1000,
+        )).inserted_primary_key[0]
+        if total:
+            conexion.execute(insert(InformeCohorteUsuario), [
+                dict(zip(COLUMNAS_USUARIO, fila), informe_id=informe_id)
+                for fila in zip(*(_filas(columnas[n]) for n in COLUMNAS_USUARIO))
+            ])
+        conexion.execute(insert(InformeCohorteDistribucion),
+                         [dict(d, informe_id=informe_id) for d in distribucion])
+    motor.dispose()
+    return informe_id
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Informe de salud de todos los usuarios")
+    parser.add_argument("--dias", type=int, default=COHORTE_DIAS, help="Días de consumos que abarca")
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None,
+                        help="Último día incluido (AAAA-MM-DD); por defecto hoy")
+    parser.add_argument("--procesos", type=int, default=COHORTE_PROCESOS)
+    parser.add_argument("--lote", type=int, default=COHORTE_LOTE_USUARIOS, help="Usuarios por lote")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    informe_id = generar_informe(args.hasta, args.dias, args.procesos, args.lote)
+    print(f"Informe {informe_id} generado en {time.perf_counter() - inicio:.1f} s")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+# metricas.py
+# Métricas Prometheus de la API, expuestas en GET /metrics (formato texto).
+#
+#   api_peticiones_total / api_peticion_duracion_segundos
+#       por método, plantilla de ruta (/peso/{peso_id}, no la URL) y estado
+#   api_db_consulta_duracion_segundos / api_db_errores_total
+#       por tipo de sentencia, medidas con eventos del motor SQLAlchemy
+#   api_hilos_*        pool de hilos de anyio (endpoints y dependencias síncronas)
+#   api_hash_*         pool de hash de contraseñas: cola, hilos ocupados y espera
+#
+# No necesita servicios externos: se puede leer /metrics con cualquier cliente
+# HTTP o, con METRICAS_ARCHIVO, leer el fichero que se reescribe cada
+# METRICAS_INTERVALO_S. Con varios workers gateway.main() define
+# PROMETHEUS_MULTIPROC_DIR y cada respuesta agrega los valores de todos ellos.
+
+import asyncio
+import os
+import time
+from anyio import to_thread
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess, write_to_textfile,
+)
+from sqlalchemy import event
+from .database import settings
+
+_BUCKETS_DB = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_BUCKETS_HASH = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+PETICIONES = Counter(
+    "api_peticiones_total", "Peticiones HTTP atendidas", ["metodo", "ruta", "estado"])
+DURACION_PETICION = Histogram(
+    "api_peticion_duracion_segundos", "Duración de las peticiones HTTP, cuerpo incluido",
+    ["metodo", "ruta", "estado"])
+PETICIONES_EN_CURSO = Gauge(
+    "api_peticiones_en_curso", "Peticiones HTTP en curso", multiprocess_mode="livesum")
+
+DURACION_CONSULTA = Histogram(
+    "api_db_consulta_duracion_segundos", "Duración de las sentencias SQL", ["operacion"],
+    buckets=_BUCKETS_DB)
+ERRORES_DB = Counter(
+    "api_db_errores_total", "Sentencias SQL que terminaron en error", ["operacion"])
+
+HILOS_EN_USO = Gauge(
+    "api_hilos_en_uso", "Hilos del pool de anyio ocupados", multiprocess_mode="livesum")
+HILOS_CAPACIDAD = Gauge(
+    "api_hilos_capacidad", "Tamaño del pool de hilos de anyio", multiprocess_mode="livesum")
+HILOS_EN_ESPERA = Gauge(
+    "api_hilos_en_espera", "Tareas esperando un hilo libre de anyio", multiprocess_mode="livesum")
+
+HASH_EN_COLA = Gauge(
+    "api_hash_en_cola", "Hashes de contraseña esperando un hilo", multiprocess_mode="livesum")
+HASH_EN_EJECUCION = Gauge(
+    "api_hash_en_ejecucion", "Hilos del pool de hash ocupados", multiprocess_mode="livesum")
+HASH_CAPACIDAD = Gauge(
+    "api_hash_capacidad", "Hilos del pool de hash", multiprocess_mode="livesum")
+HASH_ESPERA = Histogram(
+    "api_hash_espera_segundos", "Tiempo en cola antes de empezar un hash", buckets=_BUCKETS_HASH)
+
+SIN_RUTA = "<sin_ruta>"
+_OPERACIONES = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+def es_multiproceso() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+def registro():
+    """Registro a exponer: el del proceso, o el agregado de todos los workers."""
+    if not es_multiproceso():
+        return REGISTRY
+    agregado = CollectorRegistry()
+    multiprocess.MultiProcessCollector(agregado)
+    return agregado
+
+class MetricasMiddleware:
+    """Cuenta y cronometra cada petición HTTP por plantilla de ruta y estado."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        estado = 500  # si la aplicación falla antes de responder
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        PETICIONES_EN_CURSO.inc()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            PETICIONES_EN_CURSO.dec()
+            # FastAPI deja la ruta resuelta en el scope; las URL sin ruta (404)
+            # comparten etiqueta para no crear una serie por URL
+            ruta = getattr(scope.get("route"), "path", None) or SIN_RUTA
+            etiquetas = (scope["method"], ruta, str(estado))
+            PETICIONES.labels(*etiquetas).inc()
+            DURACION_PETICION.labels(*etiquetas).observe(time.perf_counter() - inicio)
+
+def _operacion(sentencia: str) -> str:
+    palabra = sentencia.lstrip().split(None, 1)[0].upper() if sentencia.strip() else ""
+    return palabra if palabra in _OPERACIONES else "OTRA"
+
+def instrumentar_motor(motor):
+    """Registra la duración de cada sentencia del motor (síncrono o asíncrono)."""
+    sincrono = getattr(motor, "sync_engine", motor)
+
+    @event.listens_for(sincrono, "before_cursor_execute")
+    def _antes(conexion, cursor, sentencia, parametros, contexto, executemany):
+        conexion.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+    @event.listens_for(sincrono, "after_cursor_execute")
+    def _despues(conexion, cursor, sentencia, parametros, contexto, executemany):
+        inicio = conexion.info["metricas_inicio"].pop()
+        DURACION_CONSULTA.labels(_operacion(sentencia)).observe(time.perf_counter() - inicio)
+
+    @event.listens_for(sincrono, "handle_error")
+    def _error(contexto):
+        pila = contexto.connection.info.get("metricas_inicio") if contexto.connection is not None else None
+        if pila:
+            pila.pop()
+        ERRORES_DB.labels(_operacion(contexto.statement or "")).inc()
+
+def _muestrear_pools(pool_hash):
+    estadisticas = to_thread.current_default_thread_limiter().statistics()
+    HILOS_EN_USO.set(estadisticas.borrowed_tokens)
+    HILOS_CAPACIDAD.set(estadisticas.total_tokens)
+    HILOS_EN_ESPERA.set(estadisticas.tasks_waiting)
+    HASH_EN_COLA.set(pool_hash._work_queue.qsize())
+    HASH_CAPACIDAD.set(pool_hash._max_workers)
+
+async def muestrear(pool_hash):
+    """Tarea de fondo de cada worker: actualiza los gauges de los pools y, si se
+    configuró METRICAS_ARCHIVO, reescribe el fichero de métricas."""
+    while True:
+        try:
+            _muestrear_pools(pool_hash)
+            if settings.METRICAS_ARCHIVO:
+                await asyncio.to_thread(write_to_textfile, settings.METRICAS_ARCHIVO, registro())
+        except Exception as e:
+            print(f"Error al actualizar las métricas: {e}")
+        await asyncio.sleep(settings.METRICAS_INTERVALO_S)
+
+def marcar_fin_de_proceso():
+    """Descarta los gauges de este worker al terminar (modo multiproceso)."""
+    if es_multiproceso():
+        multiprocess.mark_process_dead(os.getpid())
+
+router = APIRouter(tags=["Métricas"])
+
+@router.get("/metrics", include_in_schema=False)
+async def exponer_metricas():
+    return Response(generate_latest(registro()), media_type=CONTENT_TYPE_LATEST)
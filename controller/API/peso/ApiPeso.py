@@ -1,46 +1,54 @@
 # peso_api.py
 
 import os
-from datetime import datetime
+import sqlite3
+from datetime import datetime, date
 from typing import List
-import uvicorn
-from fastapi import FastAPI, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field, field_validator
-from sqlalchemy import create_engine, Column, Integer, String, Float
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-
-# --- Configuración ---
-class Settings:
-    SQLALCHEMY_DATABASE_URI: str = os.environ.get('PESO_DATABASE_URL') or 'sqlite:///./peso.db'
-    JWT_SECRET_KEY: str = os.environ.get('Key_JWT') or 'dev-secret-key-change-in-production'
-    JWT_ALGORITHM: str = "HS256"
-
-settings = Settings()
+from sqlalchemy import Column, Integer, String, Float, Date, Index, func, insert, inspect, select, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from controller.API.database import Base, SessionLocal, engine, get_db, settings
+from controller.API.seguridad import obtener_usuario_actual
+from controller.API.respuestas import FilasJSONResponse, columnas_de
+from controller.API.eventos import publicar
 
 # --- Modelo de Base de Datos ---
-Base = declarative_base()
-
 class Peso(Base):
     __tablename__ = 'peso'
     
     id = Column(Integer, primary_key=True, index=True)
+    usuario = Column(String(80), nullable=False)
     fecha = Column(String(8), nullable=False)  # DD-MM-YY
+    dia = Column(Date, nullable=False)  # 'fecha' como Date, para poder ordenar
     peso = Column(Float, nullable=False)
 
-# --- Configuración de la Base de Datos ---
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base.metadata.create_all(bind=engine)
+    __table_args__ = (
+        Index('ix_peso_usuario_dia', 'usuario', 'dia', 'id'),
+        Index('ix_peso_usuario_peso', 'usuario', 'peso'),
+    )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+class PesoEstadisticas(Base):
+    """
+    Agregados por usuario que se mantienen al insertar, actualizar o borrar
+    registros de peso, para que /peso/estadisticas/ no recorra el historial.
+    """
+    __tablename__ = 'peso_estadisticas'
+
+    usuario = Column(String(80), primary_key=True)
+    total_registros = Column(Integer, nullable=False, default=0)
+    suma = Column(Float, nullable=False, default=0.0)
+    peso_minimo = Column(Float)
+    peso_maximo = Column(Float)
+    inicial_id = Column(Integer)
+    inicial_dia = Column(Date)
+    peso_inicial = Column(Float)
+    actual_id = Column(Integer)
+    actual_dia = Column(Date)
+    peso_actual = Column(Float)
+    ema = Column(Float)
 
 # --- Esquemas Pydantic ---
 class PesoBase(BaseModel):
@@ -65,89 +73,372 @@ class PesoPublic(PesoBase):
     class Config:
         orm_mode = True
 
-# --- Autenticación ---
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="http://127.0.0.1:8000/login")
+class PesoEstadisticasPublic(BaseModel):
+    peso_actual: float
+    peso_inicial: float
+    diferencia_peso: float
+    peso_promedio: float
+    peso_minimo: float
+    peso_maximo: float
+    peso_tendencia: float = Field(..., description="Media móvil exponencial del peso")
+    total_registros: int
+
+# --- Estadísticas incrementales ---
+def _fecha_a_dia(fecha: str) -> date:
+    return datetime.strptime(fecha, '%d-%m-%y').date()
+
+def _insertar_si_no_existe(dialecto: str, tabla, **valores):
+    """INSERT que no falla si otra transacción ya creó la fila (ON CONFLICT DO NOTHING)."""
+    if dialecto == 'sqlite':
+        return sqlite.insert(tabla).values(**valores).on_conflict_do_nothing()
+    if dialecto == 'postgresql':
+        return postgresql.insert(tabla).values(**valores).on_conflict_do_nothing()
+    if dialecto in ('mysql', 'mariadb'):
+        return mysql.insert(tabla).values(**valores).prefix_with('IGNORE')
+    return insert(tabla).values(**valores)
+
+async def _obtener_estadisticas(db: AsyncSession, usuario: str) -> PesoEstadisticas:
+    """
+    Devuelve los agregados del usuario bloqueando la fila si el motor lo
+    permite. Si no existen se insertan sin fallar cuando dos primeras altas
+    concurrentes los crean a la vez, y se vuelven a leer.
+    """
+    consulta = select(PesoEstadisticas).where(PesoEstadisticas.usuario == usuario).with_for_update()
+    stats = await db.scalar(consulta)
+    if stats is None:
+        await db.execute(_insertar_si_no_existe(
+            db.bind.dialect.name, PesoEstadisticas.__table__, usuario=usuario, total_registros=0, suma=0.0))
+        stats = await db.scalar(consulta)
+    return stats
+
+def _ema_siguiente(ema, peso):
+    alfa = settings.PESO_EMA_ALFA
+    return peso if ema is None else alfa * peso + (1 - alfa) * ema
+
+def _filtro_usuario(usuario: str, excluir_id=None):
+    condiciones = [Peso.usuario == usuario]
+    if excluir_id is not None:
+        condiciones.append(Peso.id != excluir_id)
+    return condiciones
+
+def _registros_ordenados(usuario: str, excluir_id=None):
+    return select(Peso).where(*_filtro_usuario(usuario, excluir_id)).order_by(Peso.dia, Peso.id)
 
-async def obtener_usuario_actual(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudieron validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
+async def _recalcular_ema(db: AsyncSession, usuario: str, excluir_id=None):
+    ema = None
+    pesos = await db.scalars(
+        select(Peso.peso).where(*_filtro_usuario(usuario, excluir_id)).order_by(Peso.dia, Peso.id)
     )
-    
+    for peso in pesos:
+        ema = _ema_siguiente(ema, peso)
+    return ema
+
+async def _registrar_alta(db: AsyncSession, stats: PesoEstadisticas, registro: Peso):
+    """Incorpora un registro (ya insertado y con id) a los agregados."""
+    clave = (registro.dia, registro.id)
+    stats.total_registros += 1
+    stats.suma += registro.peso
+    stats.peso_minimo = registro.peso if stats.peso_minimo is None else min(stats.peso_minimo, registro.peso)
+    stats.peso_maximo = registro.peso if stats.peso_maximo is None else max(stats.peso_maximo, registro.peso)
+
+    if stats.inicial_id is None or clave < (stats.inicial_dia, stats.inicial_id):
+        stats.inicial_id, stats.inicial_dia, stats.peso_inicial = registro.id, registro.dia, registro.peso
+
+    if stats.actual_id is None or clave > (stats.actual_dia, stats.actual_id):
+        stats.actual_id, stats.actual_dia, stats.peso_actual = registro.id, registro.dia, registro.peso
+        stats.ema = _ema_siguiente(stats.ema, registro.peso)
+    else:
+        # Registro retroactivo: la EMA depende del orden, hay que recalcularla
+        stats.ema = await _recalcular_ema(db, stats.usuario)
+
+async def _registrar_baja(db: AsyncSession, stats: PesoEstadisticas, id_, peso):
+    """
+    Descuenta un registro de los agregados. Las consultas excluyen su id, así
+    sirve tanto para un borrado como para retirar los valores antiguos de una
+    actualización.
+    """
+    stats.total_registros -= 1
+    stats.suma -= peso
+    if stats.total_registros == 0:
+        stats.suma = 0.0
+        stats.peso_minimo = stats.peso_maximo = stats.ema = None
+        stats.inicial_id = stats.inicial_dia = stats.peso_inicial = None
+        stats.actual_id = stats.actual_dia = stats.peso_actual = None
+        return
+
+    restantes = _filtro_usuario(stats.usuario, id_)
+    if peso <= stats.peso_minimo or peso >= stats.peso_maximo:
+        # Con el índice (usuario, peso) MIN/MAX no recorren la tabla
+        stats.peso_minimo, stats.peso_maximo = (await db.execute(
+            select(func.min(Peso.peso), func.max(Peso.peso)).where(*restantes)
+        )).one()
+
+    if id_ == stats.inicial_id:
+        primero = await db.scalar(_registros_ordenados(stats.usuario, id_).limit(1))
+        stats.inicial_id, stats.inicial_dia, stats.peso_inicial = primero.id, primero.dia, primero.peso
+
+    if id_ == stats.actual_id:
+        ultimo = await db.scalar(
+            select(Peso).where(*restantes).order_by(Peso.dia.desc(), Peso.id.desc()).limit(1)
+        )
+        stats.actual_id, stats.actual_dia, stats.peso_actual = ultimo.id, ultimo.dia, ultimo.peso
+    # Deshacer el último paso de la EMA dividiendo por (1 - alfa) amplifica el
+    # error de redondeo en cada baja: se recalcula con los registros que quedan
+    stats.ema = await _recalcular_ema(db, stats.usuario, id_)
+
+async def recalcular_estadisticas(db: AsyncSession, usuario: str) -> dict:
+    """
+    Calcula los agregados recorriendo todo el historial. No se usa en el camino
+    normal; sirve para reparar la tabla y para verificar la versión incremental.
+    """
+    registros = (await db.scalars(_registros_ordenados(usuario))).all()
+    if not registros:
+        return {"total_registros": 0}
+    pesos = [r.peso for r in registros]
+    return {
+        "total_registros": len(pesos),
+        "suma": sum(pesos),
+        "peso_minimo": min(pesos),
+        "peso_maximo": max(pesos),
+        "peso_inicial": registros[0].peso,
+        "peso_actual": registros[-1].peso,
+        "ema": await _recalcular_ema(db, usuario),
+    }
+
+async def reconstruir_estadisticas(db: AsyncSession, usuario: str):
+    """Reescribe los agregados del usuario a partir de todo su historial (sin commit)."""
+    stats = await _obtener_estadisticas(db, usuario)
+    registros = (await db.scalars(_registros_ordenados(usuario))).all()
+    stats.total_registros = len(registros)
+    stats.suma = sum(r.peso for r in registros)
+    stats.ema = None
+    for registro in registros:
+        stats.ema = _ema_siguiente(stats.ema, registro.peso)
+    if not registros:
+        stats.suma = 0.0
+        stats.peso_minimo = stats.peso_maximo = None
+        stats.inicial_id = stats.inicial_dia = stats.peso_inicial = None
+        stats.actual_id = stats.actual_dia = stats.peso_actual = None
+        return stats
+    primero, ultimo = registros[0], registros[-1]
+    stats.peso_minimo = min(r.peso for r in registros)
+    stats.peso_maximo = max(r.peso for r in registros)
+    stats.inicial_id, stats.inicial_dia, stats.peso_inicial = primero.id, primero.dia, primero.peso
+    stats.actual_id, stats.actual_dia, stats.peso_actual = ultimo.id, ultimo.dia, ultimo.peso
+    return stats
+
+# --- Migración de datos existentes ---
+def _columnas_peso(conexion) -> set:
+    inspector = inspect(conexion)
+    if not inspector.has_table('peso'):
+        return set()
+    return {columna['name'] for columna in inspector.get_columns('peso')}
+
+def _crear_indices_peso(conexion):
+    # create_all no añade índices a una tabla que ya existía
+    for indice in Peso.__table__.indexes:
+        indice.create(conexion, checkfirst=True)
+
+async def _usuario_heredado(db: AsyncSession) -> str:
+    """Dueño de los pesos sin usuario: PESO_USUARIO_HEREDADO, o el único usuario registrado."""
+    if settings.PESO_USUARIO_HEREDADO:
+        return settings.PESO_USUARIO_HEREDADO
+    nombres = (await db.execute(text("SELECT nombre_usuario FROM usuarios LIMIT 2"))).scalars().all()
+    return nombres[0] if len(nombres) == 1 else ''
+
+def _es_la_base_de_la_api(ruta: str) -> bool:
+    url = make_url(settings.SQLALCHEMY_DATABASE_URI)
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return False
+    return os.path.exists(url.database) and os.path.samefile(url.database, ruta)
+
+def _leer_peso_anterior(ruta: str) -> list:
+    """(usuario, fecha, peso) de la tabla `peso` de la base anterior, con o sin columna `usuario`."""
+    conexion = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        return username
-    except JWTError:
-        raise credentials_exception
+        columnas = {fila[1] for fila in conexion.execute("PRAGMA table_info(peso)")}
+        if not columnas:
+            return []
+        usuario = "usuario" if "usuario" in columnas else "''"
+        return conexion.execute(f"SELECT {usuario}, fecha, peso FROM peso ORDER BY id").fetchall()
+    finally:
+        conexion.close()
+
+async def importar_peso_anterior(ruta=None, sesiones=None) -> int:
+    """
+    Copia los registros de la base propia de la antigua API de peso
+    (PESO_DB_ANTERIOR, peso.db) y la renombra a peso.db.importado para no
+    repetirlo. Los registros sin usuario los asigna después migrar_peso().
+    Devuelve cuántos registros se importaron.
+    """
+    ruta, sesiones = ruta or settings.PESO_DB_ANTERIOR, sesiones or SessionLocal
+    if not ruta or not os.path.exists(ruta) or _es_la_base_de_la_api(ruta):
+        return 0
+    # Renombrarlo primero la reserva: con varios workers arrancando a la vez solo uno la importa
+    en_curso = ruta + ".importando"
+    try:
+        os.rename(ruta, en_curso)
+    except OSError:
+        return 0
+    try:
+        filas = _leer_peso_anterior(en_curso)
+        importados = 0
+        async with sesiones() as db:
+            for usuario, fecha, peso in filas:
+                try:
+                    dia = _fecha_a_dia(fecha)
+                except (TypeError, ValueError):
+                    print(f"ADVERTENCIA: Peso de {ruta} con fecha no válida, no se importa: {fecha!r}")
+                    continue
+                db.add(Peso(usuario=usuario or '', fecha=fecha, dia=dia, peso=peso))
+                importados += 1
+            await db.commit()
+    except (sqlite3.Error, OSError) as e:
+        os.rename(en_curso, ruta)
+        print(f"ADVERTENCIA: No se pudieron importar los pesos de {ruta}: {e}")
+        return 0
+    os.rename(en_curso, ruta + ".importado")
+    print(f"NOTA: {importados} registros de peso importados de {ruta} (renombrado a {ruta}.importado)")
+    return importados
+
+async def migrar_peso(motor=None, sesiones=None):
+    """
+    Adapta una tabla `peso` anterior a los agregados (sin `usuario` ni `dia`),
+    completa esas columnas y reconstruye las estadísticas que falten o no
+    cuadren con el historial. Se ejecuta en cada arranque: si no hay nada que
+    migrar solo cuesta un recuento por usuario.
+    """
+    motor, sesiones = motor or engine, sesiones or SessionLocal
+    async with motor.begin() as conexion:
+        columnas = await conexion.run_sync(_columnas_peso)
+        if columnas and 'usuario' not in columnas:
+            await conexion.execute(text("ALTER TABLE peso ADD COLUMN usuario VARCHAR(80) NOT NULL DEFAULT ''"))
+        if columnas and 'dia' not in columnas:
+            await conexion.execute(text("ALTER TABLE peso ADD COLUMN dia DATE"))
+        await conexion.run_sync(_crear_indices_peso)
+
+    async with sesiones() as db:
+        sin_usuario = await db.scalar(select(func.count()).select_from(Peso).where(Peso.usuario == ''))
+        if sin_usuario:
+            dueno = await _usuario_heredado(db)
+            if dueno:
+                await db.execute(Peso.__table__.update().where(Peso.usuario == '').values(usuario=dueno))
+                print(f"NOTA: {sin_usuario} registros de peso sin usuario asignados a '{dueno}'")
+            else:
+                print(f"ADVERTENCIA: {sin_usuario} registros de peso no tienen usuario; "
+                      "defina PESO_USUARIO_HEREDADO para asignarlos")
+
+        for id_, fecha in (await db.execute(select(Peso.id, Peso.fecha).where(Peso.dia.is_(None)))).all():
+            try:
+                await db.execute(Peso.__table__.update().where(Peso.id == id_).values(dia=_fecha_a_dia(fecha)))
+            except (TypeError, ValueError):
+                print(f"ADVERTENCIA: El registro de peso {id_} tiene una fecha no válida: {fecha!r}")
+
+        recuentos = dict((await db.execute(
+            select(Peso.usuario, func.count()).where(Peso.usuario != '').group_by(Peso.usuario)
+        )).all())
+        agregados = dict((await db.execute(
+            select(PesoEstadisticas.usuario, PesoEstadisticas.total_registros)
+        )).all())
+        desfasados = sorted(u for u in recuentos.keys() | agregados.keys()
+                            if recuentos.get(u, 0) != (agregados.get(u) or 0))
+        for usuario in desfasados:
+            await reconstruir_estadisticas(db, usuario)
+        if desfasados:
+            print(f"NOTA: Estadísticas de peso reconstruidas para {len(desfasados)} usuarios")
+        await db.commit()
+
+async def _peso_del_usuario(db: AsyncSession, peso_id: int, usuario: str) -> Peso:
+    peso = await db.scalar(select(Peso).where(Peso.id == peso_id, Peso.usuario == usuario))
+    if not peso:
+        raise HTTPException(status_code=404, detail="Peso no encontrado")
+    return peso
 
 # --- API ---
-app = FastAPI(title="API de Peso", version="1.0.0")
+router = APIRouter(tags=["Peso"])
 
-@app.post("/peso/", response_model=PesoPublic, status_code=status.HTTP_201_CREATED)
+@router.post("/peso/", response_model=PesoPublic, status_code=status.HTTP_201_CREATED)
 async def crear_peso(
     peso: PesoCreate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     usuario: str = Depends(obtener_usuario_actual)
 ):
-    nuevo_peso = Peso(fecha=peso.fecha, peso=peso.peso)
+    stats = await _obtener_estadisticas(db, usuario)
+    nuevo_peso = Peso(usuario=usuario, fecha=peso.fecha, dia=_fecha_a_dia(peso.fecha), peso=peso.peso)
     db.add(nuevo_peso)
-    db.commit()
-    db.refresh(nuevo_peso)
+    await db.flush()  # Asigna el id sin cerrar la transacción
+    await _registrar_alta(db, stats, nuevo_peso)
+    publicar(db, "peso", {"accion": "alta", "id": nuevo_peso.id, "fecha": nuevo_peso.fecha, "peso": nuevo_peso.peso}, usuario)
+    await db.commit()
     return nuevo_peso
 
-@app.get("/peso/", response_model=List[PesoPublic])
+@router.get("/peso/", response_model=List[PesoPublic], response_class=FilasJSONResponse)
 async def obtener_pesos(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     usuario: str = Depends(obtener_usuario_actual)
 ):
-    return db.query(Peso).all()
+    return FilasJSONResponse(await db.execute(
+        columnas_de(Peso, PesoPublic).where(*_filtro_usuario(usuario)).order_by(Peso.dia, Peso.id)
+    ))
 
-@app.get("/peso/{peso_id}", response_model=PesoPublic)
+@router.get("/peso/estadisticas/", response_model=PesoEstadisticasPublic)
+async def obtener_estadisticas_peso(
+    db: AsyncSession = Depends(get_db),
+    usuario: str = Depends(obtener_usuario_actual)
+):
+    stats = await db.get(PesoEstadisticas, usuario)
+    if not stats or stats.total_registros == 0:
+        raise HTTPException(status_code=404, detail="No hay registros de peso")
+    return PesoEstadisticasPublic(
+        peso_actual=stats.peso_actual,
+        peso_inicial=stats.peso_inicial,
+        diferencia_peso=stats.peso_actual - stats.peso_inicial,
+        peso_promedio=stats.suma / stats.total_registros,
+        peso_minimo=stats.peso_minimo,
+        peso_maximo=stats.peso_maximo,
+        peso_tendencia=stats.ema,
+        total_registros=stats.total_registros,
+    )
+
+@router.get("/peso/{peso_id}", response_model=PesoPublic)
 async def obtener_peso(
     peso_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     usuario: str = Depends(obtener_usuario_actual)
 ):
-    peso = db.query(Peso).filter(Peso.id == peso_id).first()
-    if not peso:
-        raise HTTPException(status_code=404, detail="Peso no encontrado")
-    return peso
+    return await _peso_del_usuario(db, peso_id, usuario)
 
-@app.put("/peso/{peso_id}", response_model=PesoPublic)
+@router.put("/peso/{peso_id}", response_model=PesoPublic)
 async def actualizar_peso(
     peso_id: int,
     peso_actualizado: PesoCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     usuario: str = Depends(obtener_usuario_actual)
 ):
-    peso = db.query(Peso).filter(Peso.id == peso_id).first()
-    if not peso:
-        raise HTTPException(status_code=404, detail="Peso no encontrado")
+    stats = await _obtener_estadisticas(db, usuario)
+    peso = await _peso_del_usuario(db, peso_id, usuario)
     
+    # Una actualización es una baja de los valores antiguos más un alta de los nuevos
+    await _registrar_baja(db, stats, peso.id, peso.peso)
     peso.fecha = peso_actualizado.fecha
+    peso.dia = _fecha_a_dia(peso_actualizado.fecha)
     peso.peso = peso_actualizado.peso
-    db.commit()
-    db.refresh(peso)
+    await db.flush()
+    await _registrar_alta(db, stats, peso)
+    publicar(db, "peso", {"accion": "cambio", "id": peso.id, "fecha": peso.fecha, "peso": peso.peso}, usuario)
+    await db.commit()
     return peso
 
-@app.delete("/peso/{peso_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/peso/{peso_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def eliminar_peso(
     peso_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     usuario: str = Depends(obtener_usuario_actual)
 ):
-    peso = db.query(Peso).filter(Peso.id == peso_id).first()
-    if not peso:
-        raise HTTPException(status_code=404, detail="Peso no encontrado")
+    stats = await _obtener_estadisticas(db, usuario)
+    peso = await _peso_del_usuario(db, peso_id, usuario)
     
-    db.delete(peso)
-    db.commit()
-
-if __name__ == "__main__":
-    print("Iniciando API de Peso...")
-    print("Accede a la documentación en http://127.0.0.1:8001/docs")
-    uvicorn.run("peso_api:app", host="127.0.0.1", port=8001, reload=True)
\ No newline at end of file
+    await _registrar_baja(db, stats, peso.id, peso.peso)
+    publicar(db, "peso", {"accion": "baja", "id": peso.id}, usuario)
+    await db.delete(peso)
+    await db.commit()
@@ -7,7 +7,7 @@ from datetime import date, datetime
 
 # URLs de las APIs
 USER_API_URL = "http://127.0.0.1:8000"
-PESO_API_URL = "http://127.0.0.1:8001"
+PESO_API_URL = USER_API_URL  # Ambos routers los sirve el mismo gateway
 
 class ClienteAPIs:
     def __init__(self):
@@ -214,15 +214,14 @@ def ejemplo_uso_completo():
 
 if __name__ == "__main__":
     print("🚀 Iniciando ejemplo de integración de APIs")
-    print("📋 Asegúrate de que ambas APIs estén ejecutándose:")
-    print("   • API Usuarios: http://127.0.0.1:8000")
-    print("   • API Peso: http://127.0.0.1:8001")
+    print("📋 Asegúrate de que el gateway de la API esté ejecutándose:")
+    print("   • python -m controller.API.gateway (http://127.0.0.1:8000)")
     print()
     
     try:
         ejemplo_uso_completo()
     except requests.exceptions.ConnectionError:
         print("❌ Error: No se pudo conectar a las APIs")
-        print("   Verifica que ambas APIs estén ejecutándose")
+        print("   Verifica que el gateway de la API esté ejecutándose")
     except Exception as e:
         print(f"❌ Error inesperado: {e}")
\ No newline at end of file
@@ -0,0 +1,58 @@
+# respuestas.py
+# Respuesta JSON rápida para endpoints que devuelven listas largas.
+#
+# El camino normal de FastAPI construye un objeto Pydantic por fila a partir
+# del ORM y luego lo pasa por jsonable_encoder y json.dumps. Los datos de la
+# base ya se validaron al escribirse, así que los endpoints de listado pueden
+# pedir solo las columnas del esquema público y serializar las tuplas con orjson.
+#
+#   @router.get("/alimentos", response_model=List[AlimentoPublic], response_class=FilasJSONResponse)
+#   async def listar(db: AsyncSession = Depends(get_db)):
+#       return FilasJSONResponse(await db.execute(columnas_de(AlimentoPersonalizado, AlimentoPublic)))
+#
+# response_model se mantiene para la documentación OpenAPI; al devolver la
+# respuesta ya construida FastAPI no vuelve a validarla.
+#
+# Con columnar=True (?formato=columnar) el cuerpo es un objeto con una lista
+# por campo, que evita repetir las claves en cada fila:
+#   {"nombre": ["Manzana", "Pan"], "total_cal": [52.0, 80.0], ...}
+
+from typing import Literal
+import orjson
+from fastapi import Query
+from fastapi.responses import Response
+from sqlalchemy import select
+
+def columnas_de(modelo, esquema):
+    """SELECT de las columnas de `modelo` que expone `esquema`, en el mismo orden."""
+    return select(*(getattr(modelo, campo) for campo in esquema.model_fields))
+
+FormatoLista = Literal["filas", "columnar"]
+
+def parametro_formato(
+    formato: FormatoLista = Query("filas", description="'columnar' devuelve una lista por campo en lugar de una lista de objetos")
+) -> bool:
+    """Dependencia para los endpoints de listado: True si se pidió el formato columnar."""
+    return formato == "columnar"
+
+class FilasJSONResponse(Response):
+    media_type = "application/json"
+
+    def __init__(self, filas=None, columnas=None, columnar=False, **kwargs):
+        # filas puede ser un Result de SQLAlchemy (aporta sus columnas) o una
+        # secuencia de tuplas acompañada de `columnas`
+        if columnas is None and hasattr(filas, "keys"):
+            columnas = list(filas.keys())
+        self.columnas = columnas
+        self.columnar = columnar
+        super().__init__(content=filas, **kwargs)
+
+    def render(self, filas) -> bytes:
+        columnas = self.columnas
+        if self.columnar:
+            filas = list(filas) if filas is not None else []
+            valores = zip(*filas) if filas else ([] for _ in columnas or ())
+            return orjson.dumps({columna: list(lista) for columna, lista in zip(columnas or (), valores)})
+        if filas is None:
+            return b"[]"
+        return orjson.dumps([dict(zip(columnas, fila)) for fila in filas])
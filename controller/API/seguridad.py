@@ -0,0 +1,73 @@
+# seguridad.py
+# Emisión y validación de JWT y hash de contraseñas, compartidos por todos
+# los routers de la API.
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from werkzeug.security import generate_password_hash, check_password_hash
+from .database import settings
+from .metricas import HASH_EN_EJECUCION, HASH_ESPERA
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+oauth2_scheme_opcional = OAuth2PasswordBearer(tokenUrl="login", auto_error=False)
+
+# El hash (scrypt/pbkdf2) es CPU intensivo: se ejecuta en un pool propio para
+# no ocupar el bucle de eventos ni los hilos que atienden otras peticiones.
+hash_pool = ThreadPoolExecutor(max_workers=settings.HASH_WORKERS, thread_name_prefix="hash")
+
+async def _en_pool_hash(funcion, *args):
+    encolada = time.perf_counter()
+
+    def tarea():
+        # El tiempo en cola indica si el pool está saturado
+        HASH_ESPERA.observe(time.perf_counter() - encolada)
+        HASH_EN_EJECUCION.inc()
+        try:
+            return funcion(*args)
+        finally:
+            HASH_EN_EJECUCION.dec()
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hash_pool, tarea)
+
+async def hashear_password(password: str) -> str:
+    return await _en_pool_hash(generate_password_hash, password)
+
+async def verificar_password(password_hash: str, password: str) -> bool:
+    return await _en_pool_hash(check_password_hash, password_hash, password)
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+def decodificar_usuario(token: str) -> Optional[str]:
+    """Devuelve el 'sub' del token, o None si el token no es válido."""
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+async def obtener_usuario_actual(token: str = Depends(oauth2_scheme)) -> str:
+    username = decodificar_usuario(token)
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudieron validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return username
+
+async def obtener_usuario_opcional(token: Optional[str] = Depends(oauth2_scheme_opcional)) -> Optional[str]:
+    """Como obtener_usuario_actual, pero las peticiones sin token se aceptan como anónimas."""
+    if token is None:
+        return None
+    return await obtener_usuario_actual(token)
@@ -1,29 +1,22 @@
 # api.py
 
-import os
 from datetime import datetime, date, timedelta
-from typing import Optional
-import uvicorn
-from fastapi import FastAPI, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, Field, field_validator
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from werkzeug.security import generate_password_hash, check_password_hash
+from controller.API.database import Base, get_db, settings
+from controller.API.seguridad import (
+    create_access_token, obtener_usuario_actual, hashear_password, verificar_password
+)
 
 # --- 1. Configuración ---
-class Settings:
-    SQLALCHEMY_DATABASE_URI: str = os.environ.get('DATABASE_URL') or 'sqlite:///./app.db'
-    JWT_SECRET_KEY: str = os.environ.get('Key_JWT') or 'dev-secret-key-change-in-production'
-    JWT_ALGORITHM: str = "HS256"
-    JWT_ACCESS_TOKEN_EXPIRES_MINUTES: int = 60
-
-settings = Settings()
+# La configuración, el motor y la autenticación son comunes a todos los
+# routers y viven en controller/API/database.py y controller/API/seguridad.py.
 
 # --- 2. Modelos de Base de Datos SQLAlchemy ---
-Base = declarative_base()
 
 class Usuario(Base):
     __tablename__ = 'usuarios'
@@ -47,18 +40,6 @@ class Usuario(Base):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
-# --- Configuración de la Base de Datos ---
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base.metadata.create_all(bind=engine)
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # --- 3. Esquemas Pydantic ---
 
 class UsuarioBase(BaseModel):
@@ -105,28 +86,19 @@ class Token(BaseModel):
 
 
 
-# --- 4. Lógica de Autenticación y JWT ---
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+# --- 4. Router ---
+router = APIRouter()
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-
-# --- 5. Creación de la Aplicación y Endpoints ---
-app = FastAPI(title="API de Registro y Nutrición", version="1.0.0")
-
-@app.post("/register/", response_model=UsuarioPublic, status_code=status.HTTP_201_CREATED, tags=["Auth"])
-def register_user(usuario: UsuarioCreate, db: Session = Depends(get_db)):
-    db_user = db.query(Usuario).filter(Usuario.nombre_usuario == usuario.nombre_usuario).first()
+@router.post("/register/", response_model=UsuarioPublic, status_code=status.HTTP_201_CREATED, tags=["Auth"])
+async def register_user(usuario: UsuarioCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await db.scalar(select(Usuario).where(Usuario.nombre_usuario == usuario.nombre_usuario))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El nombre de usuario ya está registrado."
         )
     
-    hashed_password = generate_password_hash(usuario.password)
+    hashed_password = await hashear_password(usuario.password)
     nuevo_usuario = Usuario(
         nombre_usuario=usuario.nombre_usuario,
         password_hash=hashed_password,
@@ -140,15 +112,15 @@ def register_user(usuario: UsuarioCreate, db: Session = Depends(get_db)):
     )
     
     db.add(nuevo_usuario)
-    db.commit()
-    db.refresh(nuevo_usuario)
+    await db.commit()
+    await db.refresh(nuevo_usuario)
     
     return nuevo_usuario
 
-@app.post("/login/", response_model=Token, tags=["Auth"])
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(Usuario).filter(Usuario.nombre_usuario == form_data.username).first()
-    if not user or not check_password_hash(user.password_hash, form_data.password):
+@router.post("/login/", response_model=Token, tags=["Auth"])
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(Usuario).where(Usuario.nombre_usuario == form_data.username))
+    if not user or not await verificar_password(user.password_hash, form_data.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Nombre de usuario o contraseña incorrectos",
@@ -161,37 +133,21 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
     
     return {"access_token": access_token, "token_type": "bearer"}
 
-@app.get("/users/", response_model=list[str], tags=["Users"])
-def get_all_users(db: Session = Depends(get_db)):
+@router.get("/users/", response_model=list[str], tags=["Users"])
+async def get_all_users(db: AsyncSession = Depends(get_db)):
     """
     Obtiene una lista de todos los nombres de usuario registrados.
     """
-    usuarios = db.query(Usuario.nombre_usuario).all()
-    # La consulta devuelve una lista de tuplas [('user1',), ('user2',)], la aplanamos.
-    return [usuario[0] for usuario in usuarios]
-
-@app.get("/users/me/", response_model=UsuarioPublic, tags=["Users"])
-def read_users_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudieron validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-        
-    user = db.query(Usuario).filter(Usuario.nombre_usuario == username).first()
+    # scalars() aplana las filas [('user1',), ('user2',)] a ['user1', 'user2']
+    return (await db.scalars(select(Usuario.nombre_usuario))).all()
+
+@router.get("/users/me/", response_model=UsuarioPublic, tags=["Users"])
+async def read_users_me(username: str = Depends(obtener_usuario_actual), db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(Usuario).where(Usuario.nombre_usuario == username))
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudieron validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
-
-# << MODIFICADO >>: Se cambia 'main:app' por 'api:app' para reflejar el nuevo nombre del archivo.
-if __name__ == "__main__":
-    print("Iniciando servidor FastAPI...")
-    print("Accede a la documentación en http://127.0.0.1:8000/docs")
-    uvicorn.run("api:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
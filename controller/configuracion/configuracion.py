@@ -1,7 +1,7 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QFrame, QMessageBox,
                              QDialog, QLineEdit, QApplication)
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 from controller.recordatorio.recordatorio_core import Recordatorio
 from model.configuracion.servicios_usuario import UserService
@@ -9,7 +9,8 @@ from model.configuracion.mensajes import MessageHandler
 from view.configuracion.formulario_usuario import UpdateUserForm
 from view.configuracion.formulario_clave import PasswordForm
 from view.configuracion.formulario_recordatorio import ReminderForm
-from model.util.usuario_manager import BaseWidget
+from model.util.usuario_manager import BaseWidget, UsuarioManager
+from model.util.bus_eventos import BusEventos, DatosUsuarioActualizados
 import os
 import subprocess
 import sys
@@ -205,21 +206,21 @@ class PasswordDialog(QDialog):
         self.cancel_btn.clicked.connect(self.reject)
 
 class ConfigUI(QWidget, BaseWidget):
-    datos_usuario_actualizados = pyqtSignal()
-
-    def __init__(self, panel_principal, color, usuario=None):
+    def __init__(self, panel_principal, color, usuario=None, sesion=None):
         QWidget.__init__(self, panel_principal)
-        BaseWidget.__init__(self, parent=panel_principal, usuario=usuario)
+        BaseWidget.__init__(self, parent=panel_principal, usuario=usuario, sesion=sesion)
         
         self.panel_principal = panel_principal
         self.color = color
-        self.usuario = usuario if usuario else self.get_current_user()
         self.user_service = UserService(self.usuario)
         self.recordatorio = Recordatorio(self.usuario)
         self.temp_dir = tempfile.mkdtemp()
         
         self.init_ui()
         self.setup_styles()
+        # Los cambios hechos desde otra sección (p. ej. el peso en Salud)
+        BusEventos.compartido().suscribir(DatosUsuarioActualizados, lambda _evento: self.refrescar_vista(),
+                                          coalescer=True, propietario=self)
         
     def refrescar_vista(self):
         """
@@ -239,11 +240,7 @@ class ConfigUI(QWidget, BaseWidget):
 
     def get_current_user(self):
         """Obtiene el usuario actual"""
-        try:
-            with open('usuario_actual.txt', 'r') as f:
-                return f.read().strip()
-        except:
-            return "usuario_default"
+        return UsuarioManager.obtener_usuario_actual() or "usuario_default"
 
     def init_ui(self):
         """Inicializa la interfaz de usuario"""
@@ -491,9 +488,10 @@ class ConfigUI(QWidget, BaseWidget):
                 if exito_al_guardar:
                     QMessageBox.information(self, "Éxito", "La información ha sido actualizada.")
                     
-                    # Refrescamos la vista actual y avisamos a los demás módulos
+                    # Avisamos a los demás módulos (las cachés de la sesión se
+                    # invalidan antes de nada) y refrescamos la vista actual
+                    BusEventos.compartido().publicar(DatosUsuarioActualizados(origen=self))
                     self.refrescar_vista()
-                    self.datos_usuario_actualizados.emit()
                 else:
                     self.mostrar_error("Error de Guardado", "No se pudieron guardar los cambios en la base de datos.")
                 
@@ -570,8 +568,7 @@ class ConfigUI(QWidget, BaseWidget):
                 return
             
             # Limpiar archivo de usuario actual
-            with open('usuario_actual.txt', 'w') as f:
-                f.write('')
+            UsuarioManager.establecer_usuario_actual('')
             
             self.mostrar_mensaje("Cuenta eliminada. La aplicación se cerrará.", "Éxito")
             dialog.accept()
@@ -1,21 +1,25 @@
+import bisect
 import sqlite3
-import datetime
 from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QMessageBox, 
                              QFrame, QLabel, QPushButton, QTableView, QHeaderView,
                              QDateEdit)
 from PyQt6.QtCore import Qt, pyqtSignal, QAbstractTableModel, QDate
 from .historialfacade import HistorialFacade
+from model.util.rendimiento import medir
+from model.util.bus_eventos import BusEventos, ConsumoNotificado
+from model.util.registros import Consumo, filas_para_tabla
 
 class HistorialTableModel(QAbstractTableModel):
     def __init__(self, data):
+        """`data`: filas de textos ya formateados (filas_para_tabla)."""
         super().__init__()
         self._data = data
         self.headers = ["Alimento", "Fecha", "Hora", "Cantidad", "Calorías"]
 
     def data(self, index, role):
         if role == Qt.ItemDataRole.DisplayRole:
-            return str(self._data[index.row()][index.column()])
+            return self._data[index.row()][index.column()]
         if role == Qt.ItemDataRole.TextAlignmentRole:
             return Qt.AlignmentFlag.AlignCenter
 
@@ -121,8 +125,18 @@ class HistorialView(QWidget):
         self.tabla.setModel(model)
 
 
+def formatear_consumos_para_tabla(consumos: list) -> list:
+    """Convierte los consumos (Consumo) de la API a filas de textos para la tabla."""
+    # La fecha de la API viene en yyyy-MM-dd, se muestra como dd-MM-yyyy
+    return filas_para_tabla(consumos)
+
 # ... (las clases HistorialTableModel y HistorialView se mantienen igual) ...
 
+def rango_por_defecto():
+    """Fechas (QDate) que muestra el historial al abrirse: el último año."""
+    hoy = QDate.currentDate()
+    return hoy.addYears(-1), hoy
+
 # --- Clase Principal (Controlador del Historial) ---
 class Historial(QWidget):
     def __init__(self, panel_principal, color, usuario="test_user"):
@@ -130,9 +144,16 @@ class Historial(QWidget):
         self.usuario = usuario
         # Se inicializa el Facade que habla con la API
         self.facade = HistorialFacade(self.usuario)
+        # Consumos mostrados (Consumo, en el orden de /historial) y sus filas
+        # ya formateadas, para aplicar notificaciones sin rehacer la tabla
+        self._consumos = []
+        self._filas = []
+        self._ids_consumos = set()
         self.init_ui()
         # Se carga la vista con datos iniciales de la API
         self.refrescar_vista()
+        BusEventos.compartido().suscribir(ConsumoNotificado, lambda evento: self.aplicar_consumo(evento.consumo),
+                                          propietario=self)
 
     def init_ui(self):
         """Configura la interfaz principal del módulo Historial."""
@@ -158,8 +179,9 @@ class Historial(QWidget):
     def refrescar_vista(self):
         """Recarga la vista con un rango de fechas por defecto (último año)."""
         # Resetea las fechas en la UI a un rango por defecto amplio
-        self.historial_view.date_from.setDate(QDate.currentDate().addYears(-1))
-        self.historial_view.date_to.setDate(QDate.currentDate())
+        desde, hasta = rango_por_defecto()
+        self.historial_view.date_from.setDate(desde)
+        self.historial_view.date_to.setDate(hasta)
         # Llama a aplicar_filtros para cargar los datos de ese rango por defecto
         self.aplicar_filtros()
         
@@ -170,38 +192,44 @@ class Historial(QWidget):
         
         print(f"Pidiendo historial a la API entre {fecha_desde} y {fecha_hasta}...")
         
-        # Usamos el facade para obtener datos de la API
-        datos_api = self.facade.obtener_registros_por_rango(fecha_desde, fecha_hasta)
-        
-        if datos_api is None:
-            QMessageBox.critical(self, "Error de API", "No se pudo obtener respuesta del servidor.")
+        with medir("Historial.aplicar_filtros"):
+            # Usamos el facade para obtener datos de la API
+            datos_api = self.facade.obtener_registros_por_rango(fecha_desde, fecha_hasta)
+            
+            if datos_api is None:
+                QMessageBox.critical(self, "Error de API", "No se pudo obtener respuesta del servidor.")
+                return
+
+            self._consumos = list(datos_api)
+            self._ids_consumos = {consumo.id for consumo in self._consumos}
+
+            # Convertimos los datos para que la tabla los entienda
+            self._filas = self._formatear_datos_para_tabla(self._consumos)
+            self.historial_view.set_data_in_table(self._filas)
+
+    def aplicar_consumo(self, consumo: dict):
+        """
+        SLOT para los consumos notificados por /events: si cae dentro del rango
+        filtrado se añade a la tabla sin volver a pedir el historial a la API.
+        """
+        consumo = Consumo.de_dict(consumo)
+        if consumo.id in self._ids_consumos:
+            return
+        fecha_desde = self.historial_view.date_from.date().toString("yyyy-MM-dd")
+        fecha_hasta = self.historial_view.date_to.date().toString("yyyy-MM-dd")
+        if not fecha_desde <= consumo.fecha <= fecha_hasta:
             return
 
-        # Convertimos los datos para que la tabla los entienda
-        datos_para_tabla = self._formatear_datos_para_tabla(datos_api)
-        self.historial_view.set_data_in_table(datos_para_tabla)
+        self._ids_consumos.add(consumo.id)
+        # Mismo orden que /historial: fecha, hora, id; solo se formatea la fila nueva
+        posicion = bisect.bisect(self._consumos, consumo.orden(), key=Consumo.orden)
+        self._consumos.insert(posicion, consumo)
+        self._filas.insert(posicion, self._formatear_datos_para_tabla([consumo])[0])
+        self.historial_view.set_data_in_table(self._filas)
 
     def _formatear_datos_para_tabla(self, datos_api: list) -> list:
-        """Convierte la lista de diccionarios de la API a una lista de tuplas para la tabla."""
-        datos_formateados = []
-        for consumo in datos_api:
-            try:
-                # La fecha de la API viene en yyyy-MM-dd, la formateamos a dd-MM-yyyy
-                fecha_mostrada = datetime.datetime.strptime(consumo['fecha'], '%Y-%m-%d').strftime('%d-%m-%Y')
-            except (ValueError, TypeError):
-                fecha_mostrada = consumo.get('fecha', 'N/A')
-
-            datos_formateados.append(
-                (
-                    consumo.get('nombre', 'N/A'),
-                    fecha_mostrada,
-                    consumo.get('hora', 'N/A'),
-                    consumo.get('cantidad', 0),
-                    round(consumo.get('total_cal', 0), 1)
-                )
-            )
-        return datos_formateados
-        
+        return formatear_consumos_para_tabla(datos_api)
+
     def show_welcome_message(self):
         """Muestra un mensaje de bienvenida simple."""
         QMessageBox.information(
@@ -20,7 +20,7 @@ class HistorialController(QObject):
         self.view.exportar_solicitado.connect(self.exportar_csv)
         
         # Conectar filtros en tiempo real con un timer para evitar consultas excesivas
-        self.filtro_timer = QTimer()
+        self.filtro_timer = QTimer(self)
         self.filtro_timer.setSingleShot(True)
         self.filtro_timer.timeout.connect(self.filtrar_en_tiempo_real)
         
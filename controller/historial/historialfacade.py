@@ -1,5 +1,8 @@
 import requests
-from typing import List, Dict, Any
+from typing import List
+from model.util.api_http import sesion_api
+from model.util.registros import Consumo, consumos_de_columnas
+from model.util import precarga
 
 class HistorialFacade:
     """
@@ -11,7 +14,7 @@ class HistorialFacade:
         self.usuario = usuario
         self.base_url = base_url
 
-    def obtener_registros_por_rango(self, fecha_desde: str, fecha_hasta: str) -> List[Dict[str, Any]]:
+    def obtener_registros_por_rango(self, fecha_desde: str, fecha_hasta: str) -> List[Consumo]:
         """
         Obtiene todos los registros de consumo para un rango de fechas desde la API.
 
@@ -20,20 +23,16 @@ class HistorialFacade:
             fecha_hasta (str): Fecha de fin en formato 'YYYY-MM-DD'.
 
         Returns:
-            Una lista de diccionarios, donde cada diccionario es un registro de consumo.
+            Una lista de Consumo (registros compactos, en el orden de /historial).
             Devuelve una lista vacía si hay un error o no hay datos.
         """
-        endpoint = f"{self.base_url}/historial"
-        params = {
-            "fecha_desde": fecha_desde,
-            "fecha_hasta": fecha_hasta
-        }
-        
+        # Lo precargado tras el login evita la petición en la primera visita
+        registros = precarga.historial(fecha_desde, fecha_hasta)
+        if registros is not None:
+            return registros
+
         try:
-            response = requests.get(endpoint, params=params, timeout=5)
-            # Lanza un error para respuestas 4xx o 5xx
-            response.raise_for_status()
-            return response.json()
+            return self.pedir_registros(fecha_desde, fecha_hasta)
         except requests.RequestException as e:
             print(f"Error de API al obtener historial: {e}")
             # Devolvemos una lista vacía para que la interfaz no se rompa.
@@ -42,6 +41,20 @@ class HistorialFacade:
             print("Error: La respuesta de la API no es un JSON válido.")
             return []
 
+    def pedir_registros(self, fecha_desde: str, fecha_hasta: str) -> List[Consumo]:
+        """Pide el rango a la API (sin precarga); lanza RequestException o ValueError."""
+        endpoint = f"{self.base_url}/historial"
+        params = {
+            "fecha_desde": fecha_desde,
+            "fecha_hasta": fecha_hasta,
+            # Una lista por campo: no repite las claves en cada registro
+            "formato": "columnar",
+        }
+        response = sesion_api().get(endpoint, params=params, timeout=5)
+        # Lanza un error para respuestas 4xx o 5xx
+        response.raise_for_status()
+        return consumos_de_columnas(response.json())
+
     def cleanup(self):
         """No hay conexiones de base de datos que cerrar en esta versión."""
         pass
\ No newline at end of file
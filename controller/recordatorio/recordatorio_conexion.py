@@ -1,5 +1,43 @@
 import sqlite3
 
+# Vencimiento en segundos desde la época (hora local al guardarlo) y regla de
+# repetición (NULL, 'diaria' o 'semanal'); el índice sirve las consultas por
+# ventana de tiempo y las purgas sin recorrer la tabla.
+ESQUEMA_RECORDATORIOS = [
+    """
+    CREATE TABLE IF NOT EXISTS recordatorios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        Titulo TEXT NOT NULL,
+        Usuario TEXT NOT NULL,
+        due_at INTEGER NOT NULL,
+        repeticion TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_recordatorios_usuario_due ON recordatorios (Usuario, due_at)",
+]
+
 def _obtener_conexion(usuario):
     """Obtiene una conexión a la base de datos del usuario"""
-    return sqlite3.connect(f"./users/{usuario}/alimentos.db")
\ No newline at end of file
+    return sqlite3.connect(f"./users/{usuario}/alimentos.db")
+
+def _asegurar_tabla_recordatorios(conn):
+    """
+    Crea la tabla de recordatorios o migra la antigua, que guardaba Fecha y
+    Hora como texto. Los que no tienen una fecha válida se descartan: nunca
+    llegarían a mostrarse.
+    """
+    columnas = [fila[1] for fila in conn.execute("PRAGMA table_info(recordatorios)")]
+    if columnas and "due_at" not in columnas:
+        vencimiento = "CAST(strftime('%s', Fecha || ' ' || Hora, 'utc') AS INTEGER)"
+        conn.execute("ALTER TABLE recordatorios RENAME TO recordatorios_antiguos")
+        conn.execute(ESQUEMA_RECORDATORIOS[0])
+        conn.execute(f"""
+            INSERT INTO recordatorios (id, Titulo, Usuario, due_at)
+            SELECT id, COALESCE(Titulo, ''), Usuario, {vencimiento}
+            FROM recordatorios_antiguos
+            WHERE Usuario IS NOT NULL AND {vencimiento} IS NOT NULL
+        """)
+        conn.execute("DROP TABLE recordatorios_antiguos")
+    for sentencia in ESQUEMA_RECORDATORIOS:
+        conn.execute(sentencia)
+    conn.commit()
@@ -1,18 +1,23 @@
+import heapq
+import os
 import sqlite3
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from PyQt6.QtWidgets import QMessageBox
-from PyQt6.QtCore import QTimer, QObject
-from model.subject import Subject
-from .recordatorio_conexion import _obtener_conexion
+from PyQt6.QtCore import Qt, QTimer, QObject
+from model.util.bus_eventos import BusEventos, RecordatorioPesoPendiente
+from .recordatorio_conexion import _obtener_conexion, _asegurar_tabla_recordatorios
 from .recordatorio_utils import (
-    _mostrar_error, _debe_mostrar_recordatorio,
-    MOSTRADO_HOY, MOSTRADO, ON, OFF,
+    _mostrar_error, _debe_mostrar_recordatorio, _frecuencia_en_dias,
+    MOSTRADO_HOY, MOSTRADO, ON, OFF, REPETICIONES,
 )
 
-class Recordatorio(Subject):
+# Horas de recordatorios que el planificador tiene en memoria a la vez
+RECORDATORIOS_VENTANA_H = float(os.environ.get('RECORDATORIOS_VENTANA_H') or 24)
+
+class Recordatorio:
     
     def __init__(self, usuario, parent=None):
-        super().__init__()
         self.usuario = usuario
         self.parent = parent  # Widget padre para los mensajes
 
@@ -44,9 +49,17 @@ class Recordatorio(Subject):
                     return
 
                 estado, frecuencia, ultimo_msj = config
-                frecuencia_dias = int(frecuencia.split()[0]) if frecuencia else 1
+                # Solo si el usuario lo activó en la configuración
+                if estado in (None, OFF):
+                    return
+                frecuencia_dias = _frecuencia_en_dias(frecuencia)
 
-                cursor.execute("SELECT fecha FROM peso ORDER BY fecha DESC LIMIT 1")
+                # Las fechas se guardan como DD-MM-YYYY: se ordena por año, mes y día
+                cursor.execute("""
+                    SELECT fecha FROM peso
+                    ORDER BY SUBSTR(fecha, 7, 4) DESC, SUBSTR(fecha, 4, 2) DESC, SUBSTR(fecha, 1, 2) DESC
+                    LIMIT 1
+                """)
                 ultimo_registro = cursor.fetchone()
 
                 if ultimo_registro and ultimo_registro[0]:
@@ -56,7 +69,7 @@ class Recordatorio(Subject):
                     dias_diferencia = None
 
                 if _debe_mostrar_recordatorio(dias_diferencia, frecuencia_dias, estado, ultimo_msj):
-                    self.notify("recordatorio_peso")
+                    BusEventos.compartido().publicar(RecordatorioPesoPendiente(self.usuario))
                     self._marcar_recordatorio_mostrado(cursor)
                 else:
                     self._activar_recordatorio(cursor)
@@ -93,36 +106,151 @@ class Recordatorio(Subject):
         except sqlite3.Error as e:
             _mostrar_error(f"Error al acceder a la base de datos: {e}", self.parent)
 
-    def mostrar_recordatorio_añadido(self):
-        """Muestra recordatorios programados para la fecha y hora actuales"""
+    def iniciar_recordatorios(self, main_widget):
+        """Inicia el planificador de los recordatorios añadidos por el usuario."""
+        self.planificador = PlanificadorRecordatorios(self.usuario, main_widget)
+        self.planificador.iniciar()
+        return self.planificador
+
+class PlanificadorRecordatorios(QObject):
+    """
+    Muestra los recordatorios añadidos por el usuario a su hora.
+
+    Solo tiene en memoria los que vencen en la ventana actual (las próximas
+    RECORDATORIOS_VENTANA_H horas), en un montículo ordenado por vencimiento,
+    y duerme con un único QTimer hasta el primero o hasta el final de la
+    ventana, cuando lee la siguiente por el índice (Usuario, due_at). Al
+    mostrarse, los de una sola vez se borran y los periódicos pasan a su
+    siguiente vencimiento.
+    """
+    # Tope de cada espera: corrige desvíos si el reloj cambia o el equipo se suspende
+    ESPERA_MAXIMA_MS = 60 * 60 * 1000
+
+    def __init__(self, usuario, parent=None):
+        super().__init__(parent)
+        self.usuario = usuario
+        self.parent_widget = parent  # Widget padre para los mensajes
+        self._pendientes = []  # montículo de (due_at, id, título, repetición)
+        self._fin_ventana = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._mostrar_vencidos)
+
+    @staticmethod
+    def _inicio_del_minuto() -> int:
+        # Los recordatorios tienen resolución de minutos: el del minuto en curso aún se muestra
+        return int(time.time()) // 60 * 60
+
+    @staticmethod
+    def siguiente_vencimiento(due_at: int, repeticion: str, desde: int) -> int:
+        """Primer vencimiento de la regla en `desde` o después, a la misma hora local."""
+        dias = REPETICIONES[repeticion]
+        fecha = datetime.fromtimestamp(due_at)
+        # Salto directo a cerca de `desde` si estuvo mucho tiempo sin abrirse la aplicación
+        fecha += timedelta(days=dias * max(0, (desde - due_at) // (dias * 86400) - 1))
+        while fecha.timestamp() < desde:
+            fecha += timedelta(days=dias)
+        return int(fecha.timestamp())
+
+    def iniciar(self):
+        """Carga los recordatorios de la primera ventana y programa el siguiente aviso."""
+        self.cargar()
+        self._programar()
+
+    def cargar(self):
+        desde = self._inicio_del_minuto()
+        self._pendientes = []
+        self._fin_ventana = None
         try:
             with _obtener_conexion(self.usuario) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT Titulo, Fecha, Hora FROM recordatorios WHERE Usuario = ?", (self.usuario,))
-                recordatorios = cursor.fetchall()
-
-                presente = datetime.now()
-                fecha_hoy = presente.strftime("%Y-%m-%d")
-                hora_hoy = presente.strftime("%H:%M")
-                
-                if recordatorios:
-                    for titulo, fecha, hora in recordatorios:
-                        if fecha == fecha_hoy and hora == hora_hoy:
-                            msg_box = QMessageBox(self.parent)
-                            msg_box.setWindowTitle("Recordatorio")
-                            msg_box.setText(f"Recordatorio: {titulo}")
-                            msg_box.setIcon(QMessageBox.Icon.Information)
-                            msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
-                            msg_box.exec()
+                _asegurar_tabla_recordatorios(conn)
+                self._poner_al_dia(conn, desde)
+                self._cargar_ventana(conn, desde)
+        except sqlite3.Error as e:
+            print(f"NOTA: No se pudieron cargar los recordatorios de '{self.usuario}': {e}")
+
+    def _poner_al_dia(self, conn, desde):
+        """
+        Los que vencieron con la aplicación cerrada no se muestran: los de una
+        sola vez se purgan y los periódicos pasan a su próximo vencimiento.
+        """
+        atrasados = conn.execute(
+            "SELECT id, due_at, repeticion FROM recordatorios WHERE Usuario = ? AND due_at < ?",
+            (self.usuario, desde)
+        ).fetchall()
+        conn.executemany("DELETE FROM recordatorios WHERE id = ?",
+                         [(id_,) for id_, _, regla in atrasados if regla not in REPETICIONES])
+        conn.executemany("UPDATE recordatorios SET due_at = ? WHERE id = ?",
+                         [(self.siguiente_vencimiento(due_at, regla, desde), id_)
+                          for id_, due_at, regla in atrasados if regla in REPETICIONES])
+        conn.commit()
+
+    def _cargar_ventana(self, conn, desde):
+        self._fin_ventana = desde + int(RECORDATORIOS_VENTANA_H * 3600)
+        for fila in conn.execute(
+            "SELECT due_at, id, Titulo, repeticion FROM recordatorios "
+            "WHERE Usuario = ? AND due_at >= ? AND due_at < ?",
+            (self.usuario, desde, self._fin_ventana)
+        ):
+            heapq.heappush(self._pendientes, fila)
+
+    def agregar(self, recordatorio: dict):
+        """SLOT para un recordatorio recién guardado: {'id', 'titulo', 'due_at', 'repeticion'}."""
+        due_at = recordatorio.get('due_at')
+        if due_at is None or due_at < self._inicio_del_minuto():
+            return
+        # Los posteriores a la ventana se leerán con la siguiente
+        if self._fin_ventana is None or due_at >= self._fin_ventana:
+            return
+        heapq.heappush(self._pendientes, (due_at, recordatorio.get('id') or 0,
+                                          recordatorio.get('titulo', ''), recordatorio.get('repeticion')))
+        self._programar()
+
+    def detener(self):
+        self.timer.stop()
+        self._pendientes = []
+        self._fin_ventana = None
 
+    def _programar(self):
+        self.timer.stop()
+        if self._fin_ventana is None:
+            return
+        proximo = min(self._pendientes[0][0], self._fin_ventana) if self._pendientes else self._fin_ventana
+        espera = (proximo - time.time()) * 1000
+        self.timer.start(int(min(max(espera, 0), self.ESPERA_MAXIMA_MS)))
+
+    def _mostrar_vencidos(self):
+        ahora = time.time()
+        vencidos = []
+        while self._pendientes and self._pendientes[0][0] <= ahora:
+            vencidos.append(heapq.heappop(self._pendientes))
+        try:
+            with _obtener_conexion(self.usuario) as conn:
+                self._despues_de_mostrar(conn, vencidos)
+                if ahora >= self._fin_ventana:
+                    self._cargar_ventana(conn, self._fin_ventana)
         except sqlite3.Error as e:
-            _mostrar_error(f"Error al acceder a la base de datos: {e}", self.parent)
+            print(f"ADVERTENCIA: No se pudieron actualizar los recordatorios de '{self.usuario}': {e}")
+        # Se reprograma antes de mostrar: los mensajes son modales
+        self._programar()
+        for _, _, titulo, _ in vencidos:
+            msg_box = QMessageBox(self.parent_widget)
+            msg_box.setWindowTitle("Recordatorio")
+            msg_box.setText(f"Recordatorio: {titulo}")
+            msg_box.setIcon(QMessageBox.Icon.Information)
+            msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
+            msg_box.exec()
 
-    def iniciar_recordatorios(self, main_widget):
-        """Inicia el sistema de recordatorios con un timer que se ejecuta cada minuto"""
-        self.mostrar_recordatorio_añadido()
-        
-        # Crear un QTimer para repetir la verificación cada 60 segundos (60000 ms)
-        self.timer = QTimer()
-        self.timer.timeout.connect(lambda: self.iniciar_recordatorios(main_widget))
-        self.timer.start(60000)  # 60 segundos en milisegundos
\ No newline at end of file
+    def _despues_de_mostrar(self, conn, vencidos):
+        """Borra los de una sola vez y reprograma los periódicos (en la tabla y, si toca, en el montículo)."""
+        despues = self._inicio_del_minuto() + 60
+        for due_at, id_, titulo, regla in vencidos:
+            if regla not in REPETICIONES:
+                conn.execute("DELETE FROM recordatorios WHERE id = ?", (id_,))
+                continue
+            siguiente = self.siguiente_vencimiento(due_at, regla, despues)
+            conn.execute("UPDATE recordatorios SET due_at = ? WHERE id = ?", (siguiente, id_))
+            if siguiente < self._fin_ventana:
+                heapq.heappush(self._pendientes, (siguiente, id_, titulo, regla))
+        conn.commit()
@@ -6,6 +6,20 @@ MOSTRADO = 'mostrado'
 ON = 'on'
 OFF = 'off'
 
+# Reglas de repetición de los recordatorios: días entre dos avisos
+REPETICIONES = {'diaria': 1, 'semanal': 7}
+
+# Frecuencias del recordatorio de peso (formulario de configuración): días
+FRECUENCIAS_PESO = {'día': 1, 'días': 1, 'semana': 7, 'semanas': 7, 'mes': 30, 'meses': 30}
+
+def _frecuencia_en_dias(frecuencia):
+    """'3 días' -> 3, '1 semana' -> 7, '1 mes' -> 30; 1 si no se entiende."""
+    try:
+        cantidad, unidad = frecuencia.split()
+        return int(cantidad) * FRECUENCIAS_PESO[unidad]
+    except (AttributeError, ValueError, KeyError):
+        return 1
+
 def _mostrar_error(mensaje, parent=None):
     """Muestra un mensaje de error usando QMessageBox"""
     msg_box = QMessageBox(parent)
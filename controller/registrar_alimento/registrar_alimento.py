@@ -1,6 +1,6 @@
 
 from PyQt6.QtWidgets import (QWidget,QComboBox, QMessageBox)
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt
 from datetime import datetime
 from PyQt6.QtCore import QTimer
 from model.registrar_alimento.repositorio import SQLiteAlimentoRepository
@@ -9,10 +9,10 @@ from model.registrar_alimento.timemanager import TiempoManager
 from view.registrar_alimento.ui import UIManager
 from model.util.mensajes import *
 from model.registrar_alimento.api_repositorio import ApiAlimentoRepository
+from model.util.bus_eventos import BusEventos, AlimentoAgregado, CatalogoCambiado, ConsumoNotificado
 
 class RegistroAlimentoPyQt6(QWidget):
     """Clase principal para el registro de alimentos"""
-    consumo_diario_actualizado = pyqtSignal()
 
     def __init__(self, usuario="test_user", parent=None):
         super().__init__(parent)
@@ -49,10 +49,19 @@ class RegistroAlimentoPyQt6(QWidget):
         self.boton_hora_actual = None
         self.tiempo_manager = None
         self.buscador_manager = None
+        self.total_calorias_hoy = 0.0
+        # Consumos registrados desde esta ventana, ya reflejados en las etiquetas
+        self._consumos_propios = set()
         
         self.setup_ui()
         self.setup_connections()
         self.update_initial_info()
+        bus = BusEventos.compartido()
+        # Varios alimentos agregados seguidos: una sola recarga del catálogo
+        bus.suscribir(AlimentoAgregado, lambda _evento: self.refrescar_lista_alimentos(),
+                      coalescer=True, propietario=self)
+        bus.suscribir(CatalogoCambiado, lambda evento: self.aplicar_evento_catalogo(evento.datos), propietario=self)
+        bus.suscribir(ConsumoNotificado, lambda evento: self.aplicar_consumo(evento.consumo), propietario=self)
     
 
     # --- MÉTODO NUEVO (SLOT) ---
@@ -73,7 +82,9 @@ class RegistroAlimentoPyQt6(QWidget):
             # 3. Añadir el item placeholder inicial
             self.combo_box.addItem("Seleccionar alimento")
             
-            # 4. Cargar la lista FRESCA de alimentos desde la base de datos
+            # 4. Cargar la lista FRESCA de alimentos (la copia local se revalida ya)
+            if hasattr(self.repository, 'invalidar_catalogo'):
+                self.repository.invalidar_catalogo()
             alimentos_actualizados = self.repository.cargar_alimentos()
             self.combo_box.addItems(alimentos_actualizados)
             
@@ -85,6 +96,29 @@ class RegistroAlimentoPyQt6(QWidget):
         except Exception as e:
             print(f"Error al refrescar la lista de alimentos: {e}")
 
+    def aplicar_evento_catalogo(self, datos):
+        """SLOT para las notificaciones de catálogo de /events: parchea la copia local y el ComboBox."""
+        if not self.repository.aplicar_evento_catalogo(datos):
+            return
+        texto_actual = self.combo_box.currentText()
+        self.combo_box.clear()
+        self.combo_box.addItem("Seleccionar alimento")
+        alimentos = self.repository.cargar_alimentos()
+        self.combo_box.addItems(alimentos)
+        if texto_actual in alimentos:
+            self.combo_box.setCurrentText(texto_actual)
+
+    def aplicar_consumo(self, consumo):
+        """SLOT para los consumos notificados por /events (p. ej. desde otro equipo)."""
+        if consumo.get('id') in self._consumos_propios:
+            self._consumos_propios.discard(consumo['id'])
+            return
+        if consumo.get('fecha') != datetime.now().strftime('%Y-%m-%d'):
+            return
+        self.total_calorias_hoy += consumo.get('total_cal', 0)
+        self.label_total_c_mostrar.setText(f"{self.total_calorias_hoy:.1f} kcal")
+        self.label_segundo_registro.setText(consumo.get('nombre', ''))
+
     def setup_ui(self):
         """Configura la interfaz de usuario"""
         
@@ -642,7 +676,9 @@ class RegistroAlimentoPyQt6(QWidget):
             if not self.validar_datos():
                 return
             
-            self.insert_alimento()
+            consumo_id = self.insert_alimento()
+            if consumo_id is not None:
+                self._consumos_propios.add(consumo_id)
             
             # Actualizar información
             self.update_initial_info()
@@ -776,7 +812,7 @@ class RegistroAlimentoPyQt6(QWidget):
         hora_actual = self.tiempo_manager.get_time()
         
         # Insertar en la base de datos
-        self.repository.insert_alimento(
+        return self.repository.insert_alimento(
             alimento, fecha_actual, hora_actual, cantidad, calorias_totales
         )
     
@@ -799,6 +835,7 @@ class RegistroAlimentoPyQt6(QWidget):
             
             # Total de calorías
             total_calorias = self.repository.calcular_calorias_totales()
+            self.total_calorias_hoy = total_calorias
             self.label_total_c_mostrar.setText(f"{total_calorias:.1f} kcal")
             
         except Exception as e:
@@ -5,42 +5,104 @@ Contador de Calorías Pro 60Hz
 Aplicación principal que inicializa la API y la GUI.
 """
 
+import argparse
+import os
 import sys
-import threading
-import uvicorn
+import time
+import subprocess
+import requests
 from PyQt6.QtWidgets import QApplication
 
-# Se importa la instancia de la app FastAPI desde el archivo api.py
-from controller.API.user.api import app as fastapi_app
-from view.ventana_main.ventana_principal import MainWindow
+from model.util import perfil_arranque
+from model.util.rendimiento import medir
 
-def run_fastapi():
-    """Función para ejecutar el servidor uvicorn en un hilo."""
-    # El servidor se recarga automáticamente si hay cambios en el código.
-    uvicorn.run(fastapi_app, host="127.0.0.1", port=8000, reload=False)
+API_URL = "http://127.0.0.1:8000"
+
+def api_en_linea():
+    """Comprueba si ya hay un gateway respondiendo en API_URL."""
+    try:
+        return requests.get(f"{API_URL}/", timeout=0.5).ok
+    except requests.RequestException:
+        return False
+
+def iniciar_api(espera_maxima=15):
+    """
+    Lanza el gateway de la API (controller/API/gateway.py) como un proceso
+    independiente con sus propios workers. La GUI solo actúa como cliente.
+    Devuelve el proceso lanzado, o None si ya había un servidor en marcha.
+    """
+    if api_en_linea():
+        return None
+
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    proceso = subprocess.Popen([sys.executable, "-m", "controller.API.gateway"], cwd=raiz)
+
+    limite = time.monotonic() + espera_maxima
+    while time.monotonic() < limite and proceso.poll() is None:
+        if api_en_linea():
+            break
+        time.sleep(0.2)
+    return proceso
+
+def detener_api(proceso):
+    if proceso is None or proceso.poll() is not None:
+        return
+    proceso.terminate()
+    try:
+        proceso.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+
+def crear_ventana(argv):
+    """Crea la aplicación y muestra la ventana principal (pantalla de login)."""
+    # La ventana arrastra la mayoría de los imports de la GUI; se importa aquí
+    # para que su coste aparezca como una fase del arranque
+    with medir("arranque.importar_ventana"):
+        from view.ventana_main.ventana_principal import MainWindow
+
+    with medir("arranque.crear_aplicacion"):
+        app = QApplication(argv)
+        # Configurar estilo de la aplicación
+        app.setStyle('Fusion')
+
+    with medir("arranque.construir_ventana"):
+        window = MainWindow()
+    with medir("arranque.mostrar_ventana"):
+        window.show()
+    return app, window
 
 def main():
     """
-    Función principal que inicia la API en un hilo separado
+    Función principal que inicia la API en un proceso separado
     y luego lanza la aplicación de escritorio PyQt6.
     """
-    # Iniciar la API de FastAPI en un hilo demonio
-    # Un hilo demonio se cierra automáticamente cuando el programa principal termina.
-    api_thread = threading.Thread(target=run_fastapi, daemon=True)
-    api_thread.start()
-    
-    # Inicializar la aplicación PyQt6
-    app = QApplication(sys.argv)
-
-    # Configurar estilo de la aplicación
-    app.setStyle('Fusion')
-    
-    # Crear y mostrar la ventana principal
-    window = MainWindow()
-    window.show()
-
-    # Ejecutar el bucle de eventos de la aplicación y salir cuando se cierre
-    sys.exit(app.exec())
+    parser = argparse.ArgumentParser(description="Contador de Calorías Pro 60Hz")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Mide el arranque en frío (imports y construcción de la ventana) y sale")
+    parser.add_argument("--presupuesto-ms", type=float, default=perfil_arranque.PRESUPUESTO_MS,
+                        help="Con --profile-startup, sale con código 1 si el arranque tarda más")
+    parser.add_argument("--salida", help="Con --profile-startup, guarda el informe en un JSON")
+    parser.add_argument("--informe-arranque", help=argparse.SUPPRESS)
+    # El resto de argumentos (-style, -platform, ...) son para Qt
+    args, argumentos_qt = parser.parse_known_args()
+    argv = sys.argv[:1] + argumentos_qt
+
+    if args.profile_startup:
+        sys.exit(perfil_arranque.perfilar(os.path.abspath(__file__), args.presupuesto_ms, args.salida))
+    if args.informe_arranque:
+        # Proceso hijo de --profile-startup: sin API, la ventana se cierra al pintarse
+        app, window = crear_ventana(argv)
+        sys.exit(perfil_arranque.informar_arranque(args.informe_arranque, app, window))
+
+    proceso_api = iniciar_api()
+
+    # Inicializar la aplicación PyQt6 y mostrar la ventana principal
+    app, window = crear_ventana(argv)
+
+    # Ejecutar el bucle de eventos de la aplicación y detener la API al salir
+    codigo = app.exec()
+    detener_api(proceso_api)
+    sys.exit(codigo)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
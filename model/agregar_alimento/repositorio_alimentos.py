@@ -3,7 +3,7 @@ from typing import List, Optional
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Alimento:
     """Modelo de datos para Alimento"""
     nombre: str
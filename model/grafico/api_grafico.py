@@ -1,10 +1,19 @@
-import sqlite3
-import os
-from datetime import date, timedelta, datetime
+import requests
+from collections import defaultdict
+from datetime import date, timedelta
+from model.util.api_http import sesion_api
+from model.util import precarga
+from model.util.registros import Consumo, SerieGrafico, consumos_de_columnas
 
 class APICaloriesDataManager:
-    def __init__(self):
-        self.db_path = "alimentos_app.db"  
+    def __init__(self, base_url="http://127.0.0.1:8000"):
+        self.base_url = base_url
+        # Solo se reutilizan los consumos descargados mientras /events mantiene
+        # la copia al día; sin esa conexión cada consulta vuelve a la API.
+        self.usar_cache = False
+        self._desde = None
+        self._hasta = None
+        self._consumos = {}  # id -> Consumo
 
     def _get_start_date(self, period: str) -> str:
         today = date.today()
@@ -20,33 +29,60 @@ class APICaloriesDataManager:
             start_date = today - timedelta(days=30)
         return start_date.strftime("%Y-%m-%d")
 
-    def get_calories_data(self, period: str):
-        if not os.path.exists(self.db_path):
-            print(f"No se encuentra {self.db_path}")
-            return [], []
+    def _en_cache(self, start_date: str, end_date: str) -> bool:
+        return (self.usar_cache and self._desde is not None
+                and self._desde <= start_date and end_date <= self._hasta)
 
+    def get_calories_data(self, period: str) -> SerieGrafico:
         start_date = self._get_start_date(period)
         end_date = date.today().strftime("%Y-%m-%d")
 
-        query = """
-            SELECT 
-                fecha, 
-                SUM(total_cal) as total_calorias 
-            FROM consumo_diario 
-            WHERE fecha BETWEEN ? AND ?
-            GROUP BY fecha
-            ORDER BY fecha ASC
-        """
+        # El historial precargado tras el login cubre todos los períodos
+        precargados = None if self._en_cache(start_date, end_date) else precarga.historial(start_date, end_date)
+        if precargados is not None:
+            # Los mismos registros que el historial precargado, sin copiarlos
+            self._consumos = {consumo.id: consumo for consumo in precargados}
+            self._desde, self._hasta = start_date, end_date
+        elif not self._en_cache(start_date, end_date):
+            try:
+                response = sesion_api().get(
+                    f"{self.base_url}/historial",
+                    params={"fecha_desde": start_date, "fecha_hasta": end_date, "formato": "columnar"},
+                    timeout=5,
+                )
+                response.raise_for_status()
+                consumos = consumos_de_columnas(response.json())
+            except (requests.RequestException, ValueError) as e:
+                print(f"Error de API al obtener calorías: {e}")
+                return SerieGrafico.vacia()
+            self._consumos = {consumo.id: consumo for consumo in consumos}
+            self._desde, self._hasta = start_date, end_date
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, (start_date, end_date))
-            results = cursor.fetchall()
+        # Se suman por día los consumos del período pedido
+        totales = defaultdict(float)
+        for consumo in self._consumos.values():
+            if start_date <= consumo.fecha <= end_date:
+                totales[consumo.fecha] += consumo.total_cal
 
-        if not results:
-            return [], []
+        fechas = sorted(totales)
+        return SerieGrafico.por_dia(fechas, [totales[fecha] for fecha in fechas])
 
-        labels = [datetime.strptime(row[0], "%Y-%m-%d").strftime("%d/%m") for row in results]
-        data = [row[1] for row in results]
+    def aplicar_consumo(self, consumo: dict) -> bool:
+        """Incorpora un consumo notificado por /events; True si afecta a los datos en caché."""
+        if not self.usar_cache or self._desde is None:
+            return False
+        consumo = Consumo.de_dict(consumo)
+        if not self._desde <= consumo.fecha <= self._hasta:
+            return False
+        self._consumos[consumo.id] = consumo
+        return True
 
-        return labels, data
+    def set_usar_cache(self, activo: bool):
+        """SLOT para el estado de la conexión a /events."""
+        # Lo descargado antes de conectar pudo perder cambios: se parte de cero
+        self.usar_cache = activo
+        self.invalidar()
+
+    def invalidar(self):
+        self._desde = self._hasta = None
+        self._consumos = {}
@@ -1,6 +1,8 @@
 import sqlite3
 import os
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
+from model.util.sesion import sesion_actual
+from model.util.registros import SerieGrafico
 
 class ChartDataManager:
     """
@@ -48,7 +50,7 @@ class ChartDataManager:
             print(f"Error en la base de datos '{self.db_path}': {e}")
             return []
 
-    def _get_aggregated_data(self, table_name: str, value_column: str, aggregation_func: str, period: str) -> tuple[list, list]:
+    def _get_aggregated_data(self, table_name: str, value_column: str, aggregation_func: str, period: str) -> SerieGrafico:
         """
         Función genérica y robusta para obtener datos agregados, filtrando correctamente por fecha.
         """
@@ -70,20 +72,18 @@ class ChartDataManager:
 
         results = self._execute_query(query, (start_date, end_date))
 
-        if not results:
-            return [], []
-
-        labels = [datetime.strptime(row[0], "%Y-%m-%d").strftime("%d/%m") for row in results]
-        data = [row[1] for row in results]
-
-        return labels, data
+        return SerieGrafico.por_dia([row[0] for row in results], [row[1] for row in results])
 
     '''funcion en caso de ya no usar api_grafico.py (es decir ya no usar la base de datos de la api para el total calorias)'''
     #def get_calories_data(self, period: str) -> tuple[list, list]:         
         #return self._get_aggregated_data("consumo_diario", "total_cal", "SUM", period)
 
-    def get_water_data(self, period: str) -> tuple[list, list]:
+    def get_water_data(self, period: str) -> SerieGrafico:
+        # Los vasos recién añadidos pueden estar aún en memoria (RegistroAgua)
+        sesion = sesion_actual()
+        if sesion is not None and sesion.usuario == self.username:
+            sesion.agua.guardar()
         return self._get_aggregated_data("agua", "cant", "SUM", period)
 
-    def get_weight_data(self, period: str) -> tuple[list, list]:
+    def get_weight_data(self, period: str) -> SerieGrafico:
         return self._get_aggregated_data("peso", "peso", "AVG", period)
@@ -1,6 +1,8 @@
 import sqlite3
 import os
 from abc import ABC, abstractmethod
+from model.util.preferencias import ESQUEMA_PREFERENCIAS
+from model.salud.registro_agua import INDICE_AGUA_FECHA
 
 class IUserDatabase(ABC):
     @abstractmethod
@@ -40,6 +42,8 @@ class UserDatabase(IUserDatabase):
                         cant INTEGER
                     )
                 ''',
+                # Una fila por día: RegistroAgua la escribe con un UPSERT
+                'agua_fecha': INDICE_AGUA_FECHA,
                 'datos': '''
                     CREATE TABLE IF NOT EXISTS datos (
                         nombre TEXT PRIMARY KEY,
@@ -54,35 +58,15 @@ class UserDatabase(IUserDatabase):
                         profile_pic_path TEXT
                     )
                 ''',
-                'mensajes': '''
-                    CREATE TABLE IF NOT EXISTS mensajes (
-                        registrar_alimento INTEGER DEFAULT 0,
-                        agregar_alimento INTEGER DEFAULT 0,
-                        graficos INTEGER DEFAULT 0,
-                        configuracion INTEGER DEFAULT 0,
-                        salud INTEGER DEFAULT 0,
-                        admin_alimentos INTEGER DEFAULT 0,
-                        historial INTEGER DEFAULT 0
-                    )
-                ''',
-                'recordatorios': '''
-                    CREATE TABLE IF NOT EXISTS recordatorios (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        Titulo TEXT,
-                        Fecha TEXT,
-                        Hora TEXT,
-                        Usuario TEXT
-                    )
-                '''
+                # Mensajes de bienvenida ya vistos y demás preferencias (clave-valor)
+                'preferencias': ESQUEMA_PREFERENCIAS,
+                # La tabla de recordatorios la crea (o migra) el módulo de
+                # recordatorios al usarla por primera vez: recordatorio_conexion.py
             }
-            
+
             for tabla in tablas.values():
                 cursor.execute(tabla)
                 
-            cursor.execute("SELECT COUNT(*) FROM mensajes")
-            if cursor.fetchone()[0] == 0:
-                cursor.execute("INSERT INTO mensajes DEFAULT VALUES")
-                
             conn.commit()
             return True
         except Exception as e:
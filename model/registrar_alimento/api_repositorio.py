@@ -1,8 +1,19 @@
 import requests
 from datetime import datetime
 from .repositorio_abs import AlimentoRepository
+from .catalogo_cache import CatalogoAlimentosCache
+from model.util.api_http import sesion_api
+from model.util import precarga
 from PyQt6.QtWidgets import QMessageBox
-from typing import List
+from typing import List, Optional
+
+def pedir_resumen_diario(base_url, fecha: str) -> Optional[dict]:
+    """Resumen de /resumen-diario/{fecha}; None si ese día no tiene consumos."""
+    response = sesion_api().get(f"{base_url}/resumen-diario/{fecha}", timeout=5)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
 
 class ApiAlimentoRepository(AlimentoRepository):
     """
@@ -11,9 +22,10 @@ class ApiAlimentoRepository(AlimentoRepository):
     """
     def __init__(self, base_url="http://127.0.0.1:8000"):
         self.base_url = base_url
+        self.catalogo = CatalogoAlimentosCache.compartida(base_url)
         # Verificar si la API está en línea al iniciar
         try:
-            response = requests.get(f"{self.base_url}/", timeout=2)
+            response = sesion_api().get(f"{self.base_url}/", timeout=2)
             response.raise_for_status()
             print("Conexión con la API establecida con éxito.")
         except requests.RequestException as e:
@@ -29,14 +41,21 @@ class ApiAlimentoRepository(AlimentoRepository):
             # raise ConnectionError("No se pudo conectar a la API.") from e
 
 
-    def get_ultimo_insertado(self):
+    def _resumen_de_hoy(self) -> Optional[dict]:
+        """Resumen del día: el precargado tras el login si sigue vigente, o el de la API."""
         fecha_hoy = datetime.now().strftime('%Y-%m-%d')
+        clave = ("resumen-diario", fecha_hoy)
+        # Un día sin consumos también se precarga (como {}), para no volver a pedirlo
+        data = precarga.obtener(clave)
+        if data is None:
+            data = pedir_resumen_diario(self.base_url, fecha_hoy) or {}
+        return data or None
+
+    def get_ultimo_insertado(self):
         try:
-            response = requests.get(f"{self.base_url}/resumen-diario/{fecha_hoy}")
-            if response.status_code == 404:
+            data = self._resumen_de_hoy()
+            if data is None:
                 return "¡Agrega un alimento!"
-            response.raise_for_status()
-            data = response.json()
             if data.get("consumos"):
                 # Ordenar por hora para obtener el último real
                 consumos_ordenados = sorted(data["consumos"], key=lambda x: x['hora'], reverse=True)
@@ -51,7 +70,7 @@ class ApiAlimentoRepository(AlimentoRepository):
         try:
             # El payload para la consulta es correcto
             payload = {"nombre": nombre_alimento}
-            response = requests.post(f"{self.base_url}/consultar-alimento", json=payload, timeout=5)
+            response = sesion_api().post(f"{self.base_url}/consultar-alimento", json=payload, timeout=5)
             response.raise_for_status()
             data = response.json()
 
@@ -69,26 +88,25 @@ class ApiAlimentoRepository(AlimentoRepository):
 
     def cargar_alimentos(self) -> List[str]:
         """
-        ¡Vuelve a la vida! Carga la lista de alimentos personalizados desde la API.
+        Devuelve los nombres del catálogo de alimentos. Se sirve desde la copia
+        local, que solo pide a la API los cambios desde su última versión.
         """
-        try:
-            response = requests.get(f"{self.base_url}/alimentos", timeout=5)
-            if response.status_code == 200:
-                alimentos = response.json()
-                return [alimento['nombre'] for alimento in alimentos]
-            return []
-        except requests.RequestException:
-            print("ADVERTENCIA: No se pudo cargar la lista de alimentos desde la API.")
-            return []
+        self.catalogo.sincronizar()
+        return self.catalogo.nombres()
+
+    def aplicar_evento_catalogo(self, datos) -> bool:
+        """Aplica una notificación de /events a la copia local; True si cambió."""
+        return self.catalogo.aplicar_evento(datos)
+
+    def invalidar_catalogo(self):
+        """El catálogo cambió (p. ej. se agregó un alimento): revalidar en la próxima carga."""
+        self.catalogo.invalidar()
         
     def calcular_calorias_totales(self):
-        fecha_hoy = datetime.now().strftime('%Y-%m-%d')
         try:
-            response = requests.get(f"{self.base_url}/resumen-diario/{fecha_hoy}")
-            if response.status_code == 404:
+            data = self._resumen_de_hoy()
+            if data is None:
                 return 0.0
-            response.raise_for_status()
-            data = response.json()
             return data.get('resumen_total', {}).get('calorias', 0.0)
         except requests.RequestException:
             return 0.0
@@ -115,8 +133,12 @@ class ApiAlimentoRepository(AlimentoRepository):
             payload = {"consumo": consumo_data}
 
             # Apuntar al nuevo endpoint /registrar-consumo
-            response = requests.post(f"{self.base_url}/registrar-consumo", json=payload)
+            response = sesion_api().post(f"{self.base_url}/registrar-consumo", json=payload)
             response.raise_for_status()
+            # El resumen y el historial precargados ya no incluyen este consumo
+            precarga.invalidar()
+            # El id permite reconocer el propio consumo cuando llegue por /events
+            return response.json().get("id")
 
         except requests.RequestException as e:
             error_msg = f"Error de API: {e}"
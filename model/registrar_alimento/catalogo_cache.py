@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+import requests
+from model.util.api_http import sesion_api
+
+class CatalogoAlimentosCache:
+    """
+    Copia local del catálogo de alimentos de la API.
+
+    La copia se guarda en disco junto con la versión del catálogo y se
+    actualiza pidiendo solo los cambios (`/alimentos?since=<versión>`) con
+    If-None-Match, de modo que si nada cambió la API responde 304 sin cuerpo.
+    Entre revalidaciones (cada `revalidar_cada` segundos) se sirve desde memoria,
+    así el buscador no hace una petición por cada tecla.
+
+    La precarga tras el login la sincroniza desde otro hilo: las operaciones
+    van bajo un cerrojo, y quien llega durante una sincronización la espera
+    en lugar de repetir la petición.
+    """
+    RUTA_POR_DEFECTO = "./cache/catalogo_alimentos.json"
+    _compartidas = {}
+    _cerrojo_compartidas = threading.Lock()
+
+    def __init__(self, base_url, ruta=RUTA_POR_DEFECTO, revalidar_cada=30.0):
+        self.base_url = base_url
+        self.ruta = ruta
+        self.revalidar_cada = revalidar_cada
+        self.version = 0
+        self.etag = None
+        self.alimentos = {}  # id -> {"nombre", "calorias_100gr", "calorias_porcion", "id"}
+        self._nombres = None
+        self._ultima_revalidacion = None
+        self._cerrojo = threading.RLock()
+        self._cargar_de_disco()
+
+    @classmethod
+    def compartida(cls, base_url):
+        """Copia única por API para todo el proceso (secciones y precarga)."""
+        with cls._cerrojo_compartidas:
+            if base_url not in cls._compartidas:
+                cls._compartidas[base_url] = cls(base_url)
+            return cls._compartidas[base_url]
+
+    def _cargar_de_disco(self):
+        try:
+            with open(self.ruta, encoding="utf-8") as archivo:
+                datos = json.load(archivo)
+            self.version = int(datos["version"])
+            self.etag = datos.get("etag")
+            self.alimentos = {int(a["id"]): a for a in datos["alimentos"]}
+        except (OSError, ValueError, KeyError, TypeError):
+            # Sin copia (o copia corrupta): la primera sincronización la descarga entera
+            self.version, self.etag, self.alimentos = 0, None, {}
+
+    def _guardar_en_disco(self):
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump({
+                "version": self.version,
+                "etag": self.etag,
+                "alimentos": list(self.alimentos.values()),
+            }, archivo, ensure_ascii=False)
+        # Reemplazo atómico: una escritura interrumpida no deja el archivo a medias
+        os.replace(temporal, self.ruta)
+
+    def sincronizar(self, forzar=False):
+        """
+        Trae de la API los cambios posteriores a la versión local. Devuelve True
+        si la copia cambió. Sin conexión se sigue usando la copia existente.
+        """
+        with self._cerrojo:
+            ahora = time.monotonic()
+            if (not forzar and self._ultima_revalidacion is not None
+                    and ahora - self._ultima_revalidacion < self.revalidar_cada):
+                return False
+
+            cabeceras = {"If-None-Match": self.etag} if self.etag and self.alimentos else {}
+            params = {"since": self.version} if self.alimentos else {}
+            try:
+                response = sesion_api().get(f"{self.base_url}/alimentos", params=params,
+                                            headers=cabeceras, timeout=5)
+            except requests.RequestException:
+                print("ADVERTENCIA: No se pudo sincronizar el catálogo de alimentos; se usa la copia local.")
+                return False
+
+            self._ultima_revalidacion = ahora
+            if response.status_code == 304:
+                return False
+            if response.status_code != 200:
+                print(f"ADVERTENCIA: La API respondió {response.status_code} al sincronizar el catálogo.")
+                return False
+
+            cambios = response.json()
+            if not params:
+                self.alimentos = {}
+            for alimento in cambios:
+                self.alimentos[int(alimento["id"])] = alimento
+            self.version = int(response.headers.get("X-Catalogo-Version", self.version))
+            self.etag = response.headers.get("ETag")
+            self._nombres = None
+            self._guardar_en_disco()
+            return bool(cambios) or not params
+
+    def nombres(self):
+        with self._cerrojo:
+            if self._nombres is None:
+                # Mismo orden que ORDER BY nombre en la API
+                self._nombres = sorted(a["nombre"] for a in self.alimentos.values())
+            return self._nombres
+
+    def aplicar_evento(self, datos):
+        """
+        Aplica una notificación de cambio del catálogo recibida por /events.
+        Si es la siguiente versión se parchea la copia sin pedir nada a la API;
+        si faltan versiones intermedias se fuerza una sincronización delta.
+        Devuelve True si la copia cambió.
+        """
+        with self._cerrojo:
+            version = int(datos.get("version", 0))
+            if version <= self.version:
+                return False
+            alimento = datos.get("alimento")
+            if version != self.version + 1 or not alimento or not self.alimentos:
+                self.invalidar()
+                return self.sincronizar()
+            self.alimentos[int(alimento["id"])] = alimento
+            self.version = version
+            # El ETag guardado ya no corresponde; la próxima revalidación pide el delta
+            self.etag = None
+            self._nombres = None
+            self._ultima_revalidacion = time.monotonic()
+            self._guardar_en_disco()
+            return True
+
+    def invalidar(self):
+        """Obliga a revalidar contra la API en la próxima consulta."""
+        self._ultima_revalidacion = None
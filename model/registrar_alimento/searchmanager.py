@@ -1,5 +1,9 @@
 from PyQt6.QtCore import QRect
 
+def buscar_coincidencias(nombres, texto):
+    """Nombres que contienen `texto`, sin distinguir mayúsculas."""
+    texto = texto.lower()
+    return [nombre for nombre in nombres if texto in nombre.lower()]
 
 class BuscadorManager:
     def __init__(self, parent, entry, listbox, repository):
@@ -27,7 +31,7 @@ class BuscadorManager:
             return
 
         self.alimentos_buscar = self.repository.cargar_alimentos()
-        self.match = [i for i in self.alimentos_buscar if typeado.lower() in i.lower()]
+        self.match = buscar_coincidencias(self.alimentos_buscar, typeado)
         self.update_coincidencias()
 
 
@@ -2,11 +2,12 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QMessageBox)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QColor, QPainter, QPen
-from .calculos import Calculo
+from .metricas_salud import ServicioMetricasSalud
+from .registro_agua import RegistroAgua
+from model.util.base import DBManager
+from model.util.sesion import sesion_actual
 from model.util.colores import *
-import sqlite3
-from datetime import datetime
-import numpy as np
+import math
 
 class VasoAnimado(QWidget):
     """Widget que dibuja y anima un vaso de agua"""
@@ -40,7 +41,8 @@ class VasoAnimado(QWidget):
         ]
         
         # Timer para la animación
-        self.timer = QTimer()
+        # Hijo del widget: se detiene con él si la sección se destruye
+        self.timer = QTimer(self)
         self.timer.timeout.connect(self.actualizar)
         self.timer.start(30)  # 30ms entre frames
 
@@ -101,7 +103,7 @@ class VasoAnimado(QWidget):
             onda_amplitud = 4 * self.scale
             onda_longitud = 20 * self.scale
             for x in range(lt_x, rt_x):
-                y = nivel_y + np.sin((x + self.frame * 2) / onda_longitud) * onda_amplitud
+                y = nivel_y + math.sin((x + self.frame * 2) / onda_longitud) * onda_amplitud
                 onda_pts.append(QPointF(x, y))
 
             # Crear polígono de agua
@@ -120,9 +122,10 @@ class AguaManager(QWidget):
     # Señal para notificar cambios en el consumo de agua
     agua_actualizada = pyqtSignal(int, int)  # vasos_actuales, vasos_recomendados
     
-    def __init__(self, usuario, parent=None):
+    def __init__(self, usuario, parent=None, registro=None):
         super().__init__(parent)
         self.usuario = usuario
+        self.registro = registro or self._registro_de(usuario)
         self.max_vasos = 8
         self.vasos_recomendados = 8  # Valor predeterminado
         self.pulsaciones = 0
@@ -131,6 +134,14 @@ class AguaManager(QWidget):
         self.actualizar_vasos_recomendados()
         self.vasitos_mostrados()
 
+    @staticmethod
+    def _registro_de(usuario):
+        """El contador de la sesión si es la de `usuario`; si no, uno propio."""
+        sesion = sesion_actual()
+        if sesion is not None and sesion.usuario == usuario:
+            return sesion.agua
+        return RegistroAgua(DBManager.conectar_usuario(usuario))
+
     def init_ui(self):
         """Inicializa la interfaz de usuario"""
         # Layout principal
@@ -232,7 +243,7 @@ class AguaManager(QWidget):
     def actualizar_vasos_recomendados(self):
         """Actualiza la cantidad de vasos recomendados basándose en el peso del usuario"""
         try:
-            self.vasos_recomendados = Calculo.calcular_agua_recomendada(self.usuario)
+            self.vasos_recomendados = ServicioMetricasSalud.compartido(self.usuario).metricas()["vasos_agua"]
             self.max_vasos = self.vasos_recomendados
         except Exception as e:
             print(f"Error al calcular vasos recomendados: {e}")
@@ -248,9 +259,8 @@ class AguaManager(QWidget):
             msg_box.exec()
             return
 
-        self.pulsaciones += 1
-        self.vaso.incrementar_nivel()
         self.insertar_vasitos()
+        self.vaso.incrementar_nivel()
         self.actualizar_info_vasos()
         
         # Emitir señal de actualización
@@ -278,9 +288,8 @@ class AguaManager(QWidget):
         msg_box.setDefaultButton(QMessageBox.StandardButton.No)
         
         if msg_box.exec() == QMessageBox.StandardButton.Yes:
-            self.pulsaciones -= 1
-            self.vaso.set_nivel_directo(self.pulsaciones)
             self.eliminar_vasito()
+            self.vaso.set_nivel_directo(self.pulsaciones)
             self.actualizar_info_vasos()
             
             # Emitir señal de actualización
@@ -332,63 +341,20 @@ class AguaManager(QWidget):
         """)
 
     def eliminar_vasito(self):
-        """Elimina un vaso de la base de datos"""
-        try:
-            conn = sqlite3.connect(f"./users/{self.usuario}/alimentos.db")
-            cursor = conn.cursor()
-            fecha_actual = datetime.now().strftime("%d-%m-%Y")
-            cursor.execute("SELECT cant FROM agua WHERE fecha = ?", (fecha_actual,))
-            resultado = cursor.fetchone()
-
-            if resultado and resultado[0] > 0:
-                nueva_cantidad = resultado[0] - 1
-                cursor.execute("UPDATE agua SET cant = ? WHERE fecha = ?", (nueva_cantidad, fecha_actual))
-
-            conn.commit()
-            conn.close()
-        except sqlite3.Error as e:
-            print(f"Error de base de datos: {e}")
+        """Resta un vaso; se guarda en diferido (RegistroAgua)"""
+        self.pulsaciones = self.registro.sumar(-1)
 
     def vasitos_mostrados(self):
-        """Carga los vasos desde la base de datos y actualiza la visualización"""
-        try:
-            conn = sqlite3.connect(f"./users/{self.usuario}/alimentos.db")
-            cursor = conn.cursor()
-            fecha_actual = datetime.now().strftime("%d-%m-%Y")
-            cursor.execute("SELECT cant FROM agua WHERE fecha = ?", (fecha_actual,))
-            resultado = cursor.fetchone()
-            cantidad_vasos = resultado[0] if resultado else 0
-            conn.close()
-
-            self.pulsaciones = cantidad_vasos
-            self.vaso.set_nivel_directo(cantidad_vasos)
-            self.actualizar_info_vasos()
-            
-            # Emitir señal inicial
-            self.agua_actualizada.emit(self.pulsaciones, self.vasos_recomendados)
-            
-        except sqlite3.Error as e:
-            print(f"Error al cargar datos de agua: {e}")
+        """Carga los vasos de hoy y actualiza la visualización"""
+        self.pulsaciones = self.registro.vasos()
+        self.vaso.set_nivel_directo(self.pulsaciones)
+        self.actualizar_info_vasos()
+        # Emitir señal inicial
+        self.agua_actualizada.emit(self.pulsaciones, self.vasos_recomendados)
 
     def insertar_vasitos(self):
-        """Inserta o actualiza un vaso en la base de datos"""
-        try:
-            conn = sqlite3.connect(f"./users/{self.usuario}/alimentos.db")
-            cursor = conn.cursor()
-            fecha_actual = datetime.now().strftime("%d-%m-%Y")
-            cursor.execute("SELECT cant FROM agua WHERE fecha = ?", (fecha_actual,))
-            resultado = cursor.fetchone()
-            
-            if resultado:
-                nueva_cantidad = resultado[0] + 1
-                cursor.execute("UPDATE agua SET cant = ? WHERE fecha = ?", (nueva_cantidad, fecha_actual))
-            else:
-                cursor.execute("INSERT INTO agua (fecha, cant) VALUES (?, 1)", (fecha_actual,))
-            
-            conn.commit()
-            conn.close()
-        except sqlite3.Error as e:
-            print(f"Error al insertar vaso: {e}")
+        """Suma un vaso; se guarda en diferido (RegistroAgua)"""
+        self.pulsaciones = self.registro.sumar(1)
 
     def get_progreso_agua(self):
         """Retorna el progreso actual del agua como porcentaje"""
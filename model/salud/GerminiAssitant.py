@@ -2,6 +2,7 @@ from google import genai
 from google.genai import types
 from PyQt6.QtCore import QObject, pyqtSignal
 from .security_manager import SecureAPIManager
+from .metricas_salud import ServicioMetricasSalud
 from datetime import datetime
 import sqlite3
 import re
@@ -192,44 +193,10 @@ Formato de respuesta: Máximo 120 palabras, directo al punto, SIEMPRE incluir da
     def get_user_health_data(self):
         """Obtiene datos relevantes del usuario para personalizar respuestas"""
         try:
-            # Intentar importar el módulo de cálculos
-            try:
-                from .calculos import Calculo
-                
-                # Obtener datos básicos - usando métodos seguros
-                try:
-                    imc = Calculo.calcular_imc(self.usuario)
-                except:
-                    imc = None
-                
-                try:
-                    tmb = Calculo.calcular_TMB(self.usuario)
-                except:
-                    tmb = None
-                
-                try:
-                    peso = Calculo.get_latest_weight(self.usuario)
-                except:
-                    peso = None
-                
-                try:
-                    genero = Calculo.get_user_gender(self.usuario)
-                except:
-                    genero = None
-                
-                try:
-                    edad = getattr(Calculo, 'get_user_age', lambda x: None)(self.usuario)
-                except:
-                    edad = None
-                
-                try:
-                    altura = getattr(Calculo, 'get_user_height', lambda x: None)(self.usuario)
-                except:
-                    altura = None
-            
-            except ImportError:
-                print("No se pudo importar el módulo Calculos")
-                imc = tmb = peso = genero = edad = altura = None
+            # Calculadas una vez y reutilizadas hasta que cambien el peso o los datos
+            metricas = ServicioMetricasSalud.compartido(self.usuario).metricas()
+            imc, tmb, peso = metricas["imc"], metricas["tmb"], metricas["peso"]
+            genero, edad, altura = metricas["genero"], metricas["edad"], metricas["estatura"]
             
             # Obtener consumo de agua del día
             vasos_agua = 0
@@ -254,7 +221,7 @@ Formato de respuesta: Máximo 120 palabras, directo al punto, SIEMPRE incluir da
 - Género: {genero if genero else 'No especificado'}
 - IMC: {f"{imc:.2f}" if imc else 'No calculable'}
 - TMB: {f"{int(tmb)} cal/día" if tmb else 'No calculable'}
-- Agua hoy: {vasos_agua}/8 vasos
+- Agua hoy: {vasos_agua}/{metricas["vasos_agua"]} vasos
 """
             return data_text
             
@@ -31,6 +31,39 @@ class Calculo:
         }
     }
 
+    # Factor por el que se multiplica la TMB según el nivel de actividad
+    FACTORES_ACTIVIDAD = {
+        "Sedentario": 1.2,
+        "Ligero": 1.375,
+        "Moderado": 1.55,
+        "Intenso": 1.725,
+    }
+
+    @staticmethod
+    def imc_de(peso, estatura_cm):
+        return peso / ((estatura_cm / 100) ** 2)
+
+    @staticmethod
+    def tmb_de(peso, estatura_cm, edad, genero):
+        """TMB de Harris-Benedict; ValueError si el género no es válido"""
+        if genero.lower() in ["hombre", "masculino"]:
+            return 66.47 + (13.75 * peso) + (5 * estatura_cm) - (6.76 * edad)
+        if genero.lower() in ["mujer", "femenino"]:
+            return 655.1 + (9.56 * peso) + (1.85 * estatura_cm) - (4.68 * edad)
+        raise ValueError("Género no válido")
+
+    @staticmethod
+    def gasto_de(tmb, nivel_actividad):
+        """Gasto diario estimado por fórmula: TMB por el factor de actividad (Sedentario si no se conoce)"""
+        return tmb * Calculo.FACTORES_ACTIVIDAD.get(nivel_actividad, Calculo.FACTORES_ACTIVIDAD["Sedentario"])
+
+    @staticmethod
+    def vasos_agua_de(peso):
+        """Vasos de 250 ml recomendados: 35 ml por kg de peso, entre 6 y 12 (8 sin peso)"""
+        if peso is None:
+            return 8
+        return max(6, min(12, round((peso * 35) / 250)))
+
     @staticmethod
     def calcular_imc(usuario):
         try:
@@ -41,7 +74,7 @@ class Calculo:
             resultado_estatura = cursor.fetchone()
             if resultado_estatura is None:
                 raise ValueError("No se encontró la estatura para el usuario")
-            estatura = resultado_estatura[0] / 100  # Convertir a metros
+            estatura = resultado_estatura[0]
 
             cursor.execute("SELECT peso FROM peso WHERE num = (SELECT MAX(num) FROM peso)")
             resultado_peso = cursor.fetchone()
@@ -49,8 +82,7 @@ class Calculo:
                 raise ValueError("No se encontró ningún registro de peso")
             peso = resultado_peso[0]
 
-            imc = peso / (estatura ** 2)
-            return imc
+            return Calculo.imc_de(peso, estatura)
 
         except (sqlite3.Error, ValueError) as e:
             print(f"Error al calcular IMC: {e}")
@@ -91,14 +123,7 @@ class Calculo:
                 raise ValueError("No se encontró ningún registro de peso")
             peso = resultado_peso[0]
 
-            if genero.lower() in ["hombre", "masculino"]:
-                tmb = 66.47 + (13.75 * peso) + (5 * estatura) - (6.76 * edad)
-            elif genero.lower() in ["mujer", "femenino"]:
-                tmb = 655.1 + (9.56 * peso) + (1.85 * estatura) - (4.68 * edad)
-            else:
-                raise ValueError("Género no válido")
-            
-            return tmb
+            return Calculo.tmb_de(peso, estatura, edad, genero)
 
         except (sqlite3.Error, ValueError) as e:
             print(f"Error al calcular TMB: {e}")
@@ -171,16 +196,7 @@ class Calculo:
     def calcular_agua_recomendada(usuario):
         """Calcula la cantidad de agua recomendada en vasos según el peso y actividad física"""
         try:
-            peso = Calculo.get_latest_weight(usuario)
-            if peso is None:
-                return 8  # Valor por defecto si no hay peso registrado
-            
-            # Cálculo base: 30-35 ml por kg de peso corporal
-            # Convertido a vasos de 250 ml
-            vasos_base = round((peso * 35) / 250)
-            
-            # Limitar a un mínimo de 6 y máximo de 12 vasos
-            return max(6, min(12, vasos_base))
+            return Calculo.vasos_agua_de(Calculo.get_latest_weight(usuario))
             
         except Exception as e:
             print(f"Error al calcular agua recomendada: {e}")
@@ -0,0 +1,391 @@
+# gasto_energetico.py
+# Gasto energético diario estimado a partir de lo que el usuario come y de
+# cómo cambia su peso, en lugar de la fórmula fija de la TMB.
+#
+#   estimacion = ServicioGastoEnergetico.compartido(usuario).estimacion()
+#   estimacion["gasto"], estimacion["fecha_objetivo_meta"]
+#
+# El peso se suaviza con una media móvil exponencial (la tendencia) y sobre
+# ella se ajusta una recta por mínimos cuadrados ponderados, con pesos que
+# caen a la mitad cada GASTO_SEMIVIDA_DIAS días: su pendiente es el cambio de
+# peso en kg/día. La ingesta diaria media, con la misma ponderación, menos lo
+# que explica ese cambio es el gasto:
+#
+#   gasto = ingesta_media - KCAL_POR_KG * pendiente
+#
+# El estimador solo guarda sumas acumuladas, así que cada día nuevo se
+# incorpora en O(1) sin recorrer el historial: al consultarlo se piden a la
+# API solo los consumos de los días aún no incorporados. Se incorporan días
+# cerrados (hasta ayer); el peso de hoy entra de forma provisional y un
+# consumo con fecha pasada notificado por /events corrige la suma de su día.
+# De los días recientes se guardan los ids de consumo ya sumados: un consumo
+# leído de /historial y notificado también por /events (evento lento o
+# reenviado al reconectar) no se cuenta dos veces.
+# El estado se guarda en las preferencias del usuario.
+#
+# Mientras no haya GASTO_DIAS_MINIMOS días con consumos y dos pesos, el gasto
+# es el de la fórmula: TMB por el factor del nivel de actividad.
+
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+import requests
+from model.salud.calculos import Calculo
+from model.salud.metricas_salud import ServicioMetricasSalud
+from model.util import precarga
+from model.util.api_http import API_URL, sesion_api
+from model.util.registros import consumos_de_columnas
+from model.util.sesion import sesion_actual
+
+GASTO_SEMIVIDA_DIAS = float(os.environ.get('GASTO_SEMIVIDA_DIAS') or 21)
+GASTO_TENDENCIA_ALFA = float(os.environ.get('GASTO_TENDENCIA_ALFA') or 0.1)
+GASTO_DIAS_MINIMOS = int(os.environ.get('GASTO_DIAS_MINIMOS') or 14)
+# Días de historial que se incorporan la primera vez
+GASTO_DIAS_INICIALES = int(os.environ.get('GASTO_DIAS_INICIALES') or 90)
+# Días hacia atrás en los que un consumo retroactivo corrige la estimación
+GASTO_DIAS_CORRECCION = int(os.environ.get('GASTO_DIAS_CORRECCION') or 30)
+
+KCAL_POR_KG = 7700
+CLAVE_ESTADO = "salud.estimador_gasto"
+CLAVE_PESO_OBJETIVO = "salud.peso_objetivo"
+# Más allá de este plazo no se muestra fecha: al ritmo actual no se llega
+DIAS_PROYECCION_MAXIMOS = 3 * 365
+
+class EstimadorGasto:
+    """
+    Sumas acumuladas del estimador. `t` son días respecto a `hasta` (el
+    último día incorporado), así se mantienen pequeñas al avanzar.
+    """
+    def __init__(self, estado=None):
+        estado = estado or {}
+        self.hasta = date.fromisoformat(estado["hasta"]) if estado.get("hasta") else None
+        self.tendencia = estado.get("tendencia")
+        self.ultimo_peso = date.fromisoformat(estado["ultimo_peso"]) if estado.get("ultimo_peso") else None
+        # Recta tendencia ~ t: suma de pesos, de t, de y, de t², de t·y
+        self.s0, self.st, self.sy, self.stt, self.sty = estado.get("recta", (0.0,) * 5)
+        # Ingesta: suma ponderada y suma de pesos
+        self.ingesta, self.peso_ingesta = estado.get("ingesta", (0.0, 0.0))
+        self.dias_ingesta = estado.get("dias_ingesta", 0)
+        self.pesos = estado.get("pesos", 0)
+        self.recientes = dict(estado.get("recientes", {}))  # fecha ISO -> kcal del día
+        # fecha ISO -> ids de los consumos ya sumados en `recientes`
+        self.contados = {fecha: set(ids) for fecha, ids in estado.get("contados", {}).items()}
+
+    def a_dict(self) -> dict:
+        return {
+            "hasta": self.hasta.isoformat() if self.hasta else None,
+            "tendencia": self.tendencia,
+            "ultimo_peso": self.ultimo_peso.isoformat() if self.ultimo_peso else None,
+            "recta": [self.s0, self.st, self.sy, self.stt, self.sty],
+            "ingesta": [self.ingesta, self.peso_ingesta],
+            "dias_ingesta": self.dias_ingesta,
+            "pesos": self.pesos,
+            "recientes": dict(self.recientes),
+            "contados": {fecha: sorted(ids) for fecha, ids in self.contados.items()},
+        }
+
+    def copia(self):
+        return EstimadorGasto(self.a_dict())
+
+    @staticmethod
+    def _decaimiento(dias):
+        return 0.5 ** (dias / GASTO_SEMIVIDA_DIAS)
+
+    def avanzar_hasta(self, dia: date):
+        """Pasa al día `dia`: envejece lo acumulado y desplaza el origen de t."""
+        if self.hasta is None:
+            self.hasta = dia
+            return
+        dias = (dia - self.hasta).days
+        if dias < 0:
+            raise ValueError(f"El estimador ya incorporó el {self.hasta}; no puede volver al {dia}")
+        if dias == 0:
+            return
+        f = self._decaimiento(dias)
+        self.s0, self.st, self.sy, self.stt, self.sty = (
+            f * self.s0,
+            f * (self.st - dias * self.s0),
+            f * self.sy,
+            f * (self.stt - 2 * dias * self.st + dias * dias * self.s0),
+            f * (self.sty - dias * self.sy),
+        )
+        self.ingesta *= f
+        self.peso_ingesta *= f
+        self.hasta = dia
+        limite = (dia - timedelta(days=GASTO_DIAS_CORRECCION)).isoformat()
+        self.recientes = {fecha: kcal for fecha, kcal in self.recientes.items() if fecha > limite}
+        self.contados = {fecha: ids for fecha, ids in self.contados.items() if fecha > limite}
+
+    def agregar_dia(self, dia: date, ingesta=None, peso=None, ids=()):
+        """
+        Incorpora un día posterior a `hasta` con su ingesta total y su peso
+        (None si faltan); `ids` son los consumos que suman esa ingesta.
+        """
+        if self.hasta is not None and dia <= self.hasta:
+            raise ValueError(f"El estimador ya incorporó el {dia}")
+        self.avanzar_hasta(dia)
+        if ingesta is not None:
+            self.ingesta += ingesta
+            self.peso_ingesta += 1
+            self.dias_ingesta += 1
+            self.recientes[dia.isoformat()] = ingesta
+            self.contados[dia.isoformat()] = {id_ for id_ in ids if id_ is not None}
+        if peso is not None:
+            if self.tendencia is None:
+                self.tendencia = peso
+            else:
+                # Con días sin pesarse, la tendencia se acerca más al peso nuevo
+                alfa = 1 - (1 - GASTO_TENDENCIA_ALFA) ** (dia - self.ultimo_peso).days
+                self.tendencia += alfa * (peso - self.tendencia)
+            self.ultimo_peso = dia
+            self.pesos += 1
+            # Punto (t = 0, tendencia)
+            self.s0 += 1
+            self.sy += self.tendencia
+
+    def corregir_ingesta(self, dia: date, kcal, id_=None) -> bool:
+        """
+        Suma el consumo `id_` de `kcal` a un día ya incorporado; False si aún
+        no se incorporó, es demasiado antiguo o ese consumo ya estaba sumado.
+        """
+        if self.hasta is None or dia > self.hasta:
+            return False
+        fecha = dia.isoformat()
+        dias = (self.hasta - dia).days
+        if fecha not in self.recientes and dias >= GASTO_DIAS_CORRECCION:
+            return False
+        if id_ is not None:
+            contados = self.contados.setdefault(fecha, set())
+            if id_ in contados:
+                return False
+            contados.add(id_)
+        f = self._decaimiento(dias)
+        self.ingesta += f * kcal
+        if fecha in self.recientes:
+            self.recientes[fecha] += kcal
+        else:
+            self.recientes[fecha] = kcal
+            self.peso_ingesta += f
+            self.dias_ingesta += 1
+        return True
+
+    def pendiente(self):
+        """Cambio de la tendencia del peso en kg/día, o None sin dos pesos."""
+        denominador = self.s0 * self.stt - self.st * self.st
+        if self.pesos < 2 or denominador <= 1e-9:
+            return None
+        return (self.s0 * self.sty - self.st * self.sy) / denominador
+
+    def ingesta_media(self):
+        return self.ingesta / self.peso_ingesta if self.peso_ingesta > 0 else None
+
+    def gasto(self):
+        """Gasto diario en kcal, o None mientras no haya datos suficientes."""
+        pendiente = self.pendiente()
+        if pendiente is None or self.dias_ingesta < GASTO_DIAS_MINIMOS:
+            return None
+        return self.ingesta_media() - KCAL_POR_KG * pendiente
+
+def dias_hasta_objetivo(peso_actual, peso_objetivo, kg_por_dia):
+    """Días para llegar a `peso_objetivo` a `kg_por_dia`; None si ese ritmo no lleva hasta él."""
+    diferencia = peso_objetivo - peso_actual
+    if abs(diferencia) < 0.1:
+        return 0
+    if kg_por_dia == 0 or (diferencia > 0) != (kg_por_dia > 0):
+        return None
+    dias = diferencia / kg_por_dia
+    return round(dias) if dias <= DIAS_PROYECCION_MAXIMOS else None
+
+class ServicioGastoEnergetico:
+    _compartidos = {}
+    _cerrojo_compartidos = threading.Lock()
+
+    def __init__(self, usuario, base_url=API_URL):
+        self.usuario = usuario
+        self.base_url = base_url
+        self._estimador = None
+        self._estimacion = None
+        self._dia_estimacion = None
+
+    @classmethod
+    def compartido(cls, usuario):
+        """Servicio único por usuario para todo el proceso."""
+        with cls._cerrojo_compartidos:
+            if usuario not in cls._compartidos:
+                cls._compartidos[usuario] = cls(usuario)
+            return cls._compartidos[usuario]
+
+    def _preferencias(self):
+        sesion = sesion_actual()
+        if sesion is not None and sesion.usuario == self.usuario:
+            return sesion.preferencias
+        return None
+
+    def _guardar(self):
+        preferencias = self._preferencias()
+        if preferencias is not None:
+            preferencias.establecer(CLAVE_ESTADO, self._estimador.a_dict())
+
+    def estimador(self) -> EstimadorGasto:
+        if self._estimador is None:
+            preferencias = self._preferencias()
+            self._estimador = EstimadorGasto(preferencias.obtener(CLAVE_ESTADO) if preferencias else None)
+        return self._estimador
+
+    def peso_objetivo(self):
+        preferencias = self._preferencias()
+        return preferencias.obtener(CLAVE_PESO_OBJETIVO) if preferencias else None
+
+    def establecer_peso_objetivo(self, peso):
+        """Peso al que quiere llegar el usuario (None vuelve al límite del IMC saludable)."""
+        preferencias = self._preferencias()
+        if preferencias is not None:
+            preferencias.establecer(CLAVE_PESO_OBJETIVO, peso)
+        self.invalidar()
+
+    def invalidar(self, *_args):
+        """Descarta la estimación calculada (acepta y omite los argumentos de una señal)."""
+        self._estimacion = None
+
+    def aplicar_consumo(self, consumo: dict) -> bool:
+        """Incorpora un consumo notificado por /events; True si cambia la estimación."""
+        try:
+            dia = date.fromisoformat(consumo["fecha"])
+            kcal = float(consumo["total_cal"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        if not self.estimador().corregir_ingesta(dia, kcal, consumo.get("id")):
+            # Días aún no incorporados: se leerán de la API al cerrarse
+            return False
+        self._guardar()
+        self.invalidar()
+        return True
+
+    def actualizar(self) -> bool:
+        """Incorpora los días cerrados que faltan; False si no pudieron leerse sus consumos."""
+        estimador = self.estimador()
+        ayer = date.today() - timedelta(days=1)
+        desde = estimador.hasta + timedelta(days=1) if estimador.hasta else ayer - timedelta(days=GASTO_DIAS_INICIALES - 1)
+        if desde > ayer:
+            return True
+        ingestas = self._ingestas(desde, ayer)
+        if ingestas is None:
+            return False
+        pesos = self._pesos(desde, ayer)
+        for dia in sorted(set(ingestas) | set(pesos)):
+            ingesta, ids = ingestas.get(dia, (None, ()))
+            estimador.agregar_dia(dia, ingesta, pesos.get(dia), ids)
+        estimador.avanzar_hasta(ayer)
+        self._guardar()
+        return True
+
+    def estimacion(self) -> dict:
+        """
+        {'gasto', 'origen' ('adaptativo', 'formula' o None), 'dias', 'tendencia',
+         'kg_semana', 'ingesta_media', 'meta_cal', 'peso_objetivo',
+         'fecha_objetivo_meta', 'fecha_objetivo_tendencia'}. Las fechas son la
+        de llegar al peso objetivo comiendo la meta de calorías y la de seguir
+        al ritmo de las últimas semanas; None si así no se llega.
+        """
+        hoy = date.today()
+        if self._estimacion is None or self._dia_estimacion != hoy:
+            self.actualizar()
+            self._estimacion = self._calcular(hoy)
+            self._dia_estimacion = hoy
+        return self._estimacion
+
+    def _calcular(self, hoy):
+        metricas = ServicioMetricasSalud.compartido(self.usuario).metricas()
+        estimador = self.estimador().copia()
+        peso_hoy = self._pesos(hoy, hoy).get(hoy)
+        if peso_hoy is not None and (estimador.hasta is None or estimador.hasta < hoy):
+            estimador.agregar_dia(hoy, peso=peso_hoy)
+
+        gasto = estimador.gasto()
+        origen = "adaptativo" if gasto is not None else None
+        if gasto is None and metricas["tmb"] is not None:
+            gasto, origen = Calculo.gasto_de(metricas["tmb"], metricas["nivel_actividad"]), "formula"
+
+        pendiente = estimador.pendiente()
+        tendencia = estimador.tendencia if estimador.tendencia is not None else metricas["peso"]
+        objetivo = self.peso_objetivo() or self._objetivo_saludable(tendencia, metricas["estatura"])
+        meta_cal = metricas["meta_cal"]
+
+        fecha_meta = fecha_tendencia = None
+        if objetivo is not None and tendencia is not None:
+            if gasto is not None and meta_cal:
+                dias = dias_hasta_objetivo(tendencia, objetivo, (meta_cal - gasto) / KCAL_POR_KG)
+                fecha_meta = hoy + timedelta(days=dias) if dias is not None else None
+            if pendiente is not None and estimador.dias_ingesta >= GASTO_DIAS_MINIMOS:
+                dias = dias_hasta_objetivo(tendencia, objetivo, pendiente)
+                fecha_tendencia = hoy + timedelta(days=dias) if dias is not None else None
+
+        return {
+            "gasto": gasto,
+            "origen": origen,
+            "dias": estimador.dias_ingesta,
+            "tendencia": tendencia,
+            "kg_semana": pendiente * 7 if pendiente is not None else None,
+            "ingesta_media": estimador.ingesta_media(),
+            "meta_cal": meta_cal,
+            "peso_objetivo": objetivo,
+            "fecha_objetivo_meta": fecha_meta,
+            "fecha_objetivo_tendencia": fecha_tendencia,
+        }
+
+    @staticmethod
+    def _objetivo_saludable(peso, estatura):
+        """Peso del límite de IMC saludable más cercano, o None si ya está dentro."""
+        if peso is None or not estatura:
+            return None
+        imc = Calculo.imc_de(peso, estatura)
+        metros2 = (estatura / 100) ** 2
+        if imc >= 25.0:
+            return round(24.9 * metros2, 1)
+        if imc < 18.5:
+            return round(18.5 * metros2, 1)
+        return None
+
+    def _ingestas(self, desde: date, hasta: date):
+        """{día: (kcal, ids de sus consumos)} entre ambas fechas, o None si la API no responde."""
+        inicio, fin = desde.isoformat(), hasta.isoformat()
+        consumos = precarga.historial(inicio, fin)
+        if consumos is None:
+            try:
+                response = sesion_api().get(
+                    f"{self.base_url}/historial",
+                    params={"fecha_desde": inicio, "fecha_hasta": fin, "formato": "columnar"},
+                    timeout=5,
+                )
+                response.raise_for_status()
+                consumos = consumos_de_columnas(response.json())
+            except (requests.RequestException, ValueError) as e:
+                print(f"ADVERTENCIA: No se pudieron leer los consumos para estimar el gasto: {e}")
+                return None
+        ingestas = {}
+        for consumo in consumos:
+            dia = date.fromisoformat(consumo.fecha)
+            kcal, ids = ingestas.get(dia, (0.0, []))
+            ids.append(consumo.id)
+            ingestas[dia] = (kcal + consumo.total_cal, ids)
+        return ingestas
+
+    def _pesos(self, desde: date, hasta: date) -> dict:
+        """{día: peso} de la BD del usuario entre ambas fechas (el último de cada día)."""
+        conn = None
+        try:
+            conn = sqlite3.connect(f"./users/{self.usuario}/alimentos.db")
+            # `fecha` es DD-MM-AAAA: se compara como AAAA-MM-DD
+            filas = conn.execute(
+                "SELECT fecha, peso FROM peso "
+                "WHERE substr(fecha, 7, 4) || '-' || substr(fecha, 4, 2) || '-' || substr(fecha, 1, 2) "
+                "BETWEEN ? AND ? ORDER BY num",
+                (desde.isoformat(), hasta.isoformat())).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error al leer los pesos de {self.usuario}: {e}")
+            return {}
+        finally:
+            if conn:
+                conn.close()
+        return {datetime.strptime(fecha, "%d-%m-%Y").date(): peso for fecha, peso in filas}
@@ -0,0 +1,86 @@
+# metricas_salud.py
+# Métricas de salud del usuario (IMC, TMB, vasos de agua) calculadas de una
+# vez a partir de su perfil y su último peso.
+#
+#   metricas = ServicioMetricasSalud.compartido(usuario).metricas()
+#   metricas["imc"], metricas["tmb"], metricas["vasos_agua"]
+#
+# Se leen la fila de `datos` y el último peso en una sola conexión y el
+# resultado se guarda hasta invalidar(), que se conecta a `peso_actualizado`
+# y al evento DatosUsuarioActualizados del bus. El asistente de IA lo consulta desde su
+# hilo de trabajo, así que el cálculo va bajo un cerrojo.
+
+import sqlite3
+import threading
+from model.salud.calculos import Calculo
+
+class ServicioMetricasSalud:
+    _compartidos = {}
+    _cerrojo_compartidos = threading.Lock()
+
+    def __init__(self, usuario):
+        self.usuario = usuario
+        self._metricas = None
+        self._cerrojo = threading.Lock()
+
+    @classmethod
+    def compartido(cls, usuario):
+        """Servicio único por usuario para todo el proceso (salud, agua, asistente)."""
+        with cls._cerrojo_compartidos:
+            if usuario not in cls._compartidos:
+                cls._compartidos[usuario] = cls(usuario)
+            return cls._compartidos[usuario]
+
+    def metricas(self) -> dict:
+        """
+        {'peso', 'estatura', 'edad', 'genero', 'nivel_actividad', 'meta_cal',
+         'imc', 'tmb', 'vasos_agua'};
+        lo que no pueda calcularse queda en None (vasos_agua vale 8 sin peso).
+        """
+        with self._cerrojo:
+            if self._metricas is None:
+                self._metricas = self._calcular()
+            return self._metricas
+
+    def invalidar(self, *_args):
+        """Descarta las métricas calculadas (acepta y omite los argumentos de una señal)."""
+        with self._cerrojo:
+            self._metricas = None
+
+    def _calcular(self):
+        perfil, peso = self._leer()
+        estatura, edad, genero, nivel_actividad, meta_cal = perfil if perfil else (None,) * 5
+        imc = tmb = None
+        if peso is not None and estatura:
+            imc = Calculo.imc_de(peso, estatura)
+            if edad is not None and genero:
+                try:
+                    tmb = Calculo.tmb_de(peso, estatura, edad, genero)
+                except ValueError as e:
+                    print(f"Error al calcular TMB: {e}")
+        return {
+            "peso": peso,
+            "estatura": estatura,
+            "edad": edad,
+            "genero": genero,
+            "nivel_actividad": nivel_actividad,
+            "meta_cal": meta_cal,
+            "imc": imc,
+            "tmb": tmb,
+            "vasos_agua": Calculo.vasos_agua_de(peso),
+        }
+
+    def _leer(self):
+        """(estatura, edad, genero, nivel_actividad, meta_cal) de `datos` y el último peso registrado."""
+        conn = None
+        try:
+            conn = sqlite3.connect(f"./users/{self.usuario}/alimentos.db")
+            perfil = conn.execute("SELECT estatura, edad, genero, nivel_actividad, meta_cal FROM datos").fetchone()
+            fila_peso = conn.execute("SELECT peso FROM peso ORDER BY num DESC LIMIT 1").fetchone()
+            return perfil, fila_peso[0] if fila_peso else None
+        except sqlite3.Error as e:
+            print(f"Error al leer los datos de salud de {self.usuario}: {e}")
+            return None, None
+        finally:
+            if conn:
+                conn.close()
@@ -0,0 +1,103 @@
+# registro_agua.py
+# Vasos de agua por día, contados en memoria y escritos en diferido.
+#
+# Cada pulsación de "Añadir vaso" o "Eliminar vaso" solo cambia el contador
+# en memoria (la interfaz se actualiza al momento); el valor final de cada
+# día se escribe con un único UPSERT sobre la clave única `fecha`, a los
+# AGUA_ESCRITURA_MS de la última pulsación o al cerrar la sesión:
+#
+#   agua = sesion.agua
+#   agua.sumar(1)          # -> vasos de hoy
+#   agua.vasos()
+#
+# Una ráfaga de pulsaciones es una sola transacción, en lugar de una
+# conexión, una consulta y un commit por pulsación.
+
+import os
+import sqlite3
+from datetime import datetime
+from PyQt6.QtCore import QCoreApplication, QTimer
+
+AGUA_ESCRITURA_MS = int(os.environ.get('AGUA_ESCRITURA_MS') or 1500)
+
+INDICE_AGUA_FECHA = "CREATE UNIQUE INDEX IF NOT EXISTS ux_agua_fecha ON agua (fecha)"
+
+class RegistroAgua:
+    def __init__(self, conexion, escritura_ms=AGUA_ESCRITURA_MS):
+        """`conexion` es la de la BD del usuario; con None, los vasos solo viven en memoria."""
+        self.conexion = conexion
+        self._vasos = {}       # fecha (DD-MM-AAAA) -> vasos
+        self._pendientes = {}  # fecha -> vasos aún sin escribir
+        self._temporizador = None
+        if QCoreApplication.instance() is not None:
+            self._temporizador = QTimer()
+            self._temporizador.setSingleShot(True)
+            self._temporizador.setInterval(escritura_ms)
+            self._temporizador.timeout.connect(self.guardar)
+        if conexion is not None:
+            self._preparar()
+
+    def _preparar(self):
+        """Crea el índice único de `fecha`, fusionando antes las filas repetidas de un mismo día."""
+        try:
+            existe = self.conexion.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_agua_fecha'").fetchone()
+            if not existe:
+                with self.conexion:
+                    # El código anterior actualizaba la primera fila del día
+                    self.conexion.execute(
+                        "DELETE FROM agua WHERE num NOT IN (SELECT MIN(num) FROM agua GROUP BY fecha)")
+                    self.conexion.execute(INDICE_AGUA_FECHA)
+        except sqlite3.Error as e:
+            print(f"ADVERTENCIA: No se pudo preparar la tabla de agua: {e}")
+            self.conexion = None
+
+    @staticmethod
+    def hoy() -> str:
+        return datetime.now().strftime("%d-%m-%Y")
+
+    def vasos(self, fecha=None) -> int:
+        """Vasos del día `fecha` (hoy por defecto), leídos de la BD solo la primera vez."""
+        fecha = fecha or self.hoy()
+        if fecha not in self._vasos:
+            self._vasos[fecha] = 0
+            if self.conexion is not None:
+                try:
+                    fila = self.conexion.execute("SELECT cant FROM agua WHERE fecha = ?", (fecha,)).fetchone()
+                    self._vasos[fecha] = fila[0] if fila else 0
+                except sqlite3.Error as e:
+                    print(f"Error al cargar datos de agua: {e}")
+        return self._vasos[fecha]
+
+    def sumar(self, vasos: int, fecha=None) -> int:
+        """Suma (o resta) vasos al día, sin bajar de 0, y programa la escritura; devuelve el total."""
+        fecha = fecha or self.hoy()
+        total = max(0, self.vasos(fecha) + vasos)
+        if total != self._vasos[fecha]:
+            self._vasos[fecha] = total
+            self._pendientes[fecha] = total
+            self._programar()
+        return total
+
+    def _programar(self):
+        # Cada pulsación reinicia la espera: se escribe cuando el usuario para
+        if self._temporizador is not None:
+            self._temporizador.start()
+
+    def guardar(self):
+        """Escribe los vasos pendientes en una transacción."""
+        if self._temporizador is not None:
+            self._temporizador.stop()
+        if not self._pendientes or self.conexion is None:
+            return
+        pendientes, self._pendientes = self._pendientes, {}
+        try:
+            with self.conexion:
+                self.conexion.executemany(
+                    "INSERT INTO agua (fecha, cant) VALUES (?, ?) "
+                    "ON CONFLICT(fecha) DO UPDATE SET cant = excluded.cant",
+                    list(pendientes.items()))
+        except sqlite3.Error as e:
+            # Se reintentan en la próxima escritura, sin pisar lo cambiado mientras tanto
+            self._pendientes = {**pendientes, **self._pendientes}
+            print(f"ADVERTENCIA: No se pudieron guardar los vasos de agua: {e}")
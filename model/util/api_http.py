@@ -0,0 +1,36 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = "http://127.0.0.1:8000"
+
+_local = threading.local()
+_token = None
+
+def establecer_token(token):
+    """Token de la sesión iniciada: las peticiones siguientes (de cualquier hilo) lo envían."""
+    global _token
+    _token = token
+
+def sesion_api() -> requests.Session:
+    """
+    Sesión HTTP compartida por los clientes de la API (una por hilo, porque
+    requests.Session no es segura entre hilos). Reutiliza la conexión TCP
+    entre peticiones (keep-alive) y acepta respuestas comprimidas: requests
+    anuncia gzip, y también br si el paquete brotli está instalado.
+    """
+    sesion = getattr(_local, "sesion", None)
+    if sesion is None:
+        sesion = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        sesion.mount("http://", adaptador)
+        sesion.mount("https://", adaptador)
+        _local.sesion = sesion
+    # Sin token la API atiende como anónimo: los consumos no serían del usuario
+    cabecera = f"Bearer {_token}" if _token else None
+    if sesion.headers.get("Authorization") != cabecera:
+        if cabecera:
+            sesion.headers["Authorization"] = cabecera
+        else:
+            sesion.headers.pop("Authorization", None)
+    return sesion
@@ -0,0 +1,160 @@
+# bus_eventos.py
+# Bus de eventos de la aplicación: las secciones publican lo que cambió y se
+# suscriben a lo que les interesa, sin conocerse entre sí ni pasar por la
+# ventana principal.
+#
+#   bus = BusEventos.compartido()
+#   bus.suscribir(DatosUsuarioActualizados, lambda evento: self.refrescar_vista(),
+#                 coalescer=True, propietario=self)
+#   bus.publicar(DatosUsuarioActualizados(origen=self))
+#
+# Los eventos son clases inmutables; un suscriptor recibe también los de sus
+# subclases. Se entregan por orden de prioridad (mayor primero; las cachés
+# se invalidan con PRIORIDAD_ALTA antes de que nadie vuelva a leerlas):
+#
+# - Sin coalescer, en el momento de publicar.
+# - Con coalescer=True, una sola vez al volver al bucle de eventos, con el
+#   último evento: una ráfaga de cambios en la misma vuelta es un refresco.
+#
+# Con `propietario` (un QObject) la suscripción se cancela al destruirse y
+# no recibe los eventos que él mismo publica (origen=propietario). El bus
+# es del hilo de la interfaz: los hilos de trabajo publican a través de una
+# señal de Qt.
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Optional
+from PyQt6.QtCore import QCoreApplication, QObject, QTimer
+
+PRIORIDAD_ALTA = 100
+PRIORIDAD_NORMAL = 0
+PRIORIDAD_BAJA = -100
+
+# --- Eventos ---
+@dataclass(frozen=True)
+class Evento:
+    # Quién lo publica; sus propias suscripciones no lo reciben
+    origen: object = field(default=None, compare=False, repr=False, kw_only=True)
+
+@dataclass(frozen=True)
+class AlimentoAgregado(Evento):
+    """Se añadió un alimento al catálogo desde esta aplicación."""
+
+@dataclass(frozen=True)
+class CatalogoCambiado(Evento):
+    """La API notificó un cambio del catálogo: {"version", "alimento"}."""
+    datos: dict
+
+@dataclass(frozen=True)
+class ConsumoNotificado(Evento):
+    """La API notificó un consumo (propio o de otro equipo), como fila de /historial."""
+    consumo: dict
+
+@dataclass(frozen=True)
+class DatosUsuarioActualizados(Evento):
+    """Cambió el perfil del usuario (datos personales, peso, meta de calorías...)."""
+
+@dataclass(frozen=True)
+class GastoEstimadoCambiado(Evento):
+    """Un consumo de un día pasado corrigió la estimación del gasto energético."""
+
+@dataclass(frozen=True)
+class ConexionApiCambiada(Evento):
+    """Se conectó o desconectó el WebSocket /events de la API."""
+    conectado: bool
+
+@dataclass(frozen=True)
+class RecordatorioPesoPendiente(Evento):
+    """Toca recordar al usuario que registre su peso."""
+    usuario: str
+
+# --- Bus ---
+class Suscripcion:
+    __slots__ = ("tipo", "callback", "prioridad", "coalescer", "propietario", "orden", "activa")
+
+    def __init__(self, tipo, callback, prioridad, coalescer, propietario, orden):
+        self.tipo = tipo
+        self.callback = callback
+        self.prioridad = prioridad
+        self.coalescer = coalescer
+        self.propietario = propietario
+        self.orden = orden
+        self.activa = True
+
+    def clave(self):
+        return (-self.prioridad, self.orden)
+
+class BusEventos(QObject):
+    _compartido = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._suscripciones = {}   # tipo de evento -> [Suscripcion] ordenadas por prioridad
+        self._pendientes = {}      # Suscripcion coalescida -> último evento sin entregar
+        self._programado = False
+        self._orden = itertools.count()
+
+    @classmethod
+    def compartido(cls):
+        """Bus único de la aplicación."""
+        if cls._compartido is None:
+            cls._compartido = cls()
+        return cls._compartido
+
+    def suscribir(self, tipo, callback, prioridad=PRIORIDAD_NORMAL, coalescer=False,
+                  propietario: Optional[QObject] = None) -> Suscripcion:
+        """`callback(evento)` para cada evento de `tipo` (o una subclase)."""
+        suscripcion = Suscripcion(tipo, callback, prioridad, coalescer, propietario, next(self._orden))
+        lista = self._suscripciones.setdefault(tipo, [])
+        lista.append(suscripcion)
+        lista.sort(key=Suscripcion.clave)
+        if propietario is not None:
+            propietario.destroyed.connect(lambda *_args, s=suscripcion: self.cancelar(s))
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion):
+        suscripcion.activa = False
+        lista = self._suscripciones.get(suscripcion.tipo, [])
+        if suscripcion in lista:
+            lista.remove(suscripcion)
+        self._pendientes.pop(suscripcion, None)
+
+    def cancelar_de(self, propietario):
+        """Cancela todas las suscripciones de `propietario`."""
+        for lista in self._suscripciones.values():
+            for suscripcion in [s for s in lista if s.propietario is propietario]:
+                self.cancelar(suscripcion)
+
+    def publicar(self, evento: Evento):
+        destinatarios = [s for tipo in type(evento).__mro__ for s in self._suscripciones.get(tipo, ())
+                         if evento.origen is None or s.propietario is not evento.origen]
+        destinatarios.sort(key=Suscripcion.clave)
+        for suscripcion in destinatarios:
+            if suscripcion.coalescer:
+                self._pendientes[suscripcion] = evento
+            else:
+                self._entregar(suscripcion, evento)
+        if self._pendientes and not self._programado:
+            if QCoreApplication.instance() is None:
+                self.entregar_pendientes()
+            else:
+                self._programado = True
+                QTimer.singleShot(0, self.entregar_pendientes)
+
+    def entregar_pendientes(self):
+        """Entrega los eventos coalescidos, una vez por suscripción y por orden de prioridad."""
+        self._programado = False
+        pendientes, self._pendientes = self._pendientes, {}
+        for suscripcion in sorted(pendientes, key=Suscripcion.clave):
+            self._entregar(suscripcion, pendientes[suscripcion])
+
+    @staticmethod
+    def _entregar(suscripcion, evento):
+        # Un suscriptor anterior pudo cancelarla (p. ej. destruyendo una sección)
+        if not suscripcion.activa:
+            return
+        try:
+            suscripcion.callback(evento)
+        except Exception as e:
+            # Un suscriptor roto no impide que reciban el evento los demás
+            print(f"ADVERTENCIA: Error al entregar {type(evento).__name__}: {e}")
@@ -0,0 +1,115 @@
+import json
+import socket
+import threading
+from urllib.parse import urlencode
+from PyQt6.QtCore import QObject, pyqtSignal
+from websockets.sync.client import connect
+from websockets.exceptions import WebSocketException
+
+class ClienteEventos(QObject):
+    """
+    Escucha el WebSocket /events de la API en un hilo propio y reemite cada
+    notificación como señal de Qt. Las señales se entregan en el hilo de la
+    interfaz, así los slots pueden tocar widgets y cachés sin más cuidado.
+
+    Si la conexión se pierde, reintenta con espera creciente y pide a la API
+    los eventos posteriores al último recibido (?desde=), para no perder
+    cambios mientras estuvo desconectado.
+    """
+    catalogo_cambiado = pyqtSignal(dict)   # {"version", "alimento"}
+    consumo_registrado = pyqtSignal(dict)  # fila de consumo como la de /historial
+    peso_cambiado = pyqtSignal(dict)       # {"accion", "id", ...}
+    conexion_cambiada = pyqtSignal(bool)
+
+    ESPERA_MAXIMA = 30.0
+
+    def __init__(self, base_url="http://127.0.0.1:8000", token=None, parent=None):
+        super().__init__(parent)
+        self.ws_url = base_url.replace("http://", "ws://", 1).replace("https://", "wss://", 1) + "/events"
+        self.token = token
+        self.ultimo_id = None
+        self.conectado = False
+        self._detener = threading.Event()
+        self._ws = None
+        self._hilo = None
+        self._senales = {
+            "catalogo": self.catalogo_cambiado,
+            "consumo": self.consumo_registrado,
+            "peso": self.peso_cambiado,
+        }
+
+    def iniciar(self):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        # Cada hilo tiene su propia bandera: uno ya detenido que aún no ha
+        # terminado no revive si se vuelve a iniciar
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._escuchar, args=(self._detener,), name="eventos-api", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """
+        No espera al hilo (se llama desde la interfaz): marca la parada y corta
+        el socket, lo que desbloquea la lectura; el hilo termina por su cuenta.
+        """
+        self._detener.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                # shutdown no bloquea, a diferencia de ws.close() (espera el cierre del servidor)
+                ws.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._hilo = None
+
+    def _url(self):
+        params = {}
+        if self.token:
+            params["token"] = self.token
+        if self.ultimo_id is not None:
+            params["desde"] = self.ultimo_id
+        return f"{self.ws_url}?{urlencode(params)}" if params else self.ws_url
+
+    def _marcar_conexion(self, conectado):
+        if conectado != self.conectado:
+            self.conectado = conectado
+            self.conexion_cambiada.emit(conectado)
+
+    def _escuchar(self, detener):
+        espera = 1.0
+        while not detener.is_set():
+            ws = None
+            try:
+                with connect(self._url(), open_timeout=5) as ws:
+                    self._ws = ws
+                    # detener() pudo llegar durante connect(), antes de ver self._ws
+                    if detener.is_set():
+                        break
+                    self._marcar_conexion(True)
+                    espera = 1.0
+                    for mensaje in ws:
+                        if detener.is_set():
+                            break
+                        self._despachar(mensaje)
+            except (OSError, WebSocketException):
+                pass
+            finally:
+                if ws is not None and self._ws is ws:
+                    self._ws = None
+                # Un hilo ya reemplazado por otro iniciar() no toca el estado
+                if self._detener is detener:
+                    self._marcar_conexion(False)
+            # Espera creciente entre reintentos; detener() la interrumpe
+            detener.wait(espera)
+            espera = min(espera * 2, self.ESPERA_MAXIMA)
+
+    def _despachar(self, mensaje):
+        try:
+            evento = json.loads(mensaje)
+            self.ultimo_id = evento["id"]
+            senal = self._senales.get(evento["tipo"])
+        except (ValueError, KeyError, TypeError):
+            print(f"ADVERTENCIA: Evento de la API no reconocido: {mensaje!r}")
+            return
+        if senal is not None:
+            senal.emit(evento["datos"])
@@ -0,0 +1,141 @@
+# perfil_arranque.py
+# Perfil del arranque en frío de la GUI:
+#
+#   python main.py --profile-startup                      tabla de imports y fases
+#   python main.py --profile-startup --presupuesto-ms 800 --salida arranque.json
+#
+# Se relanza main.py en un proceso nuevo con `python -X importtime`, que abre
+# la ventana (pantalla de login), procesa los eventos pendientes para que se
+# pinte y termina. El proceso padre combina el desglose de imports de
+# -X importtime con las fases medidas en el hijo (model/util/rendimiento.py,
+# operaciones "arranque.*" y los métodos cronometrados de la ventana).
+#
+# El tiempo total va desde que se lanza el intérprete hasta que la ventana
+# está pintada. Si supera el presupuesto, sale con código 1 (para CI, con
+# QT_QPA_PLATFORM=offscreen en máquinas sin pantalla). El gateway de la API
+# no se lanza en este modo.
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from model.util import rendimiento
+
+# Unas tres veces el arranque actual: importar google.genai al inicio (~0,9 s) lo supera
+PRESUPUESTO_MS = float(os.environ.get('ARRANQUE_PRESUPUESTO_MS') or 1000)
+PREFIJO_FASE = "arranque."
+
+def leer_importtime(lineas) -> tuple:
+    """
+    Separa la salida de -X importtime del resto de stderr. Devuelve
+    ([{'modulo', 'nivel', 'propio_ms', 'acumulado_ms'}], otras_lineas).
+    """
+    imports, otras = [], []
+    for linea in lineas:
+        if not linea.startswith("import time:"):
+            otras.append(linea)
+            continue
+        try:
+            propio, acumulado, nombre = linea.split(":", 1)[1].split("|")
+            propio_us, acumulado_us = int(propio), int(acumulado)
+        except ValueError:
+            continue  # cabecera "self [us] | cumulative | imported package"
+        sangria = len(nombre) - len(nombre.lstrip()) - 1
+        imports.append({
+            "modulo": nombre.strip(),
+            "nivel": sangria // 2,
+            "propio_ms": propio_us / 1000,
+            "acumulado_ms": acumulado_us / 1000,
+        })
+    return imports, otras
+
+def arbol_de_imports(imports) -> list:
+    """
+    Imports de primer nivel con sus submódulos en 'hijos'. -X importtime
+    escribe cada módulo después de los que importa, con un nivel más de sangría.
+    """
+    pendientes = {}
+    for item in imports:
+        nodo = dict(item, hijos=pendientes.pop(item["nivel"] + 1, []))
+        pendientes.setdefault(item["nivel"], []).append(nodo)
+    return pendientes.get(0, [])
+
+def informar_arranque(ruta_informe, app, ventana):
+    """
+    Parte del proceso hijo: espera al primer pintado de `ventana`, guarda las
+    mediciones en `ruta_informe` y cierra la aplicación.
+    """
+    with rendimiento.medir(PREFIJO_FASE + "primer_pintado"):
+        app.processEvents()
+    listo = time.time()
+
+    estadisticas = rendimiento.estadisticas()
+    with open(ruta_informe, "w", encoding="utf-8") as f:
+        json.dump({
+            "listo": listo,
+            "fases": {nombre: datos["ultima_ms"] for nombre, datos in estadisticas.items()
+                      if nombre.startswith(PREFIJO_FASE)},
+            "construccion": {nombre: datos["ultima_ms"] for nombre, datos in estadisticas.items()
+                             if not nombre.startswith(PREFIJO_FASE)},
+        }, f)
+    ventana.close()
+    return 0
+
+def perfilar(script, presupuesto_ms=PRESUPUESTO_MS, salida=None, mostrar=15, submodulos=3) -> int:
+    """Lanza el arranque perfilado de `script`, imprime el informe y compara con el presupuesto."""
+    descriptor, ruta_informe = tempfile.mkstemp(prefix="arranque_", suffix=".json")
+    os.close(descriptor)
+    try:
+        lanzado = time.time()
+        proceso = subprocess.run(
+            [sys.executable, "-X", "importtime", script, "--informe-arranque", ruta_informe],
+            stderr=subprocess.PIPE, text=True, encoding="utf-8", errors="replace",
+        )
+        imports, otras = leer_importtime(proceso.stderr.splitlines())
+        sys.stderr.write("".join(linea + "\n" for linea in otras))
+        try:
+            with open(ruta_informe, encoding="utf-8") as f:
+                informe = json.load(f)
+        except (OSError, ValueError):
+            informe = None
+    finally:
+        os.remove(ruta_informe)
+
+    if proceso.returncode != 0 or not informe:
+        print(f"El arranque perfilado falló (código {proceso.returncode})")
+        return 1
+
+    total_ms = (informe["listo"] - lanzado) * 1000
+    imports_ms = sum(i["propio_ms"] for i in imports)
+
+    print(f"Arranque en frío hasta la ventana pintada: {total_ms:.0f} ms "
+          f"(presupuesto {presupuesto_ms:.0f} ms)")
+    print(f"Imports: {imports_ms:.0f} ms en {len(imports)} módulos\n")
+    print("Fases:")
+    for nombre, ms in informe["fases"].items():
+        print(f"  {nombre:<45} {ms:9.1f} ms")
+    if informe["construccion"]:
+        print("Construcción:")
+        for nombre, ms in informe["construccion"].items():
+            print(f"  {nombre:<45} {ms:9.1f} ms")
+
+    print(f"\nImports más costosos (acumulado; debajo, sus submódulos más caros):")
+    por_coste = lambda nodos: sorted(nodos, key=lambda n: n["acumulado_ms"], reverse=True)
+    for raiz in por_coste(arbol_de_imports(imports))[:mostrar]:
+        print(f"  {raiz['modulo']:<45} {raiz['acumulado_ms']:9.1f} ms")
+        for hijo in por_coste(raiz["hijos"])[:submodulos]:
+            print(f"    {hijo['modulo']:<43} {hijo['acumulado_ms']:9.1f} ms")
+
+    if salida:
+        with open(salida, "w", encoding="utf-8") as f:
+            json.dump({"total_ms": round(total_ms, 1), "presupuesto_ms": presupuesto_ms,
+                       "imports_ms": round(imports_ms, 1), "fases": informe["fases"],
+                       "construccion": informe["construccion"], "imports": imports},
+                      f, ensure_ascii=False, indent=2)
+
+    if total_ms > presupuesto_ms:
+        print(f"\nEl arranque supera el presupuesto en {total_ms - presupuesto_ms:.0f} ms")
+        return 1
+    return 0
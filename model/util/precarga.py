@@ -0,0 +1,133 @@
+# precarga.py
+# Calentamiento de las cachés de cliente tras el login.
+#
+# Al iniciar sesión se piden a la vez, en un pool de hilos acotado, los datos
+# que cada sección carga la primera vez que se abre (catálogo, resumen de hoy,
+# historial). Los clientes de la API consultan primero este almacén:
+#
+#   consumos = precarga.historial(desde, hasta)   # lista de Consumo (registros.py)
+#   if consumos is None:
+#       ... petición a la API ...
+#
+# Los datos precargados caducan a los PRECARGA_VIGENCIA_S segundos y se
+# descartan al registrar un consumo (propio o notificado por /events) y al
+# cerrar sesión. Lo que traiga una tarea iniciada antes de descartarlos no se
+# guarda.
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+from model.util.rendimiento import registrar
+
+PRECARGA_HILOS = int(os.environ.get('PRECARGA_HILOS') or 3)
+PRECARGA_VIGENCIA_S = float(os.environ.get('PRECARGA_VIGENCIA_S') or 120)
+
+_cerrojo = threading.Lock()
+_datos = {}        # clave -> (instante, valor)
+_generacion = 0    # aumenta con cada invalidar()
+
+def generacion() -> int:
+    return _generacion
+
+def guardar(clave, valor, generacion_inicio=None) -> bool:
+    """Guarda `valor`; se ignora si hubo un invalidar() desde `generacion_inicio`."""
+    with _cerrojo:
+        if generacion_inicio is not None and generacion_inicio != _generacion:
+            return False
+        _datos[clave] = (time.monotonic(), valor)
+        return True
+
+def obtener(clave):
+    """Valor precargado vigente para `clave`, o None."""
+    with _cerrojo:
+        entrada = _datos.get(clave)
+        if entrada is None:
+            return None
+        if time.monotonic() - entrada[0] > PRECARGA_VIGENCIA_S:
+            del _datos[clave]
+            return None
+        return entrada[1]
+
+def historial(desde: str, hasta: str):
+    """
+    Consumos entre `desde` y `hasta` (fechas ISO) si algún historial precargado
+    cubre ese rango, en el orden de /historial; si no, None.
+    """
+    with _cerrojo:
+        claves = [clave for clave in _datos if clave[0] == "historial"
+                  and clave[1] <= desde and hasta <= clave[2]]
+    for clave in claves:
+        consumos = obtener(clave)
+        if consumos is not None:
+            return [c for c in consumos if desde <= c.fecha <= hasta]
+    return None
+
+def invalidar(*_args):
+    """Descarta todo lo precargado (acepta y omite los argumentos de una señal)."""
+    global _generacion
+    with _cerrojo:
+        _datos.clear()
+        _generacion += 1
+
+class CalentadorCaches(QObject):
+    """
+    Ejecuta las tareas de precarga en paralelo. Cada tarea es una función sin
+    argumentos que devuelve (clave, valor) para guardar, o None si ya dejó los
+    datos en la caché de su cliente. `terminado` se emite (en el hilo de la
+    interfaz) con {tarea: ms, o None si falló} al acabar todas.
+    """
+    terminado = pyqtSignal(dict)
+
+    def __init__(self, tareas: dict, hilos=PRECARGA_HILOS, parent=None):
+        super().__init__(parent)
+        self.tareas = tareas
+        self.hilos = hilos
+        self._pool = None
+        self._resultados = {}
+        self._pendientes = 0
+        self._cerrojo = threading.Lock()
+
+    def iniciar(self):
+        self.cancelar()
+        pool = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="precarga")
+        with self._cerrojo:
+            self._pool = pool
+            self._resultados = {}
+            self._pendientes = len(self.tareas)
+        inicio_generacion = generacion()
+        for nombre, tarea in self.tareas.items():
+            pool.submit(self._ejecutar, pool, inicio_generacion, nombre, tarea)
+
+    def cancelar(self):
+        """Descarta las tareas que no empezaron, lo que traigan las que están en curso y lo ya precargado."""
+        with self._cerrojo:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        invalidar()
+
+    def _ejecutar(self, pool, inicio_generacion, nombre, tarea):
+        inicio = time.perf_counter()
+        try:
+            resultado = tarea()
+            if resultado is not None:
+                guardar(*resultado, generacion_inicio=inicio_generacion)
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            registrar(f"precarga.{nombre}", duracion_ms)
+        except Exception as e:
+            print(f"ADVERTENCIA: Falló la precarga de '{nombre}': {e}")
+            duracion_ms = None
+
+        with self._cerrojo:
+            if pool is not self._pool:
+                return
+            self._resultados[nombre] = duracion_ms
+            self._pendientes -= 1
+            if self._pendientes:
+                return
+            resultados = dict(self._resultados)
+            self._pool = None
+        pool.shutdown(wait=False)
+        self.terminado.emit(resultados)
@@ -0,0 +1,120 @@
+# preferencias.py
+# Preferencias del usuario (p. ej. qué mensajes de bienvenida ya vio) en una
+# tabla clave-valor de su BD.
+#
+# Se leen todas una vez por sesión; consultarlas no toca la BD. Los cambios
+# se acumulan en memoria y se escriben juntos, en una transacción, a los
+# PREFERENCIAS_ESCRITURA_MS de la última modificación o al cerrar la sesión:
+#
+#   preferencias = sesion.preferencias
+#   if not preferencias.obtener("bienvenida.salud"):
+#       ...
+#       preferencias.establecer("bienvenida.salud", True)
+
+import json
+import os
+import sqlite3
+from PyQt6.QtCore import QCoreApplication, QTimer
+
+PREFERENCIAS_ESCRITURA_MS = int(os.environ.get('PREFERENCIAS_ESCRITURA_MS') or 2000)
+PREFIJO_BIENVENIDA = "bienvenida."
+
+# Los valores se guardan como JSON
+ESQUEMA_PREFERENCIAS = """
+    CREATE TABLE IF NOT EXISTS preferencias (
+        clave TEXT PRIMARY KEY,
+        valor TEXT NOT NULL
+    )
+"""
+
+class Preferencias:
+    def __init__(self, conexion, escritura_ms=PREFERENCIAS_ESCRITURA_MS):
+        """`conexion` es la de la BD del usuario; con None, las preferencias solo viven en memoria."""
+        self.conexion = conexion
+        self._valores = {}
+        self._pendientes = {}   # clave -> valor nuevo, o None para borrarla
+        self._temporizador = None
+        if QCoreApplication.instance() is not None:
+            self._temporizador = QTimer()
+            self._temporizador.setSingleShot(True)
+            self._temporizador.setInterval(escritura_ms)
+            self._temporizador.timeout.connect(self.guardar)
+        if conexion is not None:
+            self._cargar()
+
+    def _cargar(self):
+        existia = self.conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'preferencias'").fetchone()
+        self.conexion.execute(ESQUEMA_PREFERENCIAS)
+        if not existia:
+            self._importar_mensajes()
+        for clave, valor in self.conexion.execute("SELECT clave, valor FROM preferencias"):
+            self._valores[clave] = json.loads(valor)
+
+    def _importar_mensajes(self):
+        """
+        Trae los mensajes de bienvenida ya vistos de la antigua tabla `mensajes`.
+        La que crea UserDatabase marca con 1 los mostrados; la de UsuarioManager
+        (con columna id) marca con 1 los pendientes.
+        """
+        try:
+            cursor = self.conexion.execute("SELECT * FROM mensajes LIMIT 1")
+        except sqlite3.Error:
+            return
+        fila = cursor.fetchone()
+        if fila is not None:
+            columnas = [columna[0] for columna in cursor.description]
+            valor_mostrado = 0 if "id" in columnas else 1
+            self.conexion.executemany(
+                "INSERT OR IGNORE INTO preferencias (clave, valor) VALUES (?, 'true')",
+                [(PREFIJO_BIENVENIDA + columna,) for columna, valor in zip(columnas, fila)
+                 if columna != "id" and valor == valor_mostrado])
+        self.conexion.commit()
+
+    def obtener(self, clave, defecto=None):
+        return self._valores.get(clave, defecto)
+
+    def establecer(self, clave, valor):
+        """Cambia la preferencia en memoria y programa la escritura (None la borra)."""
+        if valor is None:
+            return self.borrar(clave)
+        if clave in self._valores and self._valores[clave] == valor:
+            return
+        self._valores[clave] = valor
+        self._pendientes[clave] = valor
+        self._programar()
+
+    def borrar(self, clave):
+        if clave in self._valores:
+            del self._valores[clave]
+            self._pendientes[clave] = None
+            self._programar()
+
+    def claves(self, prefijo=""):
+        return [clave for clave in self._valores if clave.startswith(prefijo)]
+
+    def _programar(self):
+        # Cada cambio reinicia la espera: una ráfaga de cambios es una sola escritura
+        if self._temporizador is not None:
+            self._temporizador.start()
+
+    def guardar(self):
+        """Escribe los cambios pendientes en una transacción."""
+        if self._temporizador is not None:
+            self._temporizador.stop()
+        if not self._pendientes or self.conexion is None:
+            return
+        pendientes, self._pendientes = self._pendientes, {}
+        try:
+            with self.conexion:
+                self.conexion.executemany(
+                    "INSERT INTO preferencias (clave, valor) VALUES (?, ?) "
+                    "ON CONFLICT(clave) DO UPDATE SET valor = excluded.valor",
+                    [(clave, json.dumps(valor)) for clave, valor in pendientes.items() if valor is not None])
+                self.conexion.executemany(
+                    "DELETE FROM preferencias WHERE clave = ?",
+                    [(clave,) for clave, valor in pendientes.items() if valor is None])
+        except sqlite3.Error as e:
+            # Se reintentan en la próxima escritura, sin pisar lo cambiado mientras tanto
+            self._pendientes = {**pendientes, **self._pendientes}
+            print(f"ADVERTENCIA: No se pudieron guardar las preferencias: {e}")
@@ -0,0 +1,91 @@
+# registros.py
+# Registros compactos de consumos y series de gráficos, compartidos desde la
+# respuesta de la API hasta la vista.
+#
+#   consumos = consumos_de_columnas(response.json())   # /historial?formato=columnar
+#   consumos[0].fecha, consumos[0].total_cal
+#   filas = filas_para_tabla(consumos)                 # textos ya formateados
+#
+# Un Consumo es una tupla con nombre (NamedTuple): sin diccionario por fila ni
+# claves repetidas. Las fechas, horas y nombres se internan, de modo que un año
+# de historial comparte un solo objeto por día y por alimento; los textos de
+# la tabla se calculan una vez al construir las filas, no en cada data() de Qt.
+# Los consumos notificados por /events (diccionarios) se convierten con
+# Consumo.de_dict().
+
+import sys
+from array import array
+from typing import NamedTuple, Optional
+
+CAMPOS_CONSUMO = ("id", "nombre", "fecha", "hora", "cantidad", "total_cal")
+
+class Consumo(NamedTuple):
+    id: Optional[int]
+    nombre: str
+    fecha: str        # YYYY-MM-DD
+    hora: str         # HH:MM
+    cantidad: float
+    total_cal: float
+
+    @classmethod
+    def de_dict(cls, datos: dict) -> "Consumo":
+        """Consumo a partir de una fila de /historial o de una notificación de /events."""
+        return cls(datos.get('id'), sys.intern(datos.get('nombre') or ''), sys.intern(datos.get('fecha') or ''),
+                   sys.intern(datos.get('hora') or ''), datos.get('cantidad', 0), datos.get('total_cal', 0))
+
+    def orden(self):
+        """Clave del orden de /historial: fecha, hora, id."""
+        return (self.fecha, self.hora, self.id or 0)
+
+def consumos_de_columnas(datos: dict) -> list:
+    """Convierte una respuesta ?formato=columnar en una lista de Consumo, sin pasar por diccionarios."""
+    if not datos:
+        return []
+    try:
+        columnas = [datos[campo] for campo in CAMPOS_CONSUMO]
+    except KeyError as e:
+        raise ValueError(f"Falta la columna {e} en la respuesta de /historial")
+    for i in (1, 2, 3):  # nombre, fecha, hora
+        columnas[i] = list(map(sys.intern, columnas[i]))
+    return list(map(Consumo._make, zip(*columnas)))
+
+def filas_para_tabla(consumos) -> list:
+    """Filas (alimento, fecha DD-MM-AAAA, hora, cantidad, calorías) de textos listos para mostrar."""
+    textos = {}  # (tipo, valor) -> texto, compartido entre filas (150 y 150.0 se muestran distinto)
+    def texto(valor):
+        clave = (valor.__class__, valor)
+        resultado = textos.get(clave)
+        if resultado is None:
+            resultado = textos[clave] = str(valor)
+        return resultado
+
+    fechas = {}
+    filas = []
+    for consumo in consumos:
+        fecha = fechas.get(consumo.fecha)
+        if fecha is None:
+            fecha = fechas[consumo.fecha] = fecha_para_mostrar(consumo.fecha)
+        filas.append((consumo.nombre, fecha, consumo.hora,
+                      texto(consumo.cantidad), texto(round(consumo.total_cal or 0, 1))))
+    return filas
+
+def fecha_para_mostrar(fecha: str) -> str:
+    """YYYY-MM-DD -> DD-MM-AAAA; cualquier otro valor se muestra tal cual."""
+    if len(fecha) == 10 and fecha[4] == fecha[7] == '-':
+        return f"{fecha[8:10]}-{fecha[5:7]}-{fecha[0:4]}"
+    return fecha or 'N/A'
+
+class SerieGrafico(NamedTuple):
+    """Etiquetas del eje X y valores de un gráfico; se desempaqueta como (labels, data)."""
+    etiquetas: tuple
+    valores: array
+
+    @classmethod
+    def vacia(cls) -> "SerieGrafico":
+        return cls((), array('d'))
+
+    @classmethod
+    def por_dia(cls, fechas, valores) -> "SerieGrafico":
+        """Serie con un punto por fecha YYYY-MM-DD, etiquetado DD/MM."""
+        return cls(tuple(f"{fecha[8:10]}/{fecha[5:7]}" for fecha in fechas),
+                   array('d', (valor or 0 for valor in valores)))
@@ -0,0 +1,98 @@
+# rendimiento.py
+# Medición de tiempos en la GUI para localizar operaciones lentas.
+#
+#   with medir("Historial.aplicar_filtros"):
+#       ...
+#
+#   @cronometrado("BarChartWidget.paintEvent")
+#   def paintEvent(self, event): ...
+#
+# Las mediciones se guardan en un buffer circular en memoria (las más antiguas
+# se descartan) y se consultan desde el overlay de desarrollo (Ctrl+Shift+P) o
+# con exportar_json() para comparar entre versiones.
+#
+# El decorador pasa al método todos los argumentos que recibe: en slots que
+# descartan argumentos de la señal (clicked, currentTextChanged, ...) hay que
+# usar el context manager dentro del método.
+
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+CAPACIDAD = 5000
+
+# (operación, inicio según time.time(), duración en ms)
+_mediciones = deque(maxlen=CAPACIDAD)
+
+def registrar(nombre: str, duracion_ms: float, inicio: float = None):
+    _mediciones.append((nombre, inicio if inicio is not None else time.time(), duracion_ms))
+
+@contextmanager
+def medir(nombre: str):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        registrar(nombre, duracion_ms)
+
+def cronometrado(nombre: str = None):
+    """Decorador equivalente a envolver la función en medir(nombre)."""
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__qualname__
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                registrar(etiqueta, (time.perf_counter() - inicio) * 1000)
+        return envoltura
+    return decorador
+
+def _percentil(ordenados: list, p: float) -> float:
+    # Rango más cercano: suficiente para unas decenas/cientos de muestras
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+def estadisticas() -> dict:
+    """{operación: {'n', 'p50_ms', 'p95_ms', 'max_ms', 'ultima_ms'}} de las mediciones en el buffer."""
+    por_operacion = {}
+    for nombre, _inicio, duracion in list(_mediciones):
+        por_operacion.setdefault(nombre, []).append(duracion)
+
+    resultado = {}
+    for nombre, duraciones in sorted(por_operacion.items()):
+        ordenados = sorted(duraciones)
+        resultado[nombre] = {
+            "n": len(duraciones),
+            "p50_ms": round(_percentil(ordenados, 50), 3),
+            "p95_ms": round(_percentil(ordenados, 95), 3),
+            "max_ms": round(ordenados[-1], 3),
+            "ultima_ms": round(duraciones[-1], 3),
+        }
+    return resultado
+
+def exportar_json(ruta: str = None, incluir_mediciones: bool = False) -> str:
+    """Guarda las estadísticas (y opcionalmente cada medición) en JSON; devuelve la ruta."""
+    if ruta is None:
+        ruta = os.path.join("logs", f"rendimiento_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+
+    datos = {"generado": datetime.now().isoformat(timespec="seconds"), "operaciones": estadisticas()}
+    if incluir_mediciones:
+        datos["mediciones"] = [
+            {"operacion": nombre, "inicio": inicio, "duracion_ms": round(duracion, 3)}
+            for nombre, inicio, duracion in list(_mediciones)
+        ]
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    return ruta
+
+def limpiar():
+    _mediciones.clear()
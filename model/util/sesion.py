@@ -0,0 +1,123 @@
+# sesion.py
+# Sesión del usuario en este proceso.
+#
+# Se crea al iniciar sesión (MainWindow.on_login_success) y se pasa a las
+# secciones; guarda el nombre de usuario, el token de la API, una conexión
+# a la BD del usuario abierta una sola vez, la fila de `datos` del perfil,
+# sus preferencias (model/util/preferencias.py) y los vasos de agua
+# (model/salud/registro_agua.py):
+#
+#   sesion = sesion_actual()
+#   meta = sesion.datos().get("meta_cal")
+#
+# usuario_actual.txt solo se lee la primera vez que se necesita sin sesión
+# y solo se escribe cuando el usuario cambia. La conexión es del hilo de la
+# interfaz: los hilos de trabajo abren la suya.
+
+from typing import Optional
+from model.util.api_http import establecer_token
+from model.util.base import DBManager
+from model.util.preferencias import Preferencias
+from model.salud.registro_agua import RegistroAgua
+
+ARCHIVO_USUARIO_ACTUAL = 'usuario_actual.txt'
+
+_actual = None
+_persistido = None   # contenido de usuario_actual.txt ('' si no existe), leído una vez
+
+class Sesion:
+    def __init__(self, usuario: str, token: Optional[str] = None):
+        self.usuario = usuario
+        self.token = token
+        self._conexion = None
+        self._datos = None
+        self._preferencias = None
+        self._agua = None
+
+    @property
+    def conexion(self):
+        """Conexión a la BD del usuario, abierta la primera vez; None si no existe."""
+        if self._conexion is None:
+            self._conexion = DBManager.conectar_usuario(self.usuario)
+        return self._conexion
+
+    def datos(self) -> dict:
+        """Fila de `datos` del usuario como {columna: valor} ({} si no hay)."""
+        if self._datos is None:
+            self._datos = {}
+            if self.conexion is not None:
+                cursor = self.conexion.execute("SELECT * FROM datos WHERE nombre = ?", (self.usuario,))
+                fila = cursor.fetchone()
+                if fila is not None:
+                    self._datos = dict(zip((columna[0] for columna in cursor.description), fila))
+        return self._datos
+
+    @property
+    def preferencias(self) -> Preferencias:
+        """Preferencias del usuario, leídas la primera vez."""
+        if self._preferencias is None:
+            self._preferencias = Preferencias(self.conexion)
+        return self._preferencias
+
+    @property
+    def agua(self) -> RegistroAgua:
+        """Vasos de agua del usuario, con escritura diferida."""
+        if self._agua is None:
+            self._agua = RegistroAgua(self.conexion)
+        return self._agua
+
+    def invalidar_datos(self, *_args):
+        """Descarta la fila de `datos` en memoria (acepta y omite los argumentos de una señal)."""
+        self._datos = None
+
+    def cerrar(self):
+        if self._agua is not None:
+            self._agua.guardar()
+            self._agua = None
+        if self._preferencias is not None:
+            self._preferencias.guardar()
+            self._preferencias = None
+        if self._conexion is not None:
+            self._conexion.close()
+            self._conexion = None
+        self._datos = None
+
+def sesion_actual() -> Optional[Sesion]:
+    return _actual
+
+def iniciar_sesion(usuario: str, token: Optional[str] = None) -> Sesion:
+    """Crea la sesión de `usuario` (cerrando la anterior) y lo recuerda como usuario actual."""
+    global _actual
+    cerrar_sesion()
+    _actual = Sesion(usuario, token)
+    establecer_token(token)
+    persistir_usuario(usuario)
+    return _actual
+
+def cerrar_sesion():
+    global _actual
+    if _actual is not None:
+        _actual.cerrar()
+        _actual = None
+    establecer_token(None)
+
+def usuario_persistido() -> Optional[str]:
+    """Último usuario guardado en usuario_actual.txt, o None."""
+    global _persistido
+    if _persistido is None:
+        try:
+            with open(ARCHIVO_USUARIO_ACTUAL, 'r') as file:
+                _persistido = file.readline().strip()
+        except FileNotFoundError:
+            _persistido = ''
+    return _persistido or None
+
+def persistir_usuario(usuario: str) -> bool:
+    """Escribe usuario_actual.txt si `usuario` no es el que ya guarda."""
+    global _persistido
+    if usuario == (usuario_persistido() or ''):
+        return True
+    with open(ARCHIVO_USUARIO_ACTUAL, 'w') as file:
+        file.write(usuario)
+    _persistido = usuario
+    return True
@@ -0,0 +1,111 @@
+# trazas.py
+# Traza de las consultas SQLite de DBManager, configurable por variables de entorno:
+#
+#   DB_TRAZA=1             registra cada consulta (sentencia, duración, filas) en
+#                          el logger "calorias.sql" con nivel DEBUG, en JSON por línea
+#   DB_TRAZA_MUESTREO=0.1  fracción de consultas que se registran (por defecto todas)
+#   DB_LENTA_MS=50         las consultas que superan este tiempo se guardan siempre,
+#                          con su EXPLAIN QUERY PLAN, en el logger "calorias.sql.lentas"
+#   DB_LENTA_ARCHIVO=...   fichero del registro de consultas lentas
+#                          (por defecto ./logs/consultas_lentas.jsonl)
+#
+# Sin DB_TRAZA ni DB_LENTA_MS, `trazador` es None y DBManager no mide nada.
+# Los valores de los parámetros no se registran (pueden incluir contraseñas),
+# solo su número.
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+from functools import lru_cache
+
+logger_traza = logging.getLogger("calorias.sql")
+logger_lentas = logging.getLogger("calorias.sql.lentas")
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro, con los campos pasados en extra={'traza': {...}}."""
+
+    def format(self, registro):
+        datos = {
+            "ts": self.formatTime(registro, "%Y-%m-%dT%H:%M:%S"),
+            "nivel": registro.levelname,
+            "logger": registro.name,
+            "mensaje": registro.getMessage(),
+        }
+        datos.update(getattr(registro, "traza", {}))
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+class TrazadorConsultas:
+    def __init__(self, trazar=False, muestreo=1.0, lenta_ms=0.0):
+        self.trazar = trazar
+        self.muestreo = muestreo
+        self.lenta_s = lenta_ms / 1000.0
+
+    def registrar(self, conexion, sentencia, parametros, filas, duracion):
+        """Llamado por DBManager.ejecutar_query tras cada consulta terminada."""
+        es_lenta = self.lenta_s > 0 and duracion >= self.lenta_s
+        if not es_lenta and not (self.trazar and random.random() < self.muestreo):
+            return
+
+        traza = {
+            "sql": " ".join(sentencia.split()),
+            "parametros": len(parametros) if parametros else 0,
+            "duracion_ms": round(duracion * 1000, 3),
+            "filas": filas,
+        }
+        if es_lenta:
+            traza["plan"] = plan_de_consulta(conexion, sentencia, _aridad(parametros))
+            logger_lentas.warning("consulta lenta", extra={"traza": traza})
+        else:
+            logger_traza.debug("consulta", extra={"traza": traza})
+
+def _aridad(parametros):
+    return len(parametros) if isinstance(parametros, (tuple, list)) else 0
+
+@lru_cache(maxsize=128)
+def _plan_en_cache(ruta_bd, sentencia, aridad):
+    # El plan no depende del valor de los parámetros: basta con NULL en cada uno
+    conexion = sqlite3.connect(ruta_bd)
+    try:
+        filas = conexion.execute(f"EXPLAIN QUERY PLAN {sentencia}", (None,) * aridad).fetchall()
+    finally:
+        conexion.close()
+    return tuple(fila[-1] for fila in filas)
+
+def plan_de_consulta(conexion, sentencia, aridad=0):
+    """Detalle de EXPLAIN QUERY PLAN para la sentencia, o el error si no se pudo obtener."""
+    try:
+        ruta_bd = conexion.execute("PRAGMA database_list").fetchone()[2]
+        if ruta_bd:
+            return list(_plan_en_cache(ruta_bd, sentencia, aridad))
+        # Base en memoria: no se puede abrir otra conexión, se usa la misma
+        filas = conexion.execute(f"EXPLAIN QUERY PLAN {sentencia}", (None,) * aridad).fetchall()
+        return [fila[-1] for fila in filas]
+    except sqlite3.Error as e:
+        return [f"sin plan: {e}"]
+
+def _configurar_logger(logger, manejador, nivel):
+    manejador.setFormatter(FormatoJSON())
+    logger.addHandler(manejador)
+    logger.setLevel(nivel)
+    logger.propagate = False
+
+def crear_trazador():
+    trazar = (os.environ.get("DB_TRAZA") or "").lower() in ("1", "true", "si")
+    lenta_ms = float(os.environ.get("DB_LENTA_MS") or 0)
+    if not trazar and lenta_ms <= 0:
+        return None
+
+    if trazar:
+        _configurar_logger(logger_traza, logging.StreamHandler(sys.stderr), logging.DEBUG)
+    if lenta_ms > 0:
+        archivo = os.environ.get("DB_LENTA_ARCHIVO") or "./logs/consultas_lentas.jsonl"
+        os.makedirs(os.path.dirname(os.path.abspath(archivo)), exist_ok=True)
+        _configurar_logger(logger_lentas, logging.FileHandler(archivo, encoding="utf-8"), logging.WARNING)
+
+    muestreo = float(os.environ.get("DB_TRAZA_MUESTREO") or 1.0)
+    return TrazadorConsultas(trazar=trazar, muestreo=muestreo, lenta_ms=lenta_ms)
+
+trazador = crear_trazador()
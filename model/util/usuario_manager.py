@@ -2,30 +2,29 @@
 import sqlite3
 import os
 from PyQt6.QtWidgets import QMessageBox
+from model.util.sesion import sesion_actual, usuario_persistido, persistir_usuario
+from model.util.preferencias import ESQUEMA_PREFERENCIAS, PREFIJO_BIENVENIDA, Preferencias
 
 class UsuarioManager:
     """Clase para manejar la gestión de usuarios y mensajes en PyQt6"""
     
     @staticmethod
     def obtener_usuario_actual():
-        """Obtiene el usuario actual desde el archivo de configuración"""
+        """Usuario de la sesión en curso o, sin sesión, el último guardado en usuario_actual.txt"""
+        sesion = sesion_actual()
+        if sesion is not None:
+            return sesion.usuario
         try:
-            if os.path.exists('usuario_actual.txt'):
-                with open('usuario_actual.txt', 'r') as file:
-                    usuario = file.readline().strip()
-                    return usuario if usuario else None
-            return None
+            return usuario_persistido()
         except Exception as e:
             print(f"Error al obtener usuario actual: {e}")
             return None
     
     @staticmethod
     def establecer_usuario_actual(usuario):
-        """Establece el usuario actual en el archivo de configuración"""
+        """Establece el usuario actual en el archivo de configuración (solo si cambia)"""
         try:
-            with open('usuario_actual.txt', 'w') as file:
-                file.write(usuario)
-            return True
+            return persistir_usuario(usuario)
         except Exception as e:
             print(f"Error al establecer usuario actual: {e}")
             return False
@@ -52,17 +51,8 @@ class UsuarioManager:
         """Crea las tablas iniciales necesarias para un nuevo usuario"""
         cursor = conn.cursor()
         try:
-            # Tabla de mensajes para controlar qué mensajes se han mostrado
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS mensajes (
-                    id INTEGER PRIMARY KEY,
-                    salud INTEGER DEFAULT 1,
-                    peso INTEGER DEFAULT 1,
-                    pulsaciones INTEGER DEFAULT 1,
-                    recordatorios INTEGER DEFAULT 1,
-                    agua INTEGER DEFAULT 1
-                )
-            ''')
+            # Preferencias, entre ellas qué mensajes se han mostrado
+            cursor.execute(ESQUEMA_PREFERENCIAS)
             
             # Tabla de peso
             cursor.execute('''
@@ -73,9 +63,6 @@ class UsuarioManager:
                 )
             ''')
             
-            # Insertar registro inicial en mensajes
-            cursor.execute('INSERT OR IGNORE INTO mensajes (id) VALUES (1)')
-            
             conn.commit()
             print(f"Tablas iniciales creadas para usuario: {usuario}")
             
@@ -85,54 +72,30 @@ class UsuarioManager:
     @staticmethod
     def mostrar_mensaje_una_vez(parent, nombre_ventana, mensaje, titulo):
         """
-        Muestra un mensaje solo una vez por sesión/usuario
+        Muestra un mensaje solo una vez por usuario
         
         Args:
             parent: Widget padre para el mensaje
-            nombre_ventana: Nombre de la ventana/módulo (columna en tabla mensajes)
+            nombre_ventana: Nombre de la ventana/módulo (clave en las preferencias)
             mensaje: Texto del mensaje
             titulo: Título del mensaje
         """
-        usuario = UsuarioManager.obtener_usuario_actual()
-        if not usuario:
+        sesion = sesion_actual()
+        if sesion is None:
             return
         
-        conn = UsuarioManager.conectar_bd_usuario(usuario)
-        if not conn:
+        clave = PREFIJO_BIENVENIDA + nombre_ventana
+        if sesion.preferencias.obtener(clave):
             return
         
-        try:
-            cursor = conn.cursor()
-            
-            # Verificar si existe la columna
-            cursor.execute("PRAGMA table_info(mensajes)")
-            columnas = [col[1] for col in cursor.fetchall()]
-            
-            if nombre_ventana not in columnas:
-                # Agregar columna si no existe
-                cursor.execute(f"ALTER TABLE mensajes ADD COLUMN {nombre_ventana} INTEGER DEFAULT 1")
-                conn.commit()
-            
-            # Verificar si el mensaje debe mostrarse
-            cursor.execute(f"SELECT {nombre_ventana} FROM mensajes WHERE id = 1")
-            resultado = cursor.fetchone()
-            
-            if resultado and resultado[0] == 1:
-                # Mostrar mensaje
-                msg_box = QMessageBox(parent)
-                msg_box.setWindowTitle(titulo)
-                msg_box.setText(mensaje)
-                msg_box.setIcon(QMessageBox.Icon.Information)
-                msg_box.exec()
-                
-                # Marcar como mostrado
-                cursor.execute(f"UPDATE mensajes SET {nombre_ventana} = 0 WHERE id = 1")
-                conn.commit()
-                
-        except Exception as e:
-            print(f"Error al manejar mensaje: {e}")
-        finally:
-            conn.close()
+        msg_box = QMessageBox(parent)
+        msg_box.setWindowTitle(titulo)
+        msg_box.setText(mensaje)
+        msg_box.setIcon(QMessageBox.Icon.Information)
+        msg_box.exec()
+        
+        # Marcar como mostrado
+        sesion.preferencias.establecer(clave, True)
     
     @staticmethod
     def resetear_mensajes(usuario=None):
@@ -143,27 +106,40 @@ class UsuarioManager:
         if not usuario:
             return False
         
-        conn = UsuarioManager.conectar_bd_usuario(usuario)
-        if not conn:
-            return False
+        sesion = sesion_actual()
+        if sesion is not None and sesion.usuario == usuario:
+            preferencias, conn = sesion.preferencias, None
+        else:
+            conn = UsuarioManager.conectar_bd_usuario(usuario)
+            if not conn:
+                return False
+            preferencias = Preferencias(conn)
         
         try:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE mensajes SET salud = 1, peso = 1, pulsaciones = 1, recordatorios = 1, agua = 1 WHERE id = 1")
-            conn.commit()
+            for clave in preferencias.claves(PREFIJO_BIENVENIDA):
+                preferencias.borrar(clave)
+            if conn is not None:
+                preferencias.guardar()
             return True
         except Exception as e:
             print(f"Error al resetear mensajes: {e}")
             return False
         finally:
-            conn.close()
+            if conn is not None:
+                conn.close()
 
 class BaseWidget:
     """Clase base para widgets que necesitan acceso a usuario y mensajes"""
     
-    def __init__(self, parent=None, usuario=None):
+    def __init__(self, parent=None, usuario=None, sesion=None):
         self.parent = parent
-        self.usuario = usuario if usuario else UsuarioManager.obtener_usuario_actual()
+        self.sesion = sesion if sesion else sesion_actual()
+        if usuario:
+            self.usuario = usuario
+        elif self.sesion is not None:
+            self.usuario = self.sesion.usuario
+        else:
+            self.usuario = UsuarioManager.obtener_usuario_actual()
         
         if not self.usuario:
             raise ValueError("No se ha proporcionado un usuario válido y no hay usuario actual configurado")
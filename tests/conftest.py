@@ -0,0 +1,37 @@
+# conftest.py
+# La API se prueba en proceso (TestClient) contra una base SQLite temporal.
+# DATABASE_URL se fija antes de importar nada de controller.API: el motor se
+# crea al importar controller.API.database.
+
+import itertools
+import os
+import tempfile
+import pytest
+
+DIRECTORIO_PRUEBAS = tempfile.mkdtemp(prefix="calorias_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DIRECTORIO_PRUEBAS, 'app.db')}"
+os.environ.setdefault("Key_JWT", "clave-de-pruebas")
+os.chdir(DIRECTORIO_PRUEBAS)
+
+_numeros = itertools.count(1)
+
+@pytest.fixture(scope="session")
+def cliente():
+    """Cliente de la app completa. El ciclo de vida (pools, tablas) solo puede arrancar una vez por proceso."""
+    from fastapi.testclient import TestClient
+    from controller.API.gateway import app
+    with TestClient(app) as cliente:
+        yield cliente
+
+@pytest.fixture
+def usuario(cliente):
+    """(nombre, cabeceras con su token) de un usuario nuevo en cada prueba."""
+    nombre = f"prueba{next(_numeros)}"
+    respuesta = cliente.post("/register/", json={
+        "nombre_usuario": nombre, "password": "clave123", "sexo": "Femenino", "peso": 60,
+        "altura": 165, "meta_calorias": 2000, "nivel_actividad": "Ligero",
+        "fecha_nacimiento": "1990-01-01", "edad": 35,
+    })
+    assert respuesta.status_code == 201, respuesta.text
+    token = cliente.post("/login/", data={"username": nombre, "password": "clave123"}).json()["access_token"]
+    return nombre, {"Authorization": f"Bearer {token}"}
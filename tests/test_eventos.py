@@ -0,0 +1,114 @@
+# test_eventos.py
+# Reparto de /events: cada evento llega solo a su destinatario, y una sola
+# vez aunque un evento con id menor se confirme después que otro con id
+# mayor (commits desordenados).
+
+import asyncio
+import itertools
+import json
+from controller.API.database import SessionLocal, settings
+from controller.API.eventos import CentroEventos, Evento
+
+class WebSocketFalso:
+    def __init__(self):
+        self.mensajes = []
+
+    async def send_text(self, mensaje):
+        self.mensajes.append(mensaje)
+
+def _insertar(cliente, *ids):
+    async def insertar():
+        async with SessionLocal() as db:
+            for id_ in ids:
+                db.add(Evento(id=id_, tipo="peso", difusion=True, datos='{"id":%d}' % id_))
+            await db.commit()
+    cliente.portal.call(insertar)
+
+_numeros = itertools.count(1)
+
+def _registrar(cliente, nombre):
+    respuesta = cliente.post("/register/", json={
+        "nombre_usuario": nombre, "password": "clave123", "sexo": "Masculino", "peso": 80,
+        "altura": 180, "meta_calorias": 2500, "nivel_actividad": "Moderado",
+        "fecha_nacimiento": "1985-05-05", "edad": 40,
+    })
+    assert respuesta.status_code == 201, respuesta.text
+    token = cliente.post("/login/", data={"username": nombre, "password": "clave123"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def _ids(ws):
+    return [int(m.split(",")[0].split(":")[1]) for m in ws.mensajes]
+
+def test_evento_confirmado_tarde_se_reparte_una_vez(cliente):
+    centro = CentroEventos()
+    ws = WebSocketFalso()
+    base = 1_000_000
+    _insertar(cliente, base)
+
+    async def suscribir():
+        await centro.suscribir(ws, None, None)
+        centro._tarea.cancel()  # el reparto se hace a mano
+    cliente.portal.call(suscribir)
+    assert centro.ultimo_id == base
+
+    # El id base + 2 se confirma antes que base + 1
+    _insertar(cliente, base + 2)
+    cliente.portal.call(centro._repartir)
+    _insertar(cliente, base + 1)
+    cliente.portal.call(centro._repartir)
+    cliente.portal.call(centro._repartir)
+    assert _ids(ws) == [base + 2, base + 1]
+
+    # Más allá de la ventana ya no se recupera
+    _insertar(cliente, base + settings.EVENTOS_VENTANA + 10)
+    cliente.portal.call(centro._repartir)
+    _insertar(cliente, base + 3)
+    cliente.portal.call(centro._repartir)
+    assert _ids(ws) == [base + 2, base + 1, base + settings.EVENTOS_VENTANA + 10]
+
+def test_reconexion_no_duplica_lo_que_repartira_el_bucle(cliente):
+    centro = CentroEventos()
+    base = 2_000_000
+    _insertar(cliente, base, base + 2)
+
+    async def suscribir(ws, desde):
+        await centro.suscribir(ws, None, desde)
+        # El bucle sigue "activo" pero el reparto se hace a mano
+        centro._tarea.cancel()
+        centro._tarea = asyncio.get_running_loop().create_future()
+    primero = WebSocketFalso()
+    cliente.portal.call(suscribir, primero, None)
+    _insertar(cliente, base + 1)  # confirmado tarde, aún sin repartir
+
+    segundo = WebSocketFalso()
+    cliente.portal.call(suscribir, segundo, base - 1)
+    assert _ids(segundo) == [base, base + 2]
+    cliente.portal.call(centro._repartir)
+    assert _ids(primero) == [base + 1]
+    assert _ids(segundo) == [base, base + 2, base + 1]
+
+def test_evento_de_usuario_llega_solo_a_su_socket(cliente, usuario):
+    nombre, cabeceras = usuario
+    otro = f"otro{next(_numeros)}"
+    cabeceras_otro = _registrar(cliente, otro)
+    centro = CentroEventos()
+    propio, ajeno, anonimo = WebSocketFalso(), WebSocketFalso(), WebSocketFalso()
+
+    async def suscribir():
+        for ws, dueno in ((propio, nombre), (ajeno, otro), (anonimo, None)):
+            await centro.suscribir(ws, dueno, None)
+        centro._tarea.cancel()
+        centro._tarea = asyncio.get_running_loop().create_future()
+    cliente.portal.call(suscribir)
+
+    consumo = {"nombre": "Manzana", "fecha": "2025-06-01", "hora": "10:00", "cantidad": 1.0, "total_cal": 52.0}
+    respuesta = cliente.post("/registrar-consumo", headers=cabeceras, json={"consumo": consumo})
+    assert respuesta.status_code == 201, respuesta.text
+    respuesta = cliente.post("/peso/", headers=cabeceras_otro, json={"fecha": "01-06-25", "peso": 80.5})
+    assert respuesta.status_code == 201, respuesta.text
+    cliente.portal.call(centro._repartir)
+
+    assert [json.loads(m)["tipo"] for m in propio.mensajes] == ["consumo"]
+    assert json.loads(propio.mensajes[0])["datos"]["nombre"] == "Manzana"
+    assert [json.loads(m)["tipo"] for m in ajeno.mensajes] == ["peso"]
+    assert anonimo.mensajes == []
@@ -0,0 +1,116 @@
+# test_gasto_energetico.py
+# El estimador incremental debe dar lo mismo que un ajuste por mínimos
+# cuadrados ponderados hecho desde cero con todo el historial, y no contar
+# dos veces un consumo que llega por /historial y por /events.
+
+import random
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from model.salud.gasto_energetico import (
+    GASTO_SEMIVIDA_DIAS, GASTO_TENDENCIA_ALFA, KCAL_POR_KG, EstimadorGasto, ServicioGastoEnergetico,
+)
+
+def _decaimiento(dias):
+    return 0.5 ** (dias / GASTO_SEMIVIDA_DIAS)
+
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+def test_incremental_igual_a_minimos_cuadrados_desde_cero(semilla):
+    azar = random.Random(semilla)
+    inicio = date(2026, 1, 1)
+    peso, gasto_real = 90.0, 2500
+    estimador = EstimadorGasto()
+    puntos, ingestas = [], []
+    tendencia = ultimo = None
+    for d in range(120):
+        dia = inicio + timedelta(days=d)
+        ingesta = azar.gauss(2000, 300) if azar.random() < 0.8 else None
+        peso += ((ingesta if ingesta is not None else 2000) - gasto_real) / KCAL_POR_KG
+        pesado = peso + azar.gauss(0, 0.6) if azar.random() < 0.6 else None
+        if ingesta is None and pesado is None:
+            continue
+        estimador.agregar_dia(dia, ingesta, pesado)
+        # El estado se guarda en las preferencias en cada paso
+        estimador = EstimadorGasto(estimador.a_dict())
+        if pesado is not None:
+            alfa = 1 - (1 - GASTO_TENDENCIA_ALFA) ** (d - ultimo) if tendencia is not None else 1
+            tendencia = pesado if tendencia is None else tendencia + alfa * (pesado - tendencia)
+            ultimo = d
+            puntos.append((d, tendencia))
+        if ingesta is not None:
+            ingestas.append((d, ingesta))
+
+    t, y = (np.array(c) for c in zip(*puntos))
+    raiz_w = np.sqrt(_decaimiento(d - t))
+    matriz = np.vstack([t, np.ones_like(t)]).T * raiz_w[:, None]
+    pendiente = np.linalg.lstsq(matriz, y * raiz_w, rcond=None)[0][0]
+    ti, vi = (np.array(c) for c in zip(*ingestas))
+    media = (vi * _decaimiento(d - ti)).sum() / _decaimiento(d - ti).sum()
+
+    assert estimador.pendiente() == pytest.approx(pendiente, abs=1e-9)
+    assert estimador.ingesta_media() == pytest.approx(media, rel=1e-9)
+    assert estimador.gasto() == pytest.approx(media - KCAL_POR_KG * pendiente, rel=1e-9)
+
+def test_correccion_retroactiva_y_limites():
+    estimador = EstimadorGasto()
+    inicio = date(2026, 1, 1)
+    for d in range(40):
+        estimador.agregar_dia(inicio + timedelta(days=d), 2000.0, 80.0 - d * 0.05, ids=[d])
+    antes = estimador.ingesta_media()
+    assert estimador.corregir_ingesta(inicio + timedelta(days=37), 400, id_=1000)
+    assert estimador.ingesta_media() > antes
+    # Demasiado antiguo, o aún no incorporado
+    assert not estimador.corregir_ingesta(inicio, 100, id_=1001)
+    assert not estimador.corregir_ingesta(inicio + timedelta(days=40), 100, id_=1002)
+    with pytest.raises(ValueError):
+        estimador.agregar_dia(inicio, 1, None)
+
+def test_consumo_de_historial_y_de_events_cuenta_una_vez():
+    estimador = EstimadorGasto()
+    dia = date(2026, 3, 1)
+    estimador.agregar_dia(dia, 1500.0, 80.0, ids=[7, 8])
+    referencia = EstimadorGasto(estimador.a_dict())
+
+    # El consumo 8 ya se leyó de /historial: el evento (lento o reenviado) se ignora
+    estado = EstimadorGasto(estimador.a_dict())
+    assert not estado.corregir_ingesta(dia, 500.0, id_=8)
+    assert estado.ingesta_media() == referencia.ingesta_media()
+    # Uno nuevo se suma una sola vez aunque llegue dos veces
+    assert estado.corregir_ingesta(dia, 300.0, id_=9)
+    assert not EstimadorGasto(estado.a_dict()).corregir_ingesta(dia, 300.0, id_=9)
+    assert estado.recientes[dia.isoformat()] == 1800.0
+
+class ServicioSinApi(ServicioGastoEnergetico):
+    """Consumos y pesos en memoria en lugar de la API y la BD del usuario."""
+    def __init__(self, consumos):
+        super().__init__("prueba")
+        self.consumos = consumos
+        self._estimador = EstimadorGasto()
+
+    def _preferencias(self):
+        return None
+
+    def _ingestas(self, desde, hasta):
+        ingestas = {}
+        for consumo in self.consumos:
+            dia = date.fromisoformat(consumo["fecha"])
+            if desde <= dia <= hasta:
+                kcal, ids = ingestas.get(dia, (0.0, []))
+                ids.append(consumo["id"])
+                ingestas[dia] = (kcal + consumo["total_cal"], ids)
+        return ingestas
+
+    def _pesos(self, desde, hasta):
+        return {}
+
+def test_servicio_no_suma_dos_veces_un_consumo_retroactivo():
+    ayer = date.today() - timedelta(days=1)
+    retroactivo = {"id": 5, "fecha": (ayer - timedelta(days=2)).isoformat(), "total_cal": 600.0}
+    servicio = ServicioSinApi([{"id": 1, "fecha": retroactivo["fecha"], "total_cal": 1400.0}, retroactivo])
+    assert servicio.actualizar()
+    total = servicio.estimador().recientes[retroactivo["fecha"]]
+    assert total == 2000.0
+    # /events entrega después el mismo consumo
+    assert not servicio.aplicar_consumo(retroactivo)
+    assert servicio.aplicar_consumo({"id": 6, "fecha": retroactivo["fecha"], "total_cal": 100.0})
+    assert servicio.estimador().recientes[retroactivo["fecha"]] == 2100.0
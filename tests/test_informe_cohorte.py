@@ -0,0 +1,29 @@
+# test_informe_cohorte.py
+
+import warnings
+from datetime import date
+import numpy as np
+import pytest
+from controller.API.informe_cohorte import edad_vectorizada, metricas_de_consumo, tmb_vectorizado
+
+def test_edad_en_la_fecha_del_informe():
+    nacimientos = [date(1990, 6, 15), date(1990, 6, 16), date(2000, 2, 29), date(1990, 12, 31)]
+    assert edad_vectorizada(nacimientos, date(2025, 6, 15)).tolist() == [35, 34, 25, 34]
+    assert edad_vectorizada([date(2000, 2, 29)], date(2025, 2, 28)).tolist() == [24]
+
+def test_tmb_usa_la_edad_en_hasta():
+    args = (np.array([70.0]), np.array([175.0]), [date(1990, 1, 1)])
+    hace_diez = tmb_vectorizado(*args, date(2015, 6, 1), np.array([False]))
+    ahora = tmb_vectorizado(*args, date(2025, 6, 1), np.array([False]))
+    assert hace_diez[0] - ahora[0] == pytest.approx(6.76 * 10)
+
+def test_ratio_meta_nulo_sin_meta_y_sin_avisos():
+    indice = np.array([0, 0, 1])
+    totales = np.array([2000.0, 1800.0, 1500.0])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        dias, ingesta, ratio, adherencia = metricas_de_consumo(indice, totales, np.array([2000.0, 0.0, 1500.0]))
+    assert dias.tolist() == [2, 1, 0]
+    assert ratio[0] == pytest.approx(0.95)
+    assert np.isnan(ratio[1]) and np.isnan(ratio[2])
+    assert np.isnan(ingesta[2]) and np.isnan(adherencia[2])
@@ -0,0 +1,61 @@
+# test_metricas.py
+# Las peticiones quedan contadas y cronometradas en /metrics, también con
+# varios workers (PROMETHEUS_MULTIPROC_DIR).
+
+import os
+import subprocess
+import sys
+from prometheus_client import CollectorRegistry, multiprocess
+from prometheus_client.parser import text_string_to_metric_families
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _muestras(familias, nombre, **etiquetas):
+    return {
+        muestra.name: muestra.value
+        for familia in familias for muestra in familia.samples
+        if muestra.name.startswith(nombre) and all(muestra.labels.get(k) == v for k, v in etiquetas.items())
+    }
+
+def _metricas(cliente):
+    respuesta = cliente.get("/metrics")
+    assert respuesta.status_code == 200
+    return list(text_string_to_metric_families(respuesta.text))
+
+def test_peticiones_y_latencia_en_metrics(cliente, usuario):
+    _, cabeceras = usuario
+    etiquetas = {"metodo": "GET", "ruta": "/peso/", "estado": "200"}
+    antes = _muestras(_metricas(cliente), "api_peticion", **etiquetas)
+    for _ in range(3):
+        assert cliente.get("/peso/", headers=cabeceras).status_code == 200
+    assert cliente.get("/no-existe").status_code == 404
+
+    familias = _metricas(cliente)
+    ahora = _muestras(familias, "api_peticion", **etiquetas)
+    assert ahora["api_peticiones_total"] - antes.get("api_peticiones_total", 0) == 3
+    assert ahora["api_peticion_duracion_segundos_count"] - antes.get("api_peticion_duracion_segundos_count", 0) == 3
+    assert ahora["api_peticion_duracion_segundos_sum"] > antes.get("api_peticion_duracion_segundos_sum", 0)
+    # Las URL sin ruta comparten etiqueta
+    assert _muestras(familias, "api_peticiones_total", ruta="<sin_ruta>", estado="404")
+
+def test_metricas_de_un_worker_en_el_directorio_multiproceso(tmp_path):
+    # Un worker en otro proceso: sus métricas se leen agregando el directorio
+    directorio = tmp_path / "metricas"
+    directorio.mkdir()
+    entorno = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(directorio),
+               "PYTHONPATH": os.pathsep.join(filter(None, [RAIZ, os.environ.get("PYTHONPATH")]))}
+    script = (
+        "from fastapi.testclient import TestClient\n"
+        "from controller.API.gateway import app\n"
+        "with TestClient(app) as c:\n"
+        "    for _ in range(2):\n"
+        "        assert c.get('/no-existe').status_code == 404\n"
+    )
+    subprocess.run([sys.executable, "-c", script], env=entorno, check=True, timeout=60)
+
+    registro = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registro, path=str(directorio))
+    familias = list(registro.collect())
+    muestras = _muestras(familias, "api_peticion", metodo="GET", ruta="<sin_ruta>", estado="404")
+    assert muestras["api_peticiones_total"] == 2
+    assert muestras["api_peticion_duracion_segundos_count"] == 2
@@ -0,0 +1,157 @@
+# test_peso_estadisticas.py
+# Los agregados que /peso/estadisticas/ mantiene de forma incremental deben
+# coincidir siempre con un recálculo completo del historial.
+
+import os
+import random
+import sqlite3
+from datetime import date, timedelta
+import pytest
+from controller.API.database import SessionLocal
+from controller.API.peso.ApiPeso import (
+    PesoEstadisticas, _insertar_si_no_existe, _obtener_estadisticas, importar_peso_anterior,
+    migrar_peso, recalcular_estadisticas,
+)
+
+def _recalcular(cliente, usuario):
+    async def recalcular():
+        async with SessionLocal() as db:
+            return await recalcular_estadisticas(db, usuario)
+    return cliente.portal.call(recalcular)
+
+def _comprobar(cliente, usuario, cabeceras):
+    esperado = _recalcular(cliente, usuario)
+    respuesta = cliente.get("/peso/estadisticas/", headers=cabeceras)
+    if esperado["total_registros"] == 0:
+        assert respuesta.status_code == 404
+        return
+    assert respuesta.status_code == 200, respuesta.text
+    obtenido = respuesta.json()
+    assert obtenido["total_registros"] == esperado["total_registros"]
+    assert obtenido["peso_promedio"] == pytest.approx(esperado["suma"] / esperado["total_registros"])
+    assert obtenido["peso_minimo"] == esperado["peso_minimo"]
+    assert obtenido["peso_maximo"] == esperado["peso_maximo"]
+    assert obtenido["peso_inicial"] == esperado["peso_inicial"]
+    assert obtenido["peso_actual"] == esperado["peso_actual"]
+    assert obtenido["diferencia_peso"] == pytest.approx(esperado["peso_actual"] - esperado["peso_inicial"])
+    assert obtenido["peso_tendencia"] == pytest.approx(esperado["ema"], rel=1e-9)
+
+def _fecha(dia: date) -> str:
+    return dia.strftime("%d-%m-%y")
+
+def _alta(cliente, cabeceras, dia, peso):
+    respuesta = cliente.post("/peso/", headers=cabeceras, json={"fecha": _fecha(dia), "peso": peso})
+    assert respuesta.status_code == 201, respuesta.text
+    return respuesta.json()["id"]
+
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+def test_operaciones_aleatorias_coinciden_con_recalculo(cliente, usuario, semilla):
+    nombre, cabeceras = usuario
+    azar = random.Random(semilla)
+    inicio = date(2025, 1, 1)
+    ids = []
+    for _ in range(120):
+        operacion = azar.choices(["alta", "cambio", "baja"], weights=[5, 3, 2])[0] if ids else "alta"
+        # Pocas fechas distintas: hay empates de día (se ordena por id) y altas retroactivas
+        dia = inicio + timedelta(days=azar.randint(0, 40))
+        peso = round(azar.uniform(55, 95), 1)
+        if operacion == "alta":
+            ids.append(_alta(cliente, cabeceras, dia, peso))
+        elif operacion == "cambio":
+            respuesta = cliente.put(f"/peso/{azar.choice(ids)}", headers=cabeceras,
+                                    json={"fecha": _fecha(dia), "peso": peso})
+            assert respuesta.status_code == 200, respuesta.text
+        else:
+            id_ = ids.pop(azar.randrange(len(ids)))
+            assert cliente.delete(f"/peso/{id_}", headers=cabeceras).status_code == 204
+        _comprobar(cliente, nombre, cabeceras)
+
+    # Hasta vaciar el historial: los agregados vuelven al estado inicial
+    while ids:
+        assert cliente.delete(f"/peso/{ids.pop()}", headers=cabeceras).status_code == 204
+        _comprobar(cliente, nombre, cabeceras)
+
+def test_baja_y_cambio_del_ultimo_recalculan_la_ema(cliente, usuario):
+    nombre, cabeceras = usuario
+    inicio = date(2025, 3, 1)
+    ids = [_alta(cliente, cabeceras, inicio + timedelta(days=i), 80 - i * 0.5) for i in range(10)]
+    _comprobar(cliente, nombre, cabeceras)
+
+    assert cliente.delete(f"/peso/{ids.pop()}", headers=cabeceras).status_code == 204
+    _comprobar(cliente, nombre, cabeceras)
+
+    respuesta = cliente.put(f"/peso/{ids[-1]}", headers=cabeceras,
+                            json={"fecha": _fecha(inicio + timedelta(days=20)), "peso": 90})
+    assert respuesta.status_code == 200
+    _comprobar(cliente, nombre, cabeceras)
+
+    # El último pasa a ser uno anterior en el tiempo
+    respuesta = cliente.put(f"/peso/{ids[-1]}", headers=cabeceras,
+                            json={"fecha": _fecha(inicio - timedelta(days=1)), "peso": 70})
+    assert respuesta.status_code == 200
+    _comprobar(cliente, nombre, cabeceras)
+
+def test_bajas_sucesivas_del_ultimo_no_acumulan_error(cliente, usuario):
+    # Deshacer la EMA dividiendo por (1 - alfa) multiplicaba el error en cada baja
+    nombre, cabeceras = usuario
+    inicio = date(2024, 1, 1)
+    azar = random.Random(7)
+    ids = [_alta(cliente, cabeceras, inicio + timedelta(days=i), round(azar.uniform(60, 90), 1))
+           for i in range(80)]
+    while len(ids) > 1:
+        assert cliente.delete(f"/peso/{ids.pop()}", headers=cabeceras).status_code == 204
+    esperado = _recalcular(cliente, nombre)
+    obtenido = cliente.get("/peso/estadisticas/", headers=cabeceras).json()
+    assert obtenido["peso_tendencia"] == pytest.approx(esperado["ema"], rel=1e-12)
+
+def test_agregados_se_crean_una_vez_aunque_compitan_dos_altas(cliente):
+    # Dos primeras altas concurrentes: la segunda en insertar no falla y usa la fila de la primera
+    nombre = "concurrente"
+
+    async def crear():
+        async with SessionLocal() as db:
+            consulta = _insertar_si_no_existe(db.bind.dialect.name, PesoEstadisticas.__table__,
+                                              usuario=nombre, total_registros=0, suma=0.0)
+            await db.execute(consulta)
+            await db.execute(consulta)
+            stats = await _obtener_estadisticas(db, nombre)
+            await db.commit()
+            return stats.total_registros
+    assert cliente.portal.call(crear) == 0
+    assert cliente.portal.call(crear) == 0
+
+def test_migracion_reconstruye_agregados_perdidos(cliente, usuario):
+    nombre, cabeceras = usuario
+    for i in range(5):
+        _alta(cliente, cabeceras, date(2025, 5, 1) + timedelta(days=i), 70 + i)
+
+    async def borrar_agregados():
+        async with SessionLocal() as db:
+            await db.delete(await db.get(PesoEstadisticas, nombre))
+            await db.commit()
+    cliente.portal.call(borrar_agregados)
+    assert cliente.get("/peso/estadisticas/", headers=cabeceras).status_code == 404
+
+    cliente.portal.call(migrar_peso)
+    _comprobar(cliente, nombre, cabeceras)
+
+def test_importa_la_base_de_la_antigua_api_de_peso(cliente, usuario, tmp_path):
+    nombre, cabeceras = usuario
+    ruta = str(tmp_path / "peso.db")
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("CREATE TABLE peso (id INTEGER PRIMARY KEY, usuario VARCHAR, fecha VARCHAR, peso FLOAT)")
+    conexion.executemany("INSERT INTO peso (usuario, fecha, peso) VALUES (?, ?, ?)",
+                         [(nombre, "01-06-25", 81.0), (nombre, "fecha rota", 80.0), (nombre, "03-06-25", 79.5)])
+    conexion.commit()
+    conexion.close()
+
+    assert cliente.portal.call(importar_peso_anterior, ruta) == 2
+    assert not os.path.exists(ruta) and os.path.exists(ruta + ".importado")
+    # Ya renombrada: un segundo arranque no la vuelve a importar
+    assert cliente.portal.call(importar_peso_anterior, ruta) == 0
+
+    cliente.portal.call(migrar_peso)
+    respuesta = cliente.get("/peso/", headers=cabeceras)
+    assert [(r["fecha"], r["peso"]) for r in respuesta.json()] in (
+        [("01-06-25", 81.0), ("03-06-25", 79.5)], [("03-06-25", 79.5), ("01-06-25", 81.0)])
+    _comprobar(cliente, nombre, cabeceras)
@@ -3,12 +3,14 @@ import webbrowser
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QFrame, QLineEdit, QComboBox,
                              QMessageBox, QGridLayout)
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer
+from model.util.bus_eventos import BusEventos, AlimentoAgregado
 from model.util.colores import *
 from model.util.mensajes import *
 from model.agregar_alimento.alimento_factory import SqliteAlimentoFactory
 from model.agregar_alimento.alimento_factory import ApiAlimentoFactory 
 from model.agregar_alimento.repositorio_api import ApiAlimentoRepository
+from model.util.usuario_manager import UsuarioManager
 
 
 class CustomButton(QPushButton):
@@ -276,8 +278,6 @@ class Agregar_Alimento(QWidget):
     Controlador principal que coordina la vista, servicios y repositorio.
     Convertido a PyQt6 siguiendo el principio de responsabilidad única (SRP).
     """
-    catalogo_alimentos_actualizado = pyqtSignal()
-    
     def __init__(self, panel_principal, color, usuario=None):
         super().__init__(panel_principal)
         self.panel_principal = panel_principal
@@ -289,11 +289,7 @@ class Agregar_Alimento(QWidget):
 
     def _get_current_user(self):
         """Obtiene el usuario actual"""
-        try:
-            with open('usuario_actual.txt', 'r') as f:
-                return f.read().strip()
-        except:
-            return "usuario_default"
+        return UsuarioManager.obtener_usuario_actual() or "usuario_default"
     
     def _inicializar_dependencias(self):
         """Inicializa dependencias usando Factory Method puro"""
@@ -363,8 +359,8 @@ class Agregar_Alimento(QWidget):
             self._mostrar_exito("Verificación Exitosa", mensaje_exito)
             self.vista.limpiar_formulario()
             
-            # La señal sigue siendo útil por si quieres que otras partes de la UI reaccionen
-            self.catalogo_alimentos_actualizado.emit()
+            # Las secciones que muestran el catálogo lo recargan
+            BusEventos.compartido().publicar(AlimentoAgregado(origen=self))
             
         else:
             # Personalizamos el mensaje de error
@@ -418,5 +414,8 @@ class Agregar_Alimento(QWidget):
     
     def __del__(self):
         """Limpia los recursos al destruir la instancia"""
-        if hasattr(self, 'repository'):
-            self.repository.cerrar_conexion()
\ No newline at end of file
+        # Vía __dict__: si Qt ya destruyó el widget (sección liberada), hasattr
+        # sobre el envoltorio lanza RuntimeError
+        repository = self.__dict__.get('repository')
+        if repository is not None:
+            repository.cerrar_conexion()
\ No newline at end of file
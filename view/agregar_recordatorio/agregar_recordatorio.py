@@ -2,12 +2,16 @@ import sqlite3
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QLineEdit, QDateEdit, QComboBox,
                              QMessageBox, QFrame)
-from PyQt6.QtCore import Qt, QDate, pyqtSignal
+from PyQt6.QtCore import Qt, QDate, QDateTime, QTime, pyqtSignal
 from PyQt6.QtGui import QFont
+from controller.recordatorio.recordatorio_conexion import _asegurar_tabla_recordatorios
+
+# Opciones del selector de repetición: (texto, regla guardada en la tabla)
+OPCIONES_REPETICION = [("No se repite", None), ("Cada día", "diaria"), ("Cada semana", "semanal")]
 
 class Agregar_Recordatorio(QDialog):
-    # Señal para notificar cuando se agrega un recordatorio
-    recordatorio_agregado = pyqtSignal()
+    # Señal para notificar cuando se agrega un recordatorio: {'id', 'titulo', 'due_at', 'repeticion'}
+    recordatorio_agregado = pyqtSignal(dict)
     
     def __init__(self, usuario, parent=None):
         super().__init__(parent)
@@ -18,7 +22,7 @@ class Agregar_Recordatorio(QDialog):
 
     def configurar_ventana(self):
         """Configura las propiedades básicas de la ventana"""
-        self.setFixedSize(400, 350)
+        self.setFixedSize(400, 420)
         self.setWindowTitle("Agregar Recordatorio")
         self.setWindowFlags(Qt.WindowType.Dialog | Qt.WindowType.WindowStaysOnTopHint)
         self.setModal(True)
@@ -90,6 +94,15 @@ class Agregar_Recordatorio(QDialog):
         
         main_layout.addWidget(hora_frame)
 
+        # Repetición
+        self.repeticion_label = QLabel("Repetir:")
+        main_layout.addWidget(self.repeticion_label)
+
+        self.combo_repeticion = QComboBox()
+        for texto, regla in OPCIONES_REPETICION:
+            self.combo_repeticion.addItem(texto, regla)
+        main_layout.addWidget(self.combo_repeticion)
+
         # Espaciador
         main_layout.addStretch()
 
@@ -221,10 +234,12 @@ class Agregar_Recordatorio(QDialog):
             return
 
         # Obtener los datos del formulario
-        fecha = self.date_entry.date().toString("yyyy-MM-dd")
         hora = self.combo_horas.currentText()
         minutos = self.combo_minutos.currentText()
-        hora_completa = f"{hora}:{minutos}"
+        # Vencimiento en segundos desde la época, a la hora local elegida
+        vencimiento = QDateTime(self.date_entry.date(), QTime(int(hora), int(minutos)))
+        due_at = int(vencimiento.toSecsSinceEpoch())
+        repeticion = self.combo_repeticion.currentData()
 
         try:
             # Crear directorio del usuario si no existe
@@ -235,25 +250,17 @@ class Agregar_Recordatorio(QDialog):
 
             # Conectar a la base de datos
             with sqlite3.connect(f"./users/{self.usuario}/alimentos.db") as conn:
+                # Crear (o migrar) la tabla de recordatorios
+                _asegurar_tabla_recordatorios(conn)
                 cursor = conn.cursor()
                 
-                # Crear tabla de recordatorios si no existe
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS recordatorios (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        titulo TEXT NOT NULL,
-                        fecha TEXT NOT NULL,
-                        hora TEXT NOT NULL,
-                        usuario TEXT NOT NULL,
-                        creado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
                 # Insertar el recordatorio
                 cursor.execute("""
-                    INSERT INTO recordatorios (titulo, fecha, hora, usuario) 
+                    INSERT INTO recordatorios (Titulo, Usuario, due_at, repeticion) 
                     VALUES (?, ?, ?, ?)
-                """, (titulo, fecha, hora_completa, self.usuario))
+                """, (titulo, self.usuario, due_at, repeticion))
+                recordatorio = {"id": cursor.lastrowid, "titulo": titulo,
+                                "due_at": due_at, "repeticion": repeticion}
                 
                 conn.commit()
                 
@@ -262,7 +269,7 @@ class Agregar_Recordatorio(QDialog):
                                     QMessageBox.Icon.Information)
                 
                 # Emitir señal de que se agregó el recordatorio
-                self.recordatorio_agregado.emit()
+                self.recordatorio_agregado.emit(recordatorio)
                 
                 # Cerrar el diálogo
                 self.accept()
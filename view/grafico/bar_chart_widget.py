@@ -1,6 +1,7 @@
 from PyQt6.QtWidgets import QWidget, QSizePolicy
 from PyQt6.QtCore import Qt, QRect
 from PyQt6.QtGui import QPainter, QPen, QBrush, QFont, QColor, QLinearGradient
+from model.util.rendimiento import cronometrado
 
 class BarChartWidget(QWidget):
     """Widget especializado en dibujar un gráfico de barras con ejes y diseño mejorado."""
@@ -20,6 +21,7 @@ class BarChartWidget(QWidget):
         """Establece el color de las barras del gráfico."""
         self.bar_color = color
 
+    @cronometrado("BarChartWidget.paintEvent")
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
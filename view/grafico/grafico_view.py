@@ -8,6 +8,8 @@ from .bar_chart_widget import BarChartWidget
 from model.grafico.database_manager import ChartDataManager
 from model.grafico.api_grafico import APICaloriesDataManager
 from model.util.mensajes import MENSAJES
+from model.util.rendimiento import medir
+from model.util.bus_eventos import BusEventos, ConsumoNotificado, ConexionApiCambiada
 
 class GraficoView(QWidget):
     """
@@ -26,6 +28,11 @@ class GraficoView(QWidget):
 
         self.init_ui()
         self.update_chart()
+        bus = BusEventos.compartido()
+        bus.suscribir(ConsumoNotificado, lambda evento: self.aplicar_consumo(evento.consumo), propietario=self)
+        # La caché de consumos solo se mantiene al día con /events conectado
+        bus.suscribir(ConexionApiCambiada, lambda evento: self.api_data_provider.set_usar_cache(evento.conectado),
+                      propietario=self)
 
     def mostrar_mensaje_bienvenida(self):
         """Muestra el mensaje de bienvenida para este módulo, cargándolo desde MENSAJES."""
@@ -101,7 +108,7 @@ class GraficoView(QWidget):
         controls_layout.addStretch()
         layout.addLayout(controls_layout)
 
-        self.update_btn.clicked.connect(self.update_chart)
+        self.update_btn.clicked.connect(self.actualizar)
         self.data_combo.currentTextChanged.connect(self.update_chart)
         self.period_combo.currentTextChanged.connect(self.update_chart)
 
@@ -112,19 +119,31 @@ class GraficoView(QWidget):
         layout.addWidget(self.chart_group)
 
     def update_chart(self):
-        periodo = self.period_combo.currentText()
-        tipo_dato = self.data_combo.currentText()
-        self.chart_group.setTitle(tipo_dato)
-        fetch_function = self.data_fetchers.get(tipo_dato)
-        if fetch_function:
-            labels, data = fetch_function(period=periodo)
-            color = QColor("#FF9800")
-            if tipo_dato == "Consumo de Agua":
-                color = QColor("#03A9F4")
-            elif tipo_dato == "Registro de Peso":
-                color = QColor("#9C27B0")
-            self.main_chart.set_bar_color(color)
-            self.main_chart.set_data(data, labels)
+        with medir("GraficoView.update_chart"):
+            periodo = self.period_combo.currentText()
+            tipo_dato = self.data_combo.currentText()
+            self.chart_group.setTitle(tipo_dato)
+            fetch_function = self.data_fetchers.get(tipo_dato)
+            if fetch_function:
+                labels, data = fetch_function(period=periodo)
+                color = QColor("#FF9800")
+                if tipo_dato == "Consumo de Agua":
+                    color = QColor("#03A9F4")
+                elif tipo_dato == "Registro de Peso":
+                    color = QColor("#9C27B0")
+                self.main_chart.set_bar_color(color)
+                self.main_chart.set_data(data, labels)
+
+    def actualizar(self):
+        """Botón 'Actualizar': descarta los datos en caché y vuelve a pedirlos."""
+        self.api_data_provider.invalidar()
+        self.update_chart()
+
+    def aplicar_consumo(self, consumo: dict):
+        """SLOT para los consumos notificados por /events."""
+        if self.api_data_provider.aplicar_consumo(consumo) and \
+           self.data_combo.currentText() == "Consumo de Calorías":
+            self.update_chart()
 
     def mostrar_ayuda_grafico(self):
         msg = QMessageBox(self)
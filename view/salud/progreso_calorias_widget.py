@@ -4,9 +4,10 @@ from PyQt6.QtWidgets import QWidget, QVBoxLayout, QProgressBar, QLabel
 from PyQt6.QtCore import Qt
 
 class ProgresoCaloriasWidget(QWidget):
-    def __init__(self, usuario, parent=None):
+    def __init__(self, usuario, sesion=None, parent=None):
         super().__init__(parent)
         self.usuario = usuario
+        self.sesion = sesion
         self.progress_bar = None
         self.progress_label = None
         
@@ -61,10 +62,15 @@ class ProgresoCaloriasWidget(QWidget):
             result = cursor.fetchone()
             calorias_actuales = result[0] if result and result[0] is not None else 0
             
-            # Meta de calorías del usuario de la tabla `datos`
-            cursor.execute("SELECT meta_cal FROM datos WHERE nombre = ?", (self.usuario,))
-            result = cursor.fetchone()
-            meta_calorias = result[0] if result and result[0] is not None else 2000 # Valor por defecto
+            # Meta de calorías del usuario de la tabla `datos` (la de la sesión ya está en memoria)
+            if self.sesion is not None:
+                meta_calorias = self.sesion.datos().get("meta_cal")
+            else:
+                cursor.execute("SELECT meta_cal FROM datos WHERE nombre = ?", (self.usuario,))
+                result = cursor.fetchone()
+                meta_calorias = result[0] if result else None
+            if meta_calorias is None:
+                meta_calorias = 2000 # Valor por defecto
 
             conn.close()
             return calorias_actuales, meta_calorias
@@ -1,12 +1,14 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QPushButton, QFrame, QMessageBox, QGridLayout)
+                             QPushButton, QFrame, QMessageBox, QGridLayout, QInputDialog)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from view.agregar_recordatorio.agregar_recordatorio import Agregar_Recordatorio
 from model.salud.update_peso import Peso
 from controller.pulsaciones.pulsaciones import Pulsaciones
 from model.salud.calculos import Calculo
-from model.salud.GerminiChatWindow import GeminiChatWindow
-from model.util.usuario_manager import UsuarioManager, BaseWidget
+from model.salud.metricas_salud import ServicioMetricasSalud
+from model.salud.gasto_energetico import ServicioGastoEnergetico, GASTO_DIAS_MINIMOS
+from model.util.usuario_manager import BaseWidget
+from model.util.bus_eventos import BusEventos, DatosUsuarioActualizados, GastoEstimadoCambiado
 from model.salud.AguaManager import AguaManager
 from model.util.colores import *
 from model.util.mensajes import *
@@ -69,19 +71,13 @@ class MetricFrame(QFrame):
 
 class Salud(QWidget, BaseWidget):
 
-    datos_usuario_actualizados = pyqtSignal()
+    recordatorio_agregado = pyqtSignal(dict)
 
-    def __init__(self, parent=None, usuario=None): 
+    def __init__(self, parent=None, usuario=None, sesion=None): 
         QWidget.__init__(self, parent)  # Llama al constructor explícito de QWidget
-        BaseWidget.__init__(self, parent=parent, usuario=usuario)  # Y luego el de BaseWidget
-
-        if not usuario:
-            usuario = UsuarioManager.obtener_usuario_actual()
-
-        if not usuario:
-            self.setup_error_ui("No se ha proporcionado un usuario válido.")
-            return
-        self.usuario = usuario
+        BaseWidget.__init__(self, parent=parent, usuario=usuario, sesion=sesion)  # Y luego el de BaseWidget
+        self.metricas = ServicioMetricasSalud.compartido(self.usuario)
+        self.gasto = ServicioGastoEnergetico.compartido(self.usuario)
         self.sub = self  # Para mantener compatibilidad con el código original
         self.alerts_shown = False
         
@@ -94,13 +90,17 @@ class Salud(QWidget, BaseWidget):
         self.obtener_datos_usuario_bd()        
         # AGREGAR ESTAS LÍNEAS PARA INICIALIZAR EL AGUA MANAGER
         self.init_agua_manager()
+        # Cambios hechos desde otra sección o notificados por la API
+        bus = BusEventos.compartido()
+        for tipo in (DatosUsuarioActualizados, GastoEstimadoCambiado):
+            bus.suscribir(tipo, lambda _evento: self.refrescar_vista(), coalescer=True, propietario=self)
 
     def init_agua_manager(self):
         """Inicializa el gestor de agua"""
         try:
             self.agua_manager = AguaManager(self.usuario)
             # Calcular agua recomendada basada en el peso del usuario
-            vasos_recomendados = Calculo.calcular_agua_recomendada(self.usuario)
+            vasos_recomendados = self.metricas.metricas()["vasos_agua"]
             print(f"Vasos de agua recomendados para {self.usuario}: {vasos_recomendados}")
             # Conectar la señal para actualizar estadísticas cuando cambie el consumo de agua
             self.agua_manager.agua_actualizada.connect(self.on_agua_actualizada)
@@ -186,6 +186,10 @@ class Salud(QWidget, BaseWidget):
             self.frame_tmb = MetricFrame("TMB")
             self.frame_tmb.info_button.clicked.connect(self.mostrar_info_tmb)
             right_layout.addWidget(self.frame_tmb)
+
+            self.frame_gasto = MetricFrame("Gasto diario")
+            self.frame_gasto.info_button.clicked.connect(self.mostrar_info_gasto)
+            right_layout.addWidget(self.frame_gasto)
                     
             # --- Reemplazo para el código anterior en salud.py ---
             # Frame de progreso
@@ -197,7 +201,7 @@ class Salud(QWidget, BaseWidget):
 
             # ¡AQUÍ LA INTEGRACIÓN!
             # Creamos nuestro nuevo widget de progreso y lo añadimos al frame.
-            self.progreso_calorias_widget = ProgresoCaloriasWidget(self.usuario)
+            self.progreso_calorias_widget = ProgresoCaloriasWidget(self.usuario, self.sesion)
             container_layout = QVBoxLayout(self.frame_graficos)
             container_layout.setContentsMargins(0, 0, 0, 0)
             container_layout.addWidget(self.progreso_calorias_widget)
@@ -288,10 +292,7 @@ class Salud(QWidget, BaseWidget):
 
     def actualizar_datos_usuario(self):
         """Obtiene los datos básicos del usuario de la base de datos"""
-        try:
-            self.genero = Calculo.get_user_gender(self.usuario)
-        except:
-            self.genero = "masculino"  # valor por defecto
+        self.genero = self.metricas.metricas()["genero"] or "masculino"  # valor por defecto
 
     def obtener_datos_usuario_bd(self):
         """Obtiene los datos del usuario desde la base de datos"""
@@ -414,6 +415,10 @@ class Salud(QWidget, BaseWidget):
     def abrir_asistente_ia(self):
         """Abre la ventana del chat con el asistente de IA"""
         try:
+            # google.genai tarda casi un segundo en importarse: se carga al
+            # abrir el asistente, no al arrancar la aplicación
+            from model.salud.GerminiChatWindow import GeminiChatWindow
+
             # Creamos la ventana del chat como un atributo de la clase
             # para que no se cierre inmediatamente (persistencia).
             self.chat_window = GeminiChatWindow(usuario=self.usuario)
@@ -434,11 +439,13 @@ class Salud(QWidget, BaseWidget):
             # Crear y mostrar la ventana de actualización de peso
             peso_dialog = Peso(parent=self, usuario=self.usuario, callback=update_and_refresh)
             
-            # Código corregido en actualizar_peso()
+            # Primero: las métricas deben recalcularse con el peso nuevo
+            peso_dialog.peso_actualizado.connect(self.metricas.invalidar)
+            peso_dialog.peso_actualizado.connect(self.gasto.invalidar)
             peso_dialog.peso_actualizado.connect(lambda: [
                 self.update_health_metrics(show_alerts=True),
                 self.progreso_calorias_widget.refresh() if hasattr(self, 'progreso_calorias_widget') else None,
-                self.datos_usuario_actualizados.emit()
+                BusEventos.compartido().publicar(DatosUsuarioActualizados(origen=self))
             ])        
             # Ejecutar el diálogo
             result = peso_dialog.exec()
@@ -463,10 +470,8 @@ class Salud(QWidget, BaseWidget):
         try:
             self.recordatorio_dialog = Agregar_Recordatorio(usuario=self.usuario, parent=self)
             
-            # Conectar señal opcional para actualizar datos después de agregar recordatorio
-            self.recordatorio_dialog.recordatorio_agregado.connect(
-                lambda: print(f"Nuevo recordatorio agregado para {self.usuario}")
-            )
+            # La ventana principal lo pasa al planificador de recordatorios
+            self.recordatorio_dialog.recordatorio_agregado.connect(self.recordatorio_agregado)
             
             # Mostrar el diálogo
             result = self.recordatorio_dialog.exec()
@@ -477,11 +482,20 @@ class Salud(QWidget, BaseWidget):
         except Exception as e:
             self.mostrar_error(f"Error al abrir ventana de recordatorios: {str(e)}")
 
+    def refrescar_vista(self):
+        """Slot público: vuelve a mostrar las métricas (recalculadas si cambiaron peso o datos)."""
+        self.actualizar_datos_usuario()
+        self.update_health_metrics(show_alerts=False)
+        if getattr(self, "agua_manager", None) is not None:
+            self.agua_manager.actualizar_vasos_recomendados()
+            self.agua_manager.actualizar_info_vasos()
+
     def update_health_metrics(self, show_alerts=True):
         """Actualiza las métricas de salud (IMC y TMB)"""
         try:
-            imc = self.calcular_imc()
-            tmb = self.calcular_TMB()
+            metricas = self.metricas.metricas()
+            imc = metricas["imc"]
+            tmb = metricas["tmb"]
 
             # Actualizar IMC
             if imc is not None:
@@ -526,10 +540,72 @@ class Salud(QWidget, BaseWidget):
             else:
                 self.frame_tmb.result_label.setText("Sin datos")
                 self.frame_tmb.message_label.setText("Actualiza tus datos personales")
+
+            self.actualizar_gasto()
                 
         except Exception as e:
             print(f"Error al actualizar métricas de salud: {e}")
 
+    def actualizar_gasto(self):
+        """Muestra el gasto diario estimado y cuándo se llegaría al peso objetivo."""
+        estimacion = self.gasto.estimacion()
+        if estimacion["gasto"] is None:
+            self.frame_gasto.result_label.setText("Sin datos")
+            self.frame_gasto.message_label.setText("Registra tu peso y tus comidas")
+            return
+        self.frame_gasto.result_label.setText(f"{int(estimacion['gasto'])} kcal")
+        origen = "Según tus registros" if estimacion["origen"] == "adaptativo" else "Estimado por fórmula"
+        if estimacion["peso_objetivo"] is not None and estimacion["fecha_objetivo_meta"] is not None:
+            origen += (f" · {estimacion['peso_objetivo']:.1f} kg el "
+                       f"{estimacion['fecha_objetivo_meta'].strftime('%d/%m/%Y')}")
+        self.frame_gasto.message_label.setText(origen)
+
+    def mostrar_info_gasto(self):
+        """Explica el gasto estimado y las fechas previstas, y permite cambiar el peso objetivo"""
+        estimacion = self.gasto.estimacion()
+        if estimacion["gasto"] is None:
+            self.mostrar_error("No se pudo estimar el gasto. Registra tu peso y completa tus datos personales.")
+            return
+
+        if estimacion["origen"] == "adaptativo":
+            texto = (f"Tu gasto diario estimado es de {int(estimacion['gasto'])} kcal, calculado con "
+                     f"{estimacion['dias']} días de comidas registradas y la evolución de tu peso "
+                     f"({estimacion['kg_semana']:+.2f} kg por semana).")
+        else:
+            texto = (f"Tu gasto diario estimado es de {int(estimacion['gasto'])} kcal (TMB por tu nivel de "
+                     f"actividad). Con al menos {GASTO_DIAS_MINIMOS} días de comidas registradas y dos pesos "
+                     "se calculará a partir de tus propios datos.")
+
+        objetivo = estimacion["peso_objetivo"]
+        if objetivo is None:
+            texto += "\n\nTu peso está en el rango saludable. Puedes fijar un peso objetivo."
+        else:
+            texto += f"\n\nPeso objetivo: {objetivo:.1f} kg."
+            if estimacion["meta_cal"]:
+                fecha = estimacion["fecha_objetivo_meta"]
+                texto += (f"\nComiendo tu meta de {estimacion['meta_cal']} kcal: "
+                          + (f"hacia el {fecha.strftime('%d/%m/%Y')}." if fecha else "no lo alcanzarías."))
+            fecha = estimacion["fecha_objetivo_tendencia"]
+            if fecha is not None:
+                texto += f"\nAl ritmo de las últimas semanas: hacia el {fecha.strftime('%d/%m/%Y')}."
+
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle("Gasto diario")
+        msg_box.setText(texto)
+        msg_box.setIcon(QMessageBox.Icon.Information)
+        boton_objetivo = msg_box.addButton("Cambiar peso objetivo", QMessageBox.ButtonRole.ActionRole)
+        msg_box.addButton(QMessageBox.StandardButton.Ok)
+        msg_box.exec()
+        if msg_box.clickedButton() is boton_objetivo:
+            self.cambiar_peso_objetivo(objetivo or estimacion["tendencia"] or 70.0)
+
+    def cambiar_peso_objetivo(self, actual):
+        peso, ok = QInputDialog.getDouble(self, "Peso objetivo", "Peso al que quieres llegar (kg):",
+                                          actual, 30.0, 300.0, 1)
+        if ok:
+            self.gasto.establecer_peso_objetivo(peso)
+            self.actualizar_gasto()
+
     def mostrar_alerta_imc(self, imc, categoria):
         """Muestra alerta para IMC de riesgo"""
         msg_box = QMessageBox(self)
@@ -550,12 +626,12 @@ class Salud(QWidget, BaseWidget):
         msg_box.exec()
 
     def calcular_imc(self):
-        """Calcula el IMC del usuario usando datos reales de la base de datos"""
-        return Calculo.calcular_imc(self.usuario)
+        """IMC del usuario con su último peso"""
+        return self.metricas.metricas()["imc"]
 
     def calcular_TMB(self):
-        """Calcula la TMB del usuario usando datos reales de la base de datos"""
-        return Calculo.calcular_TMB(self.usuario)
+        """TMB del usuario con su último peso"""
+        return self.metricas.metricas()["tmb"]
 
 
     def evaluar_imc_simple(self, imc):
@@ -120,6 +120,7 @@ class Sidebar(QWidget):
     def __init__(self):
         super().__init__()
         self.usuario = None
+        self.sesion = None
         self.init_ui()
 
     def init_ui(self):
@@ -160,14 +161,18 @@ class Sidebar(QWidget):
             layout.addWidget(btn)
             layout.addSpacing(5)
 
-    def set_usuario(self, usuario: str):
+    def set_usuario(self, usuario: str, sesion=None):
         self.usuario = usuario
+        self.sesion = sesion
         self.profile_widget.username_label.setText(self.usuario)
         self._load_profile_pic_from_db()
 
     def _load_profile_pic_from_db(self):
         if not self.usuario:
             return
+        if self.sesion is not None:
+            self.profile_widget.set_picture(self.sesion.datos().get("profile_pic_path") or None)
+            return
         try:
             conn = sqlite3.connect(f"./users/{self.usuario}/alimentos.db")
             cursor = conn.cursor()
@@ -192,6 +197,8 @@ class Sidebar(QWidget):
             cursor.execute("UPDATE datos SET profile_pic_path = ? WHERE nombre = ?", (path, self.usuario))
             conn.commit()
             conn.close()
+            if self.sesion is not None:
+                self.sesion.invalidar_datos()
             print(f"Ruta de imagen guardada para {self.usuario}: {path}")
         except Exception as e:
             QMessageBox.critical(self, "Error de Guardado", "No se pudo guardar la ruta de la imagen en la base de datos.")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Overlay de desarrollo con los tiempos de la GUI (p50/p95 por operación).
+Se muestra y oculta con Ctrl+Shift+P desde la ventana principal.
+"""
+
+from PyQt6.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QLabel,
+                             QPushButton, QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont
+from model.util import rendimiento
+
+class OverlayRendimiento(QFrame):
+    COLUMNAS = ["Operación", "n", "p50 ms", "p95 ms", "máx ms"]
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setStyleSheet("""
+            QFrame { background-color: rgba(20, 20, 20, 220); border: 1px solid #00bcd4; border-radius: 6px; }
+            QLabel { color: #00bcd4; background: transparent; border: none; }
+            QTableWidget { background: transparent; color: #eeeeee; border: none; gridline-color: #444444; }
+            QHeaderView::section { background-color: #2b2b2b; color: #cccccc; border: none; }
+            QPushButton { background-color: #3c3c3c; color: white; border: 1px solid #555555; padding: 3px 8px; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+
+        self.titulo = QLabel("Rendimiento (Ctrl+Shift+P)")
+        self.titulo.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        layout.addWidget(self.titulo)
+
+        self.tabla = QTableWidget(0, len(self.COLUMNAS))
+        self.tabla.setHorizontalHeaderLabels(self.COLUMNAS)
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.setFont(QFont("Consolas", 9))
+        self.tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.tabla.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.tabla)
+
+        botones = QHBoxLayout()
+        self.btn_exportar = QPushButton("Exportar JSON")
+        self.btn_exportar.clicked.connect(self.exportar)
+        self.btn_limpiar = QPushButton("Limpiar")
+        self.btn_limpiar.clicked.connect(self.limpiar)
+        self.estado = QLabel("")
+        botones.addWidget(self.btn_exportar)
+        botones.addWidget(self.btn_limpiar)
+        botones.addWidget(self.estado, 1)
+        layout.addLayout(botones)
+
+        # Solo se refresca mientras está visible
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refrescar)
+
+        self.resize(460, 260)
+        self.hide()
+
+    def alternar(self):
+        if self.isVisible():
+            self.timer.stop()
+            self.hide()
+            return
+        self.colocar()
+        self.refrescar()
+        self.show()
+        self.raise_()
+        self.timer.start(1000)
+
+    def colocar(self):
+        """Esquina inferior derecha de la ventana."""
+        padre = self.parentWidget()
+        if padre is not None:
+            self.move(max(0, padre.width() - self.width() - 16), max(0, padre.height() - self.height() - 16))
+
+    def refrescar(self):
+        datos = rendimiento.estadisticas()
+        self.tabla.setRowCount(len(datos))
+        for fila, (operacion, valores) in enumerate(datos.items()):
+            celdas = [operacion, str(valores["n"]), f"{valores['p50_ms']:.1f}",
+                      f"{valores['p95_ms']:.1f}", f"{valores['max_ms']:.1f}"]
+            for columna, texto in enumerate(celdas):
+                item = QTableWidgetItem(texto)
+                if columna > 0:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.tabla.setItem(fila, columna, item)
+
+    def exportar(self):
+        try:
+            ruta = rendimiento.exportar_json(incluir_mediciones=True)
+            self.estado.setText(f"Guardado en {ruta}")
+        except OSError as e:
+            self.estado.setText(f"Error al exportar: {e}")
+
+    def limpiar(self):
+        rendimiento.limpiar()
+        self.estado.setText("")
+        self.refrescar()
@@ -3,16 +3,18 @@
 """
 Ventana principal del Contador de Calorías con Login integrado
 """
-import sqlite3
+import os
+import time
 from datetime import datetime
-from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QLabel, QFrame, QStackedWidget)
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                             QLabel, QFrame, QStackedWidget, QMessageBox)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
-from PyQt6.QtGui import QFont
+from PyQt6.QtGui import QFont, QKeySequence, QShortcut
 from model.grafico.database_manager import ChartDataManager
 from view.grafico.grafico_view import GraficoView
 from ..sidebar import Sidebar
 from .welcome_screen import WelcomeScreen
+from .overlay_rendimiento import OverlayRendimiento
 from ..menu import Menu
 from view.salud.salud import Salud
 from controller.configuracion.configuracion import ConfigUI
@@ -21,10 +23,45 @@ from view.login.iniciar_sesion_form import IniciarSesionForm
 from view.login.registro_form import RegistroForm
 from model.login.auth_service import AuthService
 from model.login.user_database import UserDatabase
-from model.util.base import DBManager
+from model.util.sesion import iniciar_sesion, cerrar_sesion
+from model.util.preferencias import PREFIJO_BIENVENIDA
+from model.salud.metricas_salud import ServicioMetricasSalud
+from model.salud.gasto_energetico import ServicioGastoEnergetico
+from model.util.eventos_api import ClienteEventos
+from model.util.bus_eventos import (BusEventos, PRIORIDAD_ALTA, CatalogoCambiado, ConsumoNotificado,
+                                    ConexionApiCambiada, DatosUsuarioActualizados, GastoEstimadoCambiado,
+                                    RecordatorioPesoPendiente)
+from model.util.api_http import API_URL
+from model.util import precarga
+from model.util.precarga import CalentadorCaches
+from model.registrar_alimento.api_repositorio import pedir_resumen_diario
+from model.registrar_alimento.catalogo_cache import CatalogoAlimentosCache
+from model.util.rendimiento import cronometrado, medir, registrar
 from view.agregar_alimento.agregar_alimento import Agregar_Alimento
 from controller.registrar_alimento.registrar_alimento import RegistroAlimentoPyQt6
-from controller.historial.historial import Historial
+from controller.historial.historial import Historial, rango_por_defecto
+from controller.historial.historialfacade import HistorialFacade
+from controller.recordatorio.recordatorio_core import PlanificadorRecordatorios, Recordatorio
+
+# Secciones creadas a la vez como máximo (sin contar la de bienvenida): al
+# crear una más se destruye la que lleva más tiempo sin usarse
+SECCIONES_MAXIMAS = int(os.environ.get('SECCIONES_MAXIMAS') or 4)
+# Minutos sin usarse tras los que se destruye una sección (0 = nunca)
+SECCIONES_CADUCIDAD_MIN = float(os.environ.get('SECCIONES_CADUCIDAD_MIN') or 15)
+# Secciones que se crean tras el login mientras la interfaz está ociosa, en
+# este orden (p. ej. "registrar,historial"); por defecto ninguna
+SECCIONES_PRECALENTAR = [s.strip() for s in (os.environ.get('SECCIONES_PRECALENTAR') or '').split(',') if s.strip()]
+
+# Mensaje de bienvenida de cada sección: (método del widget, clave en las
+# preferencias del usuario, tras PREFIJO_BIENVENIDA)
+MENSAJES_BIENVENIDA = {
+    "salud": ("mostrar_mensaje_bienvenida", "salud"),
+    "historial": ("show_welcome_message", "historial"),
+    "registrar": ("mostrar_mensaje_bienvenida", "registrar_alimento"),
+    "settings": ("mostrar_mensaje_inicial", "configuracion"),
+    "agregar": ("_mostrar_mensaje_bienvenida", "agregar_alimento"),
+    "grafico": ("mostrar_mensaje_bienvenida", "graficos"),
+}
 
 class LoginScreen(QWidget):
     """
@@ -115,10 +152,41 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.current_user = None
+        self.sesion = None
         self.is_logged_in = False
-        self.welcome_message_flags = {} # Caché en memoria para evitar lecturas repetidas de la BD
+        self.eventos_api = None
+        self.calentador = None
+        self.planificador_recordatorios = None
+        # Secciones ya creadas ({nombre: widget}) y último uso de cada una
+        self.secciones = {}
+        self.ultimo_uso = {}
+        self.pendientes_precalentar = []
+        self.fabricas_secciones = {
+            "registrar": lambda: RegistroAlimentoPyQt6(usuario=self.current_user),
+            "agregar": lambda: Agregar_Alimento(
+                panel_principal=self.stacked_widget, color="#3c3c3c", usuario=self.current_user),
+            "grafico": self._crear_graficos,
+            "historial": lambda: Historial(
+                panel_principal=self.stacked_widget, color="#3c3c3c", usuario=self.current_user),
+            "settings": lambda: ConfigUI(self, "#3c3c3c", self.current_user, sesion=self.sesion),
+            "salud": lambda: Salud(sesion=self.sesion),
+            "menu": Menu,
+        }
         self.main_stack = QStackedWidget()
         self.setCentralWidget(self.main_stack)
+
+        # Las secciones se suscriben a los eventos que les interesan; aquí solo
+        # se invalidan las cachés de la sesión, antes de que ninguna las relea
+        bus = BusEventos.compartido()
+        bus.suscribir(DatosUsuarioActualizados, self._datos_usuario_actualizados,
+                      prioridad=PRIORIDAD_ALTA, propietario=self)
+        bus.suscribir(ConsumoNotificado, self._consumo_notificado, prioridad=PRIORIDAD_ALTA, propietario=self)
+        bus.suscribir(RecordatorioPesoPendiente, self._recordatorio_peso, propietario=self)
+
+        # Revisión periódica de las secciones que llevan tiempo sin usarse
+        self.timer_secciones = QTimer(self)
+        self.timer_secciones.timeout.connect(self.liberar_secciones_inactivas)
+        self.timer_secciones.start(60000)
         
         # Inicializar interfaces    
         self.init_login()
@@ -127,59 +195,19 @@ class MainWindow(QMainWindow):
         # Mostrar login inicialmente
         self.show_login()
 
-    def check_message_status(self, section_name):
-        """Verifica en la BD del USUARIO si el mensaje para una sección ya se mostró."""
-        conn = None
-        if not self.current_user:
-            return 0 # Si no hay un usuario logueado, no se puede verificar.
-
-        try:
-            # --- CAMBIO CLAVE ---
-            # Conectamos a la base de datos del usuario actual, no a la principal.
-            # Es posible que tu método se llame diferente (ej: conectar_bd_usuario).
-            # Asegúrate de que el nombre del método sea el correcto.
-            conn = DBManager.conectar_usuario(self.current_user) 
-            
-            query = f"SELECT {section_name} FROM mensajes LIMIT 1"
-            resultado = DBManager.ejecutar_query(conn, query)
-            
-            if resultado and resultado[0] is not None:
-                return resultado[0]
-            return 0
-        except sqlite3.Error as e:
-            # Este error puede ocurrir si la tabla 'mensajes' aún no existe para un usuario.
-            print(f"NOTA: No se pudo verificar el estado del mensaje para '{section_name}'. Error: {e}")
-            return 0 # Fallamos de forma segura, asumiendo que el mensaje no se ha mostrado.
-        finally:
-            if conn:
-                DBManager.cerrar_conexion(conn)
-
-    def update_message_status(self, section_name):
-        """Actualiza en la BD del USUARIO el estado de un mensaje a 'mostrado' (1)."""
-        conn = None
-        if not self.current_user:
-            return # Si no hay un usuario logueado, no se puede actualizar.
-
-        try:
-            # --- CAMBIO CLAVE ---
-            # De nuevo, nos aseguramos de conectar a la base de datos del usuario.
-            conn = DBManager.conectar_usuario(self.current_user) 
-            
-            query = f"UPDATE mensajes SET {section_name} = 1"
-            DBManager.ejecutar_query(conn, query, commit=True)
-        except sqlite3.Error as e:
-            print(f"Error al actualizar estado del mensaje para '{section_name}': {e}")
-        finally:
-            if conn:
-                DBManager.cerrar_conexion(conn)
-                
+        # Overlay de desarrollo con los tiempos de la GUI
+        self.overlay_rendimiento = OverlayRendimiento(self)
+        self.atajo_rendimiento = QShortcut(QKeySequence("Ctrl+Shift+P"), self)
+        self.atajo_rendimiento.activated.connect(self.overlay_rendimiento.alternar)
 
+    @cronometrado("MainWindow.init_login")
     def init_login(self):
         """Inicializar la pantalla de login"""
         self.login_screen = LoginScreen(self)
         self.login_screen.login_successful.connect(self.on_login_success)
         self.main_stack.addWidget(self.login_screen)
         
+    @cronometrado("MainWindow.init_main_ui")
     def init_main_ui(self):
         """Inicializar la interfaz principal (después del login)"""
         # Crear el widget principal
@@ -207,6 +235,7 @@ class MainWindow(QMainWindow):
         self.sidebar = None
         self.content_area = None
         
+    @cronometrado("MainWindow.setup_main_interface")
     def setup_main_interface(self):
         """Configurar la interfaz principal después del login exitoso"""
         # Limpiar el layout existente
@@ -251,93 +280,193 @@ class MainWindow(QMainWindow):
         self.stacked_widget = QStackedWidget()
         self.stacked_widget.setStyleSheet("background-color: #3c3c3c;")
         
-        # Crear todas las pantallas
+        # Las demás secciones se crean la primera vez que se abren (obtener_seccion)
         self.welcome_screen = WelcomeScreen()
-        self.registrar_alimento = RegistroAlimentoPyQt6(usuario=self.current_user)
-        
-        self.agregar_alimento = Agregar_Alimento(
-            panel_principal=self.stacked_widget,
-            color="#3c3c3c",
-            usuario=self.current_user
-        )
-        
-        # --- INICIO DEL CAMBIO IMPORTANTE ---
-        # 1. Creamos una única instancia del gestor de datos
-        self.data_manager = ChartDataManager(username=self.current_user)
-        self.graficos_view = GraficoView(data_provider=self.data_manager, usuario=self.current_user)
-
-        # --- FIN DEL CAMBIO IMPORTANTE ---
-
-        self.historial = Historial(
-            panel_principal=self.stacked_widget,
-            color="#3c3c3c", 
-            usuario=self.current_user
-        )
-        self.settings = ConfigUI(self, "#3c3c3c", self.current_user)
-        
-        self.salud = Salud()
-        self.menu = Menu()
-        
-        # Agregar al stack
         self.stacked_widget.addWidget(self.welcome_screen)
-        self.stacked_widget.addWidget(self.registrar_alimento)
-        self.stacked_widget.addWidget(self.agregar_alimento)
-        # self.grafico = Grafico() <-- Se elimina esta línea
-        self.stacked_widget.addWidget(self.graficos_view) # <-- Se añade la nueva vista
-        self.stacked_widget.addWidget(self.historial)
-        self.stacked_widget.addWidget(self.settings)
-        self.stacked_widget.addWidget(self.salud)
-        self.stacked_widget.addWidget(self.menu)
-        
+        self.secciones = {"welcome": self.welcome_screen}
+        self.ultimo_uso = {}
+
         layout.addWidget(self.stacked_widget)
         self.conectar_modulos()
 
         return content_frame
-    
-    def conectar_modulos(self):
-        """Conecta las señales de los diferentes módulos a los slots de otros."""
-        print("Realizando conexiones entre módulos...")
 
-        if hasattr(self.agregar_alimento, 'catalogo_alimentos_actualizado') and \
-           hasattr(self.registrar_alimento, 'refrescar_lista_alimentos'):
-            
-            self.agregar_alimento.catalogo_alimentos_actualizado.connect(
-                self.registrar_alimento.refrescar_lista_alimentos
-            )
-            print("CONEXIÓN CREADA: Agregar Alimento -> Registrar Alimento (ComboBox)")
-
-        # --- OTRAS CONEXIONES ÚTILES QUE PREPARAMOS ---
-        # Cuando se registra un consumo diario...
-        if hasattr(self.registrar_alimento, 'consumo_diario_actualizado'):
-            # ... se refresca la vista del Historial.
-            if hasattr(self.historial, 'refrescar_vista'):
-                self.registrar_alimento.consumo_diario_actualizado.connect(
-                    self.historial.refrescar_vista
-                )
-                print("CONEXIÓN CREADA: Registrar Alimento -> Historial")
-            
-            # ... y también se refresca la vista de Salud (para el progreso de calorías).
-            if hasattr(self.salud, 'refrescar_vista'):
-                self.registrar_alimento.consumo_diario_actualizado.connect(
-                    self.salud.refrescar_vista
-                )
-                print("CONEXIÓN CREADA: Registrar Alimento -> Salud")
-
-        # 4. Cuando Configuración actualiza los datos del usuario...
-        # ... se refresca la vista de Salud.
-        if hasattr(self.settings, 'datos_usuario_actualizados') and hasattr(self.salud, 'refrescar_vista'):
-            self.settings.datos_usuario_actualizados.connect(
-                self.salud.refrescar_vista
-            )
-            print("CONEXIÓN CREADA: Configuración -> Salud")
-
-        # 5. Y cuando Salud actualiza datos (ej: el peso)...
-        # ... se refresca la vista de Configuración.
-        if hasattr(self.salud, 'datos_usuario_actualizados') and hasattr(self.settings, 'refrescar_vista'):
-            self.salud.datos_usuario_actualizados.connect(
-                self.settings.refrescar_vista
-            )
-            print("CONEXIÓN CREADA: Salud -> Configuración")
+    def _crear_graficos(self):
+        graficos_view = GraficoView(data_provider=ChartDataManager(username=self.current_user),
+                                    usuario=self.current_user)
+        # La caché de consumos solo se mantiene al día con /events conectado
+        graficos_view.api_data_provider.set_usar_cache(
+            self.eventos_api is not None and self.eventos_api.conectado)
+        return graficos_view
+
+    def obtener_seccion(self, nombre):
+        """Devuelve el widget de la sección, creándolo la primera vez que se pide."""
+        widget = self.secciones.get(nombre)
+        if widget is None:
+            with medir(f"MainWindow.crear_seccion.{nombre}"):
+                widget = self.fabricas_secciones[nombre]()
+            self.stacked_widget.addWidget(widget)
+            self.secciones[nombre] = widget
+            if hasattr(widget, "recordatorio_agregado"):
+                widget.recordatorio_agregado.connect(self._agregar_recordatorio)
+            self.ultimo_uso[nombre] = time.monotonic()
+            self._respetar_limite_secciones(nombre)
+        return widget
+
+    def _puede_liberarse(self, nombre):
+        if nombre == "welcome" or nombre not in self.secciones:
+            return False
+        if self.secciones[nombre] is self.stacked_widget.currentWidget():
+            return False
+        # Con un diálogo o ventana abiertos (asistente, recordatorio, ...) se
+        # espera: pueden pertenecer a la sección
+        return not any(ventana.isVisible() for ventana in QApplication.topLevelWidgets() if ventana is not self)
+
+    def liberar_seccion(self, nombre):
+        """Destruye la sección; se volverá a crear, con datos frescos, al abrirla."""
+        if not self._puede_liberarse(nombre):
+            return False
+        widget = self.secciones.pop(nombre)
+        self.ultimo_uso.pop(nombre, None)
+        self.stacked_widget.removeWidget(widget)
+        widget.deleteLater()
+        return True
+
+    def _respetar_limite_secciones(self, creada):
+        """Al superar SECCIONES_MAXIMAS, libera las secciones usadas hace más tiempo."""
+        candidatas = sorted((n for n in self.ultimo_uso if n != creada), key=self.ultimo_uso.get)
+        for nombre in candidatas:
+            if len(self.secciones) - 1 <= SECCIONES_MAXIMAS:
+                break
+            self.liberar_seccion(nombre)
+
+    def liberar_secciones_inactivas(self):
+        if SECCIONES_CADUCIDAD_MIN <= 0:
+            return
+        limite = time.monotonic() - SECCIONES_CADUCIDAD_MIN * 60
+        for nombre, uso in list(self.ultimo_uso.items()):
+            if uso < limite:
+                self.liberar_seccion(nombre)
+
+    def _precalentar_siguiente(self):
+        """Crea una sección pendiente de SECCIONES_PRECALENTAR y programa la siguiente."""
+        if not self.is_logged_in or not self.pendientes_precalentar:
+            return
+        nombre = self.pendientes_precalentar.pop(0)
+        if nombre in self.fabricas_secciones and nombre not in self.secciones \
+                and len(self.secciones) - 1 < SECCIONES_MAXIMAS:
+            self.obtener_seccion(nombre)
+        # Una por vuelta, para no bloquear la interfaz si el usuario empieza a usarla
+        QTimer.singleShot(200, self._precalentar_siguiente)
+
+    def conectar_modulos(self):
+        """Conecta las notificaciones de la API con las secciones que las usan."""
+        # Cambios notificados por la API (/events), propios o de otros equipos:
+        # se aplican a las copias locales de las secciones creadas en lugar de
+        # recargar cada vista. Las que aún no existen cargarán datos frescos.
+        self.detener_eventos_api()
+        # Con el token llegan también los eventos del usuario (sus consumos y pesos),
+        # no solo los de difusión
+        self.eventos_api = ClienteEventos(API_URL, self.sesion.token, parent=self)
+        # Las señales llegan ya en el hilo de la interfaz, donde vive el bus
+        bus = BusEventos.compartido()
+        self.eventos_api.consumo_registrado.connect(lambda consumo: bus.publicar(ConsumoNotificado(consumo)))
+        self.eventos_api.catalogo_cambiado.connect(lambda datos: bus.publicar(CatalogoCambiado(datos)))
+        self.eventos_api.conexion_cambiada.connect(lambda activo: bus.publicar(ConexionApiCambiada(activo)))
+        self.eventos_api.iniciar()
+        print("CONEXIÓN CREADA: API (/events) -> bus de eventos")
+
+    def _datos_usuario_actualizados(self, _evento):
+        """Las secciones que refrescan deben leer la fila nueva del usuario."""
+        if not self.is_logged_in:
+            return
+        self.sesion.invalidar_datos()
+        ServicioMetricasSalud.compartido(self.current_user).invalidar()
+        ServicioGastoEnergetico.compartido(self.current_user).invalidar()
+
+    def _consumo_notificado(self, evento):
+        """Lo precargado ya no vale; un consumo de un día pasado corrige además el gasto estimado."""
+        precarga.invalidar()
+        if self.is_logged_in and ServicioGastoEnergetico.compartido(self.current_user).aplicar_consumo(evento.consumo):
+            BusEventos.compartido().publicar(GastoEstimadoCambiado())
+
+    def iniciar_recordatorios(self):
+        self.detener_recordatorios()
+        self.planificador_recordatorios = PlanificadorRecordatorios(self.current_user, self)
+        self.planificador_recordatorios.iniciar()
+        Recordatorio(self.current_user, self).recordar_actualizar_peso()
+
+    def _recordatorio_peso(self, evento):
+        # Se pregunta con el recordatorio ya marcado como mostrado y la conexión cerrada
+        if self.is_logged_in and evento.usuario == self.current_user:
+            QTimer.singleShot(0, self._preguntar_actualizar_peso)
+
+    def _preguntar_actualizar_peso(self):
+        """Ofrece registrar el peso ahora desde la sección de salud."""
+        if not self.is_logged_in:
+            return
+        respuesta = QMessageBox.question(
+            self, "Recordatorio de peso",
+            "Hace tiempo que no registras tu peso. ¿Quieres actualizarlo ahora?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if respuesta == QMessageBox.StandardButton.Yes:
+            self.change_section("salud")
+            self.obtener_seccion("salud").actualizar_peso()
+
+    def _agregar_recordatorio(self, recordatorio):
+        if self.planificador_recordatorios is not None:
+            self.planificador_recordatorios.agregar(recordatorio)
+
+    def detener_recordatorios(self):
+        if self.planificador_recordatorios is not None:
+            self.planificador_recordatorios.detener()
+            self.planificador_recordatorios.deleteLater()
+            self.planificador_recordatorios = None
+
+    def _tareas_precarga(self):
+        """Lo que cada sección pide al abrirse por primera vez: {nombre: tarea}."""
+        hoy = datetime.now().strftime('%Y-%m-%d')
+        desde, hasta = (fecha.toString("yyyy-MM-dd") for fecha in rango_por_defecto())
+        historial = HistorialFacade(self.current_user, API_URL)
+
+        def catalogo():
+            # Queda en la copia compartida del catálogo, no en el almacén de precarga
+            CatalogoAlimentosCache.compartida(API_URL).sincronizar(forzar=True)
+
+        def resumen_hoy():
+            return ("resumen-diario", hoy), pedir_resumen_diario(API_URL, hoy) or {}
+
+        def historial_inicial():
+            # El rango del historial (un año) cubre también todos los períodos del gráfico
+            return ("historial", desde, hasta), historial.pedir_registros(desde, hasta)
+
+        return {"catalogo": catalogo, "resumen_hoy": resumen_hoy, "historial": historial_inicial}
+
+    def iniciar_precarga(self):
+        """Calienta en paralelo las cachés de las secciones, antes de que se abran."""
+        self.cancelar_precarga()
+        self.calentador = CalentadorCaches(self._tareas_precarga(), parent=self)
+        inicio = time.perf_counter()
+        self.calentador.terminado.connect(
+            lambda tiempos: self._precarga_terminada(tiempos, inicio))
+        self.calentador.iniciar()
+
+    def _precarga_terminada(self, tiempos, inicio):
+        registrar("MainWindow.login_hasta_precarga", (time.perf_counter() - inicio) * 1000)
+        fallidas = [nombre for nombre, ms in tiempos.items() if ms is None]
+        if fallidas:
+            print(f"ADVERTENCIA: Precarga incompleta ({', '.join(fallidas)}); esas secciones cargarán al abrirse.")
+
+    def cancelar_precarga(self):
+        if self.calentador is not None:
+            self.calentador.cancelar()
+            self.calentador.deleteLater()
+            self.calentador = None
+
+    def detener_eventos_api(self):
+        if self.eventos_api is not None:
+            self.eventos_api.detener()
+            self.eventos_api = None
 
 
     def create_header(self):
@@ -401,18 +530,36 @@ class MainWindow(QMainWindow):
     
     def on_login_success(self, username):
         """Callback cuando el login es exitoso"""
+        inicio = time.perf_counter()
         self.current_user = username
+        self.sesion = iniciar_sesion(username, self.login_screen.auth_service.access_token)
         self.setup_main_interface() 
-        self.sidebar.set_usuario(self.current_user)
+        self.sidebar.set_usuario(self.current_user, self.sesion)
         self.show_main()
+        # Interactiva cuando el bucle de eventos queda libre, con la ventana ya pintada
+        QTimer.singleShot(0, lambda: self._interactiva_tras_login(inicio))
+
+    def _interactiva_tras_login(self, inicio):
+        registrar("MainWindow.login_hasta_interactiva", (time.perf_counter() - inicio) * 1000)
+        # Después de pintar: los hilos de la precarga compiten por el GIL (p. ej.
+        # al decodificar el catálogo) y retrasarían la construcción de la interfaz
+        self.iniciar_precarga()
+        self.iniciar_recordatorios()
+        self.pendientes_precalentar = list(SECCIONES_PRECALENTAR)
+        QTimer.singleShot(500, self._precalentar_siguiente)
     
     def logout(self):
         """Cerrar sesión y volver al login"""
         # Limpiar datos del usuario
         self.current_user = None
+        self.sesion = None
         # Detener timer si existe
         if hasattr(self, 'timer'):
             self.timer.stop()
+        self.detener_eventos_api()
+        self.cancelar_precarga()
+        self.detener_recordatorios()
+        cerrar_sesion()
         
         # Limpiar servicios de autenticación
         if hasattr(self.login_screen, 'auth_service'):
@@ -421,76 +568,42 @@ class MainWindow(QMainWindow):
         # Mostrar login
         self.show_login()
     
+    @cronometrado("MainWindow.change_section")
     def change_section(self, section_name):
-            """Cambiar de sección y mostrar mensaje de bienvenida una sola vez."""
+            """Cambiar de sección (creándola si hace falta) y mostrar su mensaje de bienvenida una sola vez."""
             if not self.is_logged_in:
                 return
-                
-            # Diccionario que mapea nombres de sección a sus widgets, métodos y columnas de BD
-            section_details = {
-                "salud": {
-                    "widget": self.salud, 
-                    "welcome_method": "mostrar_mensaje_bienvenida",
-                    "db_column": "salud"
-                },
-                "historial": {
-                    "widget": self.historial, 
-                    "welcome_method": "show_welcome_message",
-                    "db_column": "historial"
-                },
-                "registrar": {
-                    "widget": self.registrar_alimento, 
-                    "welcome_method": "mostrar_mensaje_bienvenida",
-                    "db_column": "registrar_alimento"
-                },
-                "settings": {
-                    "widget": self.settings,
-                    "welcome_method": "mostrar_mensaje_inicial",
-                    "db_column": "configuracion"
-                },
-                "agregar": {
-                    "widget": self.agregar_alimento,
-                    "welcome_method": "_mostrar_mensaje_bienvenida",
-                    "db_column": "agregar_alimento"
-                },    
-                "grafico": {
-                    "widget": self.graficos_view,
-                    "welcome_method": "mostrar_mensaje_bienvenida",
-                    "db_column": "graficos"}
-
-                
-            }
-
-            if section_name in section_details:
-                details = section_details[section_name]
-                db_column_name = details["db_column"]
+            if section_name != "welcome" and section_name not in self.fabricas_secciones:
+                return
 
-                if db_column_name not in self.welcome_message_flags:
-                    status = self.check_message_status(db_column_name)
-                    self.welcome_message_flags[db_column_name] = status
+            widget = self.obtener_seccion(section_name)
+            if section_name != "welcome":
+                self.ultimo_uso[section_name] = time.monotonic()
 
-                if self.welcome_message_flags[db_column_name] == 0:
-                    widget = details["widget"]
-                    method_name = details["welcome_method"]
-                    
+            if section_name in MENSAJES_BIENVENIDA:
+                method_name, clave = MENSAJES_BIENVENIDA[section_name]
+                # Leídas una vez por sesión; marcarlo se escribe más tarde, junto con otros cambios
+                preferencias = self.sesion.preferencias
+                if not preferencias.obtener(PREFIJO_BIENVENIDA + clave):
                     if hasattr(widget, method_name):
                         welcome_method = getattr(widget, method_name)
                         welcome_method()
                     
-                    self.update_message_status(db_column_name)
-                    self.welcome_message_flags[db_column_name] = 1
+                    preferencias.establecer(PREFIJO_BIENVENIDA + clave, True)
 
-            # Lógica para cambiar de vista. El índice de 'grafico' (3) ahora corresponde a 'graficos_view'
-            section_map = {
-                "welcome": 0, "registrar": 1, "agregar": 2, "grafico": 3,
-                "historial": 4, "settings": 5, "salud": 6, "menu": 7
-            }
-            
-            if section_name in section_map:
-                self.stacked_widget.setCurrentIndex(section_map[section_name])
+            self.stacked_widget.setCurrentWidget(widget)
                                                     
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if hasattr(self, 'overlay_rendimiento') and self.overlay_rendimiento.isVisible():
+            self.overlay_rendimiento.colocar()
+
     def closeEvent(self, event):
         """Manejar el cierre de la aplicación"""
         if hasattr(self, 'timer'):
             self.timer.stop()
+        self.detener_eventos_api()
+        self.cancelar_precarga()
+        self.detener_recordatorios()
+        cerrar_sesion()
         event.accept()
\ No newline at end of file